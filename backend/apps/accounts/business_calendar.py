@@ -0,0 +1,151 @@
+"""Business-day arithmetic over weekends and company holidays.
+
+The calendar is a precomputed table covering a span of years: for every
+day, the number of business days up to and including it, plus the list of
+business days in order. Adding N business days, counting business days
+between two dates and finding the next business day are then a couple of
+index lookups. The table is rebuilt per process when a Holiday changes
+(tracked with a version counter in the Django cache) or when a date falls
+outside the span.
+"""
+import threading
+import time
+from array import array
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.utils import timezone
+
+
+WORKING_WEEKDAYS = frozenset(range(5))  # Monday-Friday
+SPAN_YEARS_BACK = 5
+SPAN_YEARS_AHEAD = 10
+VERSION_KEY = 'business_calendar:version'
+VERSION_CHECK_SECONDS = 1.0
+
+
+class BusinessCalendar:
+    """Business-day table for the dates ``first`` through ``last`` inclusive."""
+
+    def __init__(self, first, last, holidays=()):
+        self.first = first
+        self.last = last
+        self.holidays = frozenset(holidays)
+        self.origin = first.toordinal()
+        # upto[i]: business days in [first, first + i]
+        self.upto = array('l')
+        # days[k]: ordinal of the (k + 1)th business day in the span
+        self.days = array('l')
+        count = 0
+        day = first
+        while day <= last:
+            if day.weekday() in WORKING_WEEKDAYS and day not in self.holidays:
+                count += 1
+                self.days.append(day.toordinal())
+            self.upto.append(count)
+            day += timedelta(days=1)
+
+    def covers(self, *days):
+        return all(self.first <= day <= self.last for day in days)
+
+    def _index(self, day):
+        return day.toordinal() - self.origin
+
+    def is_business_day(self, day):
+        i = self._index(day)
+        return self.upto[i] - (self.upto[i - 1] if i else 0) == 1
+
+    def add(self, day, num_days):
+        """The date ``num_days`` business days after ``day`` (before it, if negative)."""
+        if num_days == 0:
+            return day
+        upto = self.upto[self._index(day)]
+        if num_days > 0:
+            position = upto + num_days - 1
+        else:
+            position = upto - self.is_business_day(day) + num_days
+        if not 0 <= position < len(self.days):
+            raise IndexError('Result falls outside the calendar span')
+        return date.fromordinal(self.days[position])
+
+    def between(self, start, end):
+        """Business days in (start, end]; negative when ``end`` is before ``start``."""
+        return self.upto[self._index(end)] - self.upto[self._index(start)]
+
+
+_lock = threading.Lock()
+_state = None  # (version, checked_at, calendar)
+
+
+def calendar_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_calendar():
+    """Force every process to rebuild its table (called when holidays change)."""
+    global _state
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+    _state = None
+
+
+def build_calendar(first, last):
+    from .models import Holiday
+    holidays = Holiday.objects.filter(date__gte=first, date__lte=last).values_list('date', flat=True)
+    return BusinessCalendar(first, last, holidays)
+
+
+def get_calendar(*days):
+    """Return a calendar covering ``days`` (and today), rebuilding only when needed."""
+    global _state
+    state = _state
+    now = time.monotonic()
+    if state is not None and now - state[1] >= VERSION_CHECK_SECONDS:
+        version = calendar_version()
+        state = (version, now, state[2]) if state[0] == version else None
+    if state is not None and state[2].covers(*days):
+        _state = state
+        return state[2]
+
+    with _lock:
+        version = calendar_version()
+        today = timezone.localdate()
+        first = min([today.replace(year=today.year - SPAN_YEARS_BACK, day=1), *days])
+        last = max([today.replace(year=today.year + SPAN_YEARS_AHEAD, day=1), *days])
+        if state is not None:
+            first, last = min(first, state[2].first), max(last, state[2].last)
+        # Leave room past the edges so add() near them still lands inside
+        calendar = build_calendar(first - timedelta(days=366), last + timedelta(days=366))
+        _state = (version, time.monotonic(), calendar)
+    return calendar
+
+
+def is_business_day(day):
+    return get_calendar(day).is_business_day(day)
+
+
+def add_business_days(day, num_days):
+    """Step ``num_days`` business days forward (or back, if negative) from ``day``."""
+    calendar = get_calendar(day)
+    try:
+        return calendar.add(day, num_days)
+    except IndexError:
+        # Far outside the span: widen it to cover the rough target and retry
+        reach = day + timedelta(days=2 * num_days + (30 if num_days > 0 else -30))
+        return get_calendar(day, reach).add(day, num_days)
+
+
+def business_days_between(start, end):
+    """Business days after ``start`` up to and including ``end``."""
+    return get_calendar(start, end).between(start, end)
+
+
+def next_business_day(day):
+    """The first business day strictly after ``day``."""
+    return add_business_days(day, 1)
+
+
+def roll_forward(day):
+    """``day`` itself if it is a business day, else the next one."""
+    return day if is_business_day(day) else next_business_day(day)
@@ -0,0 +1,175 @@
+"""Personal iCalendar (.ics) feeds of jobs and reminders.
+
+Feeds are addressed by the user's secret calendar token, so phone calendar
+apps can subscribe without logging in. Events are streamed from a
+queryset iterator. Each feed's ETag comes from one aggregate query
+(latest ``updated_at`` plus row count), so the regular 15-minute polls
+usually end in a 304 without rendering anything. There is no
+Last-Modified: a deleted row, or one that drops out of the feed, changes
+the count but not the latest ``updated_at``, so only the ETag sees it.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+
+PRODID = '-//All Around Town Outdoor Services//CRM//EN'
+JOB_STATUSES = ['scheduled', 'in_progress', 'completed', 'weather_delay']
+PAST_DAYS = 30
+REMINDER_RULE_DAYS = 90
+
+
+def escape_text(value):
+    return (
+        str(value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Fold a content line to 75 octets as RFC 5545 requires."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(encoded))
+        # Don't split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def event(uid, day, start_time, minutes, summary, updated_at, description='', location=''):
+    """Render one VEVENT: timed if ``start_time`` is set, otherwise all-day."""
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', f'DTSTAMP:{format_utc(updated_at)}']
+    if start_time:
+        start = timezone.make_aware(datetime.combine(day, start_time))
+        lines += [f'DTSTART:{format_utc(start)}', f'DTEND:{format_utc(start + timedelta(minutes=minutes))}']
+    else:
+        lines += [f'DTSTART;VALUE=DATE:{day:%Y%m%d}', f'DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}']
+    lines.append(f'SUMMARY:{escape_text(summary)}')
+    if location:
+        lines.append(f'LOCATION:{escape_text(location)}')
+    if description:
+        lines.append(f'DESCRIPTION:{escape_text(description)}')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+
+def calendar_stream(name, events):
+    yield fold('BEGIN:VCALENDAR') + fold('VERSION:2.0') + fold(f'PRODID:{PRODID}')
+    yield fold(f'X-WR-CALNAME:{escape_text(name)}') + fold('METHOD:PUBLISH')
+    for item in events:
+        yield item
+    yield fold('END:VCALENDAR')
+
+
+def _address(customer):
+    return ', '.join(filter(None, [
+        customer.bill_to_address, customer.city, customer.state, customer.zip_code,
+    ]))
+
+
+# Jobs ---------------------------------------------------------------------
+
+def job_queryset(user):
+    """Jobs the user created or is assigned to (by username or full name)."""
+    from apps.services.models import Job
+
+    names = {user.username, user.get_full_name()} - {''}
+    assigned = Q()
+    for name in names:
+        assigned |= Q(assigned_to__iexact=name)
+    return Job.objects.filter(
+        Q(created_by=user) | assigned,
+        status__in=JOB_STATUSES,
+        scheduled_date__gte=timezone.localdate() - timedelta(days=PAST_DAYS),
+    )
+
+
+def job_events(user):
+    jobs = job_queryset(user).select_related('customer', 'service').order_by('scheduled_date', 'pk')
+    for job in jobs.iterator(chunk_size=500):
+        customer = job.customer
+        details = [f'Status: {job.get_status_display()}']
+        if customer.main_phone:
+            details.append(f'Phone: {customer.main_phone}')
+        if job.assigned_to:
+            details.append(f'Crew: {job.assigned_to}')
+        yield event(
+            f'job-{job.pk}@outdoor-crm', job.scheduled_date, job.scheduled_time, job.estimated_duration,
+            f'{job.service.name} - {customer.business_name}', job.updated_at,
+            description='\n'.join(details), location=_address(customer),
+        )
+
+
+# Reminders ----------------------------------------------------------------
+
+def reminder_queryset(user):
+    from apps.reminders.models import Reminder
+    return Reminder.objects.filter(
+        created_by=user, status__in=['pending', 'snoozed'],
+        reminder_date__gte=timezone.localdate() - timedelta(days=PAST_DAYS),
+    )
+
+
+def reminder_rule_queryset(user):
+    from apps.reminders.models import ReminderRule
+    return ReminderRule.objects.filter(created_by=user, is_active=True)
+
+
+def reminder_events(user):
+    from apps.reminders.recurrence import expand_rules
+
+    today = timezone.localdate()
+    reminders = reminder_queryset(user).select_related('customer').order_by('reminder_date', 'pk')
+    occurrences = expand_rules(
+        today, today + timedelta(days=REMINDER_RULE_DAYS), reminder_rule_queryset(user),
+    )
+    for reminder in reminders.iterator(chunk_size=500):
+        yield _reminder_event(f'reminder-{reminder.pk}@outdoor-crm', reminder, reminder.updated_at)
+    for reminder in occurrences:
+        uid = f'reminder-rule-{reminder.rule_id}-{reminder.occurrence_date:%Y%m%d}@outdoor-crm'
+        yield _reminder_event(uid, reminder, reminder.rule.updated_at)
+
+
+def _reminder_event(uid, reminder, updated_at):
+    customer = reminder.customer
+    details = [reminder.description] if reminder.description else []
+    if customer.main_phone:
+        details.append(f'Phone: {customer.main_phone}')
+    return event(
+        uid, reminder.reminder_date, reminder.reminder_time, 15,
+        f'{reminder.title} - {customer.business_name}', updated_at,
+        description='\n'.join(details), location=_address(customer),
+    )
+
+
+# Change detection -----------------------------------------------------------
+
+def feed_state(kind, user):
+    """Return the ETag for a feed from one aggregate query (two for reminders)."""
+    queryset = job_queryset(user) if kind == 'jobs' else reminder_queryset(user)
+    state = queryset.aggregate(latest=Max('updated_at'), count=Count('id'))
+    latest, count = state['latest'], state['count']
+    if kind == 'reminders':
+        rules = reminder_rule_queryset(user).aggregate(
+            latest=Max('updated_at'), count=Count('id')
+        )
+        if rules['latest'] and (latest is None or rules['latest'] > latest):
+            latest = rules['latest']
+        count = f"{count}-{rules['count']}"
+
+    # The feed's date window moves daily, so the date is part of its identity
+    today = timezone.localdate()
+    fingerprint = f'{kind}:{user.pk}:{latest and latest.isoformat()}:{count}:{today}'
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
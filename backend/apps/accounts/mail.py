@@ -0,0 +1,35 @@
+"""Batched email delivery over one pooled connection."""
+import logging
+from django.core.mail import get_connection
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+
+
+def send_in_batches(messages, batch_size=BATCH_SIZE, connection=None, on_sent=None):
+    """
+    Send ``messages`` over a single SMTP session, ``batch_size`` at a time.
+
+    ``on_sent(batch)`` is called after each batch is handed to the server,
+    so callers can record delivery as they go; a failing batch is logged
+    and skipped without stopping later ones. Returns the number sent.
+    """
+    messages = list(messages)
+    if not messages:
+        return 0
+    connection = connection or get_connection()
+    sent = 0
+    with connection:
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start:start + batch_size]
+            try:
+                connection.send_messages(batch)
+            except Exception:
+                logger.exception('Failed to send %d emails', len(batch))
+                continue
+            sent += len(batch)
+            if on_sent:
+                on_sent(batch)
+    return sent
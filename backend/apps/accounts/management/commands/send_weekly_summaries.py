@@ -0,0 +1,14 @@
+"""Send weekly summary emails whose slot has arrived. Intended to run from cron, e.g. hourly."""
+from django.core.management.base import BaseCommand
+from apps.accounts.weekly_summary import send_weekly_summaries
+
+
+class Command(BaseCommand):
+    help = "Email each user their weekly summary on their chosen day and time"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails per SMTP batch')
+
+    def handle(self, *args, **options):
+        sent = send_weekly_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} weekly summaries'))
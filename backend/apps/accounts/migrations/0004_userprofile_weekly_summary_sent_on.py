@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_holiday'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='weekly_summary_sent_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
+import secrets
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 
@@ -27,11 +28,15 @@ class UserProfile(models.Model):
     weekly_summary_email = models.EmailField(blank=True)  # Alternate email for summaries
     weekly_summary_day = models.PositiveSmallIntegerField(default=4)  # 0=Mon, 4=Fri
     weekly_summary_time = models.TimeField(default='16:00')  # 4 PM
+    weekly_summary_sent_on = models.DateField(null=True, blank=True)
 
     # Notification preferences
     reminder_notifications = models.BooleanField(default=True)
     overdue_notifications = models.BooleanField(default=True)
 
+    # Secret for the personal .ics calendar feeds; rotating it revokes old feed URLs
+    calendar_token = models.CharField(max_length=64, unique=True, null=True, blank=True)
+
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -44,6 +49,11 @@ class UserProfile(models.Model):
         """Get the email to send summaries to."""
         return self.weekly_summary_email or self.user.email
 
+    def rotate_calendar_token(self):
+        self.calendar_token = secrets.token_urlsafe(32)
+        self.save(update_fields=['calendar_token', 'updated_at'])
+        return self.calendar_token
+
 
 class CompanyProfile(models.Model):
     """Singleton company settings for invoices, PDFs, and branding."""
@@ -75,6 +85,18 @@ class CompanyProfile(models.Model):
         return obj
 
 
+class Holiday(models.Model):
+    """A company holiday; skipped by the business calendar like a weekend."""
+    date = models.DateField(unique=True)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.name} ({self.date})"
+
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """Create a UserProfile when a new User is created."""
@@ -87,3 +109,10 @@ def save_user_profile(sender, instance, **kwargs):
     """Save the UserProfile when the User is saved."""
     if hasattr(instance, 'profile'):
         instance.profile.save()
+
+
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def invalidate_business_calendar(sender, **kwargs):
+    from .business_calendar import invalidate_calendar
+    invalidate_calendar()
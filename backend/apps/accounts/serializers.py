@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import UserProfile, CompanyProfile
+from .models import UserProfile, CompanyProfile, Holiday
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -47,3 +47,9 @@ class CompanyProfileSerializer(serializers.ModelSerializer):
             'tax_rate', 'invoice_prefix', 'invoice_terms', 'updated_at',
         ]
         read_only_fields = ['updated_at']
+
+
+class HolidaySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Holiday
+        fields = ['id', 'date', 'name']
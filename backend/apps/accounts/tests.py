@@ -1,8 +1,15 @@
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from django.core import mail
 from django.test import TestCase
 from django.contrib.auth.models import User
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
-from apps.accounts.models import CompanyProfile
+from apps.accounts.models import CompanyProfile, Holiday, UserProfile
+from apps.accounts import business_calendar
+from apps.accounts.business_calendar import BusinessCalendar
 
 
 class AuthFlowTest(TestCase):
@@ -93,3 +100,206 @@ class CompanyProfileTest(TestCase):
         anon = APIClient()
         resp = anon.get('/auth/company-profile/')
         self.assertIn(resp.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+
+def step_business_days(start, num_days, holidays=()):
+    """Reference implementation: walk one day at a time."""
+    day, step = start, (1 if num_days > 0 else -1)
+    for _ in range(abs(num_days)):
+        day += timedelta(days=step)
+        while day.weekday() >= 5 or day in holidays:
+            day += timedelta(days=step)
+    return day
+
+
+class BusinessCalendarTest(TestCase):
+
+    def setUp(self):
+        # Holidays rolled back by other tests never reach the signal, so start clean
+        business_calendar.invalidate_calendar()
+        self.addCleanup(business_calendar.invalidate_calendar)
+        self.user = User.objects.create_user(username='admin', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_table_matches_day_by_day_walk(self):
+        holidays = {date(2026, 1, 1), date(2026, 5, 25), date(2026, 7, 3), date(2026, 12, 25)}
+        calendar = BusinessCalendar(date(2025, 1, 1), date(2027, 12, 31), holidays)
+        rng = random.Random(7)
+        for _ in range(300):
+            start = date(2026, 1, 1) + timedelta(days=rng.randrange(365))
+            num_days = rng.randrange(-60, 61)
+            expected = step_business_days(start, num_days, holidays)
+            self.assertEqual(calendar.add(start, num_days), expected, (start, num_days))
+            if num_days >= 0:
+                self.assertEqual(calendar.between(start, expected), num_days)
+
+    def test_holidays_change_module_results(self):
+        friday = date(2026, 7, 3)
+        self.assertEqual(business_calendar.next_business_day(date(2026, 7, 2)), friday)
+        Holiday.objects.create(date=friday, name='Independence Day (observed)')
+        self.assertEqual(business_calendar.next_business_day(date(2026, 7, 2)), date(2026, 7, 6))
+        self.assertEqual(business_calendar.roll_forward(friday), date(2026, 7, 6))
+        self.assertEqual(business_calendar.business_days_between(date(2026, 7, 2), date(2026, 7, 6)), 1)
+
+    def test_dates_outside_span_are_supported(self):
+        start = date(1990, 3, 1)
+        self.assertEqual(business_calendar.add_business_days(start, 400), step_business_days(start, 400))
+
+    def test_reminder_default_skips_holidays(self):
+        from apps.reminders.models import add_business_days
+        wednesday = date(2026, 11, 25)
+        self.assertEqual(add_business_days(wednesday, 1), date(2026, 11, 26))
+        resp = self.client.post('/auth/holidays/', {'date': '2026-11-26', 'name': 'Thanksgiving'})
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(add_business_days(wednesday, 1), date(2026, 11, 27))
+
+        self.client.delete(f"/auth/holidays/{resp.data['id']}/")
+        self.assertEqual(add_business_days(wednesday, 1), date(2026, 11, 26))
+
+
+class WeeklySummaryTest(TestCase):
+
+    def setUp(self):
+        from datetime import time
+        # Friday 2026-03-06, 17:00 local
+        self.now = timezone.make_aware(datetime(2026, 3, 6, 17, 0))
+        self.users = []
+        for i, (day, at) in enumerate([(4, time(16)), (4, time(16)), (4, time(18)), (2, time(9))]):
+            user = User.objects.create_user(username=f'rep{i}', email=f'rep{i}@example.com')
+            user.profile.weekly_summary_day = day
+            user.profile.weekly_summary_time = at
+            user.profile.save()
+            self.users.append(user)
+        self.users[1].profile.weekly_summary_email = 'boss@example.com'
+        self.users[1].profile.save()
+
+    def test_sends_due_summaries_once_with_grouped_stats(self):
+        from apps.activities.models import ActivityType, Activity
+        from apps.customers.models import Customer
+        from apps.services.models import ServiceCategory, Service, Job
+        from apps.accounts.weekly_summary import send_weekly_summaries
+
+        rep = self.users[0]
+        customer = Customer.objects.create(business_name='Acme Lawn')
+        call = ActivityType.objects.create(name='call', display_name='Call')
+        for outcome in ('completed', 'no_answer'):
+            Activity.objects.create(
+                customer=customer, activity_type=call, created_by=rep, outcome=outcome,
+                activity_datetime=self.now - timedelta(days=1),
+            )
+        service = Service.objects.create(category=ServiceCategory.objects.create(name='Lawn'), name='Mow')
+        Job.objects.create(
+            customer=customer, service=service, scheduled_date=date(2026, 3, 4), price=Decimal('125.50'),
+            status='completed', completed_at=self.now - timedelta(days=2), created_by=rep,
+        )
+
+        # The Wednesday user already had this week's summary on Wednesday
+        UserProfile.objects.filter(user=self.users[3]).update(weekly_summary_sent_on=date(2026, 3, 4))
+
+        with self.assertNumQueries(5):  # profiles, jobs, rollup, reminders, sent-on update
+            self.assertEqual(send_weekly_summaries(now=self.now), 2)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['boss@example.com', 'rep0@example.com'])
+        body = next(m.body for m in mail.outbox if m.to == ['rep0@example.com'])
+        self.assertIn('Jobs completed:     1', body)
+        self.assertIn('$125.50', body)
+        self.assertIn('Activities logged:  2', body)
+        self.assertIn('Calls connected:    1', body)
+
+        # Same slot again: nothing new; the 18:00 user becomes due later that day
+        self.assertEqual(send_weekly_summaries(now=self.now), 0)
+        self.assertEqual(send_weekly_summaries(now=self.now + timedelta(hours=2)), 1)
+        # Next week everyone is due again by Friday evening
+        self.assertEqual(send_weekly_summaries(now=self.now + timedelta(days=7, hours=2)), 4)
+
+    def test_missed_slots_are_caught_up_later_in_the_week(self):
+        from apps.accounts.weekly_summary import due_profiles
+
+        def due(now):
+            return sorted(p.user.username for p in due_profiles(now))
+
+        thursday = self.now - timedelta(days=1)
+        # Not due before the slot day, nor before the slot time on the day
+        self.assertEqual(due(thursday - timedelta(days=1, hours=9)), [])
+        self.assertEqual(due(self.now - timedelta(hours=2)), ['rep3'])
+        # The Wednesday slot was missed, so it is still due on Thursday and Friday
+        self.assertEqual(due(thursday), ['rep3'])
+        self.assertEqual(due(self.now), ['rep0', 'rep1', 'rep3'])
+
+        # A summary sent before this week's slot doesn't count; one sent on or after it does
+        profile = self.users[3].profile
+        for sent_on, expected in ((date(2026, 3, 3), ['rep3']), (date(2026, 3, 4), [])):
+            UserProfile.objects.filter(pk=profile.pk).update(weekly_summary_sent_on=sent_on)
+            self.assertEqual(due(thursday), expected)
+
+
+class CalendarFeedTest(TestCase):
+
+    def setUp(self):
+        from datetime import time
+        from apps.customers.models import Customer
+        from apps.services.models import ServiceCategory, Service, Job
+
+        self.user = User.objects.create_user(username='crew1', first_name='Sam', last_name='Ortiz')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        customer = Customer.objects.create(
+            business_name='Acme, Lawn; Co', bill_to_address='1 Main St', city='Davenport', state='IA',
+        )
+        service = Service.objects.create(category=ServiceCategory.objects.create(name='Lawn'), name='Mow')
+        today = timezone.localdate()
+        self.job = Job.objects.create(
+            customer=customer, service=service, scheduled_date=today, scheduled_time=time(9, 30),
+            estimated_duration=90, price=50, assigned_to='Sam Ortiz',
+        )
+        Job.objects.create(customer=customer, service=service, scheduled_date=today, price=50, assigned_to='Someone')
+
+    def _feed_url(self, kind):
+        urls = self.client.get('/auth/calendar-feeds/').data
+        return urls[kind].replace('http://testserver', '')
+
+    def test_jobs_feed_streams_events_and_honours_etag(self):
+        anon = APIClient()
+        url = self._feed_url('jobs')
+        resp = anon.get(url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.streaming)
+        body = b''.join(resp.streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+        self.assertIn('SUMMARY:Mow - Acme\\, Lawn\\; Co', body)
+        self.assertIn(f'UID:job-{self.job.pk}@outdoor-crm', body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split('\r\n')))
+
+        etag = resp['ETag']
+        self.assertNotIn('Last-Modified', resp)
+        self.assertEqual(anon.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.job.scheduled_time = None
+        self.job.save()
+        resp = anon.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn('DTSTART;VALUE=DATE:', b''.join(resp.streaming_content).decode())
+
+        # A deletion leaves the latest updated_at alone but still changes the feed
+        etag = resp['ETag']
+        self.job.delete()
+        self.assertEqual(anon.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_reminder_feed_and_token_rotation(self):
+        from apps.reminders.models import Reminder, ReminderRule
+
+        customer = self.job.customer
+        Reminder.objects.create(customer=customer, title='Call back', created_by=self.user,
+                                reminder_date=timezone.localdate())
+        ReminderRule.objects.create(customer=customer, title='Check in', rrule='FREQ=MONTHLY',
+                                    start_date=timezone.localdate(), created_by=self.user)
+        url = self._feed_url('reminders')
+        body = b''.join(APIClient().get(url).streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1 + 3)
+
+        ReminderRule.objects.update(is_active=False)
+        body = b''.join(APIClient().get(url).streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 1)
+
+        self.client.post('/auth/calendar-feeds/')
+        self.assertEqual(APIClient().get(url).status_code, status.HTTP_404_NOT_FOUND)
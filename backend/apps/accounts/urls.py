@@ -1,7 +1,10 @@
 from django.urls import path
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from .views import CurrentUserView, ToggleDarkModeView, CompanyProfileView
+from .views import (
+    CurrentUserView, ToggleDarkModeView, CompanyProfileView, HolidayListView, HolidayDetailView,
+    CalendarFeedTokenView, calendar_feed,
+)
 
 urlpatterns = [
     path('login/', TokenObtainPairView.as_view(permission_classes=[AllowAny]), name='token_obtain_pair'),
@@ -9,4 +12,9 @@ urlpatterns = [
     path('me/', CurrentUserView.as_view(), name='current_user'),
     path('toggle-dark-mode/', ToggleDarkModeView.as_view(), name='toggle_dark_mode'),
     path('company-profile/', CompanyProfileView.as_view(), name='company_profile'),
+    path('holidays/', HolidayListView.as_view(), name='holiday_list'),
+    path('holidays/<int:pk>/', HolidayDetailView.as_view(), name='holiday_detail'),
+    path('calendar-feeds/', CalendarFeedTokenView.as_view(), name='calendar_feeds'),
+    path('calendar/<str:token>/jobs.ics', calendar_feed, {'kind': 'jobs'}, name='calendar_feed_jobs'),
+    path('calendar/<str:token>/reminders.ics', calendar_feed, {'kind': 'reminders'}, name='calendar_feed_reminders'),
 ]
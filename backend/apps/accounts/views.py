@@ -1,9 +1,16 @@
-from rest_framework import status
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .serializers import UserSerializer, CompanyProfileSerializer
-from .models import CompanyProfile
+from .serializers import UserSerializer, CompanyProfileSerializer, HolidaySerializer
+from .models import CompanyProfile, Holiday, UserProfile
+from . import calendar_feeds
 
 
 class CurrentUserView(APIView):
@@ -48,3 +55,64 @@ class CompanyProfileView(APIView):
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class HolidayListView(generics.ListCreateAPIView):
+    """List or add company holidays (skipped by business-day calculations)."""
+    permission_classes = [IsAuthenticated]
+    queryset = Holiday.objects.all()
+    serializer_class = HolidaySerializer
+    pagination_class = None
+
+
+class HolidayDetailView(generics.RetrieveUpdateDestroyAPIView):
+    permission_classes = [IsAuthenticated]
+    queryset = Holiday.objects.all()
+    serializer_class = HolidaySerializer
+
+
+class CalendarFeedTokenView(APIView):
+    """GET the user's calendar feed URLs (creating a token on first use); POST to rotate the token."""
+    permission_classes = [IsAuthenticated]
+
+    def _urls(self, request, token):
+        return {
+            kind: request.build_absolute_uri(reverse(f'calendar_feed_{kind}', kwargs={'token': token}))
+            for kind in ('jobs', 'reminders')
+        }
+
+    def get(self, request):
+        profile = request.user.profile
+        token = profile.calendar_token or profile.rotate_calendar_token()
+        return Response(self._urls(request, token))
+
+    def post(self, request):
+        return Response(self._urls(request, request.user.profile.rotate_calendar_token()))
+
+
+@require_GET
+def calendar_feed(request, token, kind):
+    """Stream a user's jobs or reminders as iCalendar, answering 304 when nothing changed."""
+    profile = get_object_or_404(
+        UserProfile.objects.select_related('user'), calendar_token=token, user__is_active=True
+    )
+    user = profile.user
+    etag = quote_etag(calendar_feeds.feed_state(kind, user))
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    if kind == 'jobs':
+        events = calendar_feeds.job_events(user)
+        name = 'Jobs'
+    else:
+        events = calendar_feeds.reminder_events(user)
+        name = 'Reminders'
+    response = StreamingHttpResponse(
+        calendar_feeds.calendar_stream(f'{name} ({user.get_full_name() or user.username})', events),
+        content_type='text/calendar; charset=utf-8',
+    )
+    response.headers['ETag'] = etag
+    response.headers['Content-Disposition'] = f'inline; filename="{kind}.ics"'
+    return response
@@ -0,0 +1,126 @@
+"""Weekly summary emails.
+
+Users whose chosen weekday and time have arrived (and who haven't had this
+week's summary yet) are selected in one query. Their stats for the past
+seven days come from a handful of grouped queries keyed by user. All the
+emails then go out in one batched SMTP session, so cost grows with the
+number of recipients, not with queries per recipient.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from .mail import BATCH_SIZE, send_in_batches
+from .models import UserProfile
+
+
+def due_profiles(now):
+    """
+    Profiles whose summary slot (weekday and time, local) this week has passed
+    and that haven't been sent a summary since that slot's date.
+
+    A slot missed on its day (the job didn't run, or the time was changed
+    to earlier) is caught up on a later day of the same week.
+    """
+    today = now.date()
+    week_start = today - timedelta(days=today.weekday())
+    due = Q()
+    for day in range(today.weekday() + 1):
+        slot = Q(weekly_summary_day=day) & (
+            Q(weekly_summary_sent_on__isnull=True)
+            | Q(weekly_summary_sent_on__lt=week_start + timedelta(days=day))
+        )
+        if day == today.weekday():
+            slot &= Q(weekly_summary_time__lte=now.time())
+        due |= slot
+    return UserProfile.objects.filter(
+        due, receive_weekly_summary=True, user__is_active=True,
+    ).select_related('user')
+
+
+def collect_stats(user_ids, start, end):
+    """Return ``{user_id: stats}`` for activity between ``start`` and ``end`` (inclusive dates)."""
+    from apps.activities.models import ActivityDailyRollup
+    from apps.activities.rollup import start_of_day
+    from apps.reminders.models import Reminder
+    from apps.services.models import Job
+
+    stats = defaultdict(lambda: {
+        'jobs_completed': 0, 'revenue': Decimal('0'), 'activities': 0, 'calls_connected': 0,
+        'overdue_reminders': 0,
+    })
+
+    jobs = Job.objects.filter(
+        created_by_id__in=user_ids, status='completed',
+        completed_at__gte=start_of_day(start), completed_at__lt=start_of_day(end) + timedelta(days=1),
+    ).values('created_by_id').annotate(count=Count('id'), revenue=Sum('price')).order_by()
+    for row in jobs:
+        stats[row['created_by_id']]['jobs_completed'] = row['count']
+        stats[row['created_by_id']]['revenue'] = row['revenue'] or Decimal('0')
+
+    activities = ActivityDailyRollup.objects.filter(
+        user_id__in=user_ids, date__gte=start, date__lte=end,
+    ).values('user_id').annotate(
+        total=Sum('count'), connected=Sum('count', filter=Q(outcome='completed'), default=0),
+    ).order_by()
+    for row in activities:
+        stats[row['user_id']]['activities'] = row['total']
+        stats[row['user_id']]['calls_connected'] = row['connected']
+
+    overdue = Reminder.objects.filter(
+        created_by_id__in=user_ids, status='pending', reminder_date__lt=end,
+    ).values('created_by_id').annotate(count=Count('id')).order_by()
+    for row in overdue:
+        stats[row['created_by_id']]['overdue_reminders'] = row['count']
+
+    return stats
+
+
+def render_summary(profile, stats, start, end):
+    """Build the plain-text summary email for one user."""
+    user = profile.user
+    lines = [
+        f"Hi {user.first_name or user.username},",
+        '',
+        f"Your week, {start:%b %d} - {end:%b %d}:",
+        f"  Jobs completed:     {stats['jobs_completed']}",
+        f"  Revenue:            ${stats['revenue']:,.2f}",
+        f"  Activities logged:  {stats['activities']}",
+        f"  Calls connected:    {stats['calls_connected']}",
+        f"  Overdue reminders:  {stats['overdue_reminders']}",
+    ]
+    return EmailMessage(
+        subject=f"Your weekly summary ({start:%b %d} - {end:%b %d})",
+        body='\n'.join(lines),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[profile.summary_email],
+    )
+
+
+def send_weekly_summaries(now=None, connection=None, batch_size=BATCH_SIZE):
+    """Send every summary due at ``now`` (default: the current local time). Returns the count sent."""
+    now = timezone.localtime(now)
+    end = now.date()
+    start = end - timedelta(days=6)
+
+    profiles = [p for p in due_profiles(now) if p.summary_email]
+    if not profiles:
+        return 0
+    stats = collect_stats([p.user_id for p in profiles], start, end)
+
+    messages = []
+    profile_for = {}
+    for profile in profiles:
+        message = render_summary(profile, stats[profile.user_id], start, end)
+        messages.append(message)
+        profile_for[id(message)] = profile.pk
+
+    def record(batch):
+        UserProfile.objects.filter(pk__in=[profile_for[id(m)] for m in batch]).update(
+            weekly_summary_sent_on=end
+        )
+
+    return send_in_batches(messages, batch_size=batch_size, connection=connection, on_sent=record)
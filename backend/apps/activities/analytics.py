@@ -0,0 +1,131 @@
+"""Rep productivity and outcome funnel analytics.
+
+Volumes and connect rates come from the daily activity rollup, so they
+cost the same no matter how much history there is. Only the
+interested-to-job funnel reads raw activities, and only those with an
+``interested`` outcome in the requested range.
+"""
+from datetime import timedelta
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum, Window
+from django.db.models.functions import Rank, TruncMonth, TruncWeek
+from .models import Activity, ActivityDailyRollup
+from .rollup import start_of_day
+
+
+BUCKETS = {
+    'day': F('date'),
+    'week': TruncWeek('date'),
+    'month': TruncMonth('date'),
+}
+
+# An interested outcome counts as won if the customer gets a job within this window
+CONVERSION_WINDOW_DAYS = 90
+
+
+def _rate(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def _outcome_totals():
+    return {
+        'total': Sum('count'),
+        'minutes': Sum('total_minutes'),
+        'completed': Sum('count', filter=Q(outcome='completed'), default=0),
+        'no_answer': Sum('count', filter=Q(outcome='no_answer'), default=0),
+        'interested': Sum('count', filter=Q(outcome='interested'), default=0),
+    }
+
+
+def productivity_report(start_date, end_date, bucket='day', user_id=None, activity_type_id=None):
+    """
+    Return ``{'rows': [...], 'reps': [...]}``.
+
+    ``rows`` has one entry per period, rep and activity type with outcome
+    counts, connect rate (completed / (completed + no answer)) and the rep's
+    rank by volume within the period. ``reps`` summarizes each rep over the
+    whole range, including calls per active day and how many interested
+    outcomes turned into jobs.
+    """
+    rollups = ActivityDailyRollup.objects.filter(date__gte=start_date, date__lte=end_date)
+    if user_id:
+        rollups = rollups.filter(user_id=user_id)
+    if activity_type_id:
+        rollups = rollups.filter(activity_type_id=activity_type_id)
+
+    rows = rollups.annotate(period=BUCKETS[bucket]).values(
+        'period', 'user_id', 'user__username', 'user__first_name', 'user__last_name',
+        'activity_type_id', 'activity_type__display_name',
+    ).annotate(**_outcome_totals()).filter(total__gt=0).annotate(
+        rank=Window(Rank(), partition_by=[F('period'), F('activity_type_id')], order_by=F('total').desc()),
+    ).order_by('period', 'activity_type_id', 'rank', 'user_id')
+
+    reps = rollups.values(
+        'user_id', 'user__username', 'user__first_name', 'user__last_name',
+    ).annotate(
+        **_outcome_totals(),
+        active_days=Count('date', distinct=True, filter=Q(count__gt=0)),
+    ).filter(total__gt=0).order_by('-total', 'user_id')
+
+    won = interested_conversions(start_date, end_date, user_id, activity_type_id)
+
+    return {
+        'rows': [
+            {
+                'period': row['period'],
+                'activity_type': row['activity_type_id'],
+                'activity_type_name': row['activity_type__display_name'],
+                **_rep_fields(row),
+                'rank': row['rank'],
+            }
+            for row in rows
+        ],
+        'reps': [
+            {
+                **_rep_fields(rep),
+                'active_days': rep['active_days'],
+                'per_active_day': round(rep['total'] / rep['active_days'], 2) if rep['active_days'] else 0,
+                'interested_won': won.get(rep['user_id'], 0),
+                'interested_win_rate': _rate(won.get(rep['user_id'], 0), rep['interested']),
+            }
+            for rep in reps
+        ],
+    }
+
+
+def _rep_fields(row):
+    full_name = f"{row['user__first_name']} {row['user__last_name']}".strip()
+    return {
+        'user': row['user_id'],
+        'user_name': full_name or row['user__username'] or '',
+        'total': row['total'],
+        'minutes': row['minutes'],
+        'completed': row['completed'],
+        'no_answer': row['no_answer'],
+        'interested': row['interested'],
+        'connect_rate': _rate(row['completed'], row['completed'] + row['no_answer']),
+    }
+
+
+def interested_conversions(start_date, end_date, user_id=None, activity_type_id=None):
+    """Map rep id -> interested outcomes followed by a job for that customer within the window."""
+    from apps.services.models import Job
+
+    followed_by_job = Job.objects.filter(
+        customer=OuterRef('customer'),
+        created_at__gte=OuterRef('activity_datetime'),
+        created_at__lt=OuterRef('activity_datetime') + timedelta(days=CONVERSION_WINDOW_DAYS),
+    )
+    interested = Activity.objects.filter(
+        outcome='interested',
+        activity_datetime__gte=start_of_day(start_date),
+        activity_datetime__lt=start_of_day(end_date) + timedelta(days=1),
+    )
+    if user_id:
+        interested = interested.filter(created_by_id=user_id)
+    if activity_type_id:
+        interested = interested.filter(activity_type_id=activity_type_id)
+
+    rows = interested.filter(Exists(followed_by_job)).values('created_by_id').annotate(
+        won=Count('id')
+    ).order_by()
+    return {row['created_by_id']: row['won'] for row in rows}
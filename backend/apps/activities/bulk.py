@@ -0,0 +1,152 @@
+"""Batch activity logging for call blitzes.
+
+A rep can log a whole afternoon of calls in one request: items are
+validated with the same rules as a single create, then the activities and
+their follow-up reminders are written with ``bulk_create`` and the
+customers' call dates with one ``bulk_update``. Bulk writes skip model
+signals, so the rollup, call queues and reminder dashboard cache are
+updated explicitly.
+"""
+from collections import defaultdict
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from apps.customers.models import Customer
+from apps.services.catalog import activity_types
+from .models import ActivityType, Activity
+from .serializers import ActivityCreateSerializer
+from . import rollup
+
+
+MAX_ITEMS = 500
+
+
+def _as_pk(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolve the PK from ``context['preloaded'][field_name]`` instead of one query per item."""
+
+    def to_internal_value(self, data):
+        objects = self.context.get('preloaded', {}).get(self.field_name)
+        if objects is None:
+            return super().to_internal_value(data)
+        pk = _as_pk(data)
+        if pk is None:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in objects:
+            self.fail('does_not_exist', pk_value=data)
+        return objects[pk]
+
+
+class BulkActivityItemSerializer(ActivityCreateSerializer):
+    customer = PreloadedPrimaryKeyRelatedField(queryset=Customer.objects.all())
+    activity_type = PreloadedPrimaryKeyRelatedField(queryset=ActivityType.objects.all())
+
+
+def preload_related(items):
+    """Load every customer referenced by ``items`` in one query; activity types come from the catalog."""
+    customer_ids = {_as_pk(item.get('customer')) for item in items} - {None}
+    type_ids = {_as_pk(item.get('activity_type')) for item in items} - {None}
+    return {
+        'customer': Customer.objects.in_bulk(customer_ids),
+        'activity_type': activity_types.in_bulk(type_ids),
+    }
+
+
+def validate_items(items, context):
+    """Return ``(valid, errors)``: lists of ``(index, validated_data)`` and ``(index, errors)``."""
+    context = {**context, 'preloaded': preload_related(items)}
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        serializer = BulkActivityItemSerializer(data=item, context=context)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append((index, serializer.errors))
+    return valid, errors
+
+
+def log_activities(valid, user):
+    """
+    Write validated items in one transaction.
+
+    Mirrors ``ActivityCreateSerializer.create``: each activity may get a
+    follow-up reminder, which also becomes the customer's next call date;
+    when several items hit one customer the last item's reminder wins.
+    Returns ``{index: {'id': ..., 'reminder_id': ...}}``.
+    """
+    from apps.customers.call_queue import mark_called
+    from apps.reminders.models import Reminder, add_business_days
+    from apps.reminders.summary import invalidate_summaries
+
+    today = timezone.now().date()
+    activities = []
+    reminder_days = []
+    for index, data in valid:
+        data = dict(data)
+        create_reminder = data.pop('create_reminder', True)
+        days = data.pop('reminder_days', 30)
+        activity = Activity(created_by=user, **data)
+        # Activity.save() isn't called by bulk_create, so apply its default here
+        if activity.duration_minutes is None:
+            activity.duration_minutes = activity.activity_type.default_duration_minutes
+        activities.append(activity)
+        reminder_days.append(days if create_reminder else None)
+
+    with transaction.atomic():
+        Activity.objects.bulk_create(activities)
+
+        reminders = {}
+        for activity, days in zip(activities, reminder_days):
+            if days is None:
+                continue
+            type_name = activity.activity_type.display_name
+            reminders[activity.pk] = Reminder(
+                customer_id=activity.customer_id,
+                activity=activity,
+                title=f"Follow up: {type_name}",
+                description=f"Follow up on {type_name} from {activity.activity_datetime.strftime('%Y-%m-%d')}",
+                reminder_date=add_business_days(today, days),
+                created_by=user,
+            )
+        Reminder.objects.bulk_create(reminders.values())
+
+        last_call = {}
+        next_call = {}
+        called_on = defaultdict(set)
+        for activity in activities:
+            day = timezone.localtime(activity.activity_datetime).date()
+            called_on[day].add(activity.customer_id)
+            if activity.customer_id not in last_call or day > last_call[activity.customer_id]:
+                last_call[activity.customer_id] = day
+            if activity.pk in reminders:
+                next_call[activity.customer_id] = reminders[activity.pk].reminder_date
+
+        customers = list(Customer.objects.select_for_update().filter(pk__in=last_call).order_by('pk'))
+        now = timezone.now()
+        for customer in customers:
+            if customer.last_call_date is None or last_call[customer.pk] > customer.last_call_date:
+                customer.last_call_date = last_call[customer.pk]
+            if customer.pk in next_call:
+                customer.next_call_date = next_call[customer.pk]
+            customer.updated_at = now
+        Customer.objects.bulk_update(customers, ['last_call_date', 'next_call_date', 'updated_at'])
+
+        rollup.apply_activities(activities)
+        for day, customer_ids in called_on.items():
+            mark_called(customer_ids, day)
+
+    if reminders:
+        invalidate_summaries()
+
+    return {
+        index: {'id': activity.pk, 'reminder_id': getattr(reminders.get(activity.pk), 'pk', None)}
+        for (index, _), activity in zip(valid, activities)
+    }
@@ -0,0 +1,16 @@
+"""Rebuild the daily activity rollup, e.g. after first deploying it or a bulk import."""
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+from apps.activities.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily activity rollup from the activity log'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=parse_date, help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end', type=parse_date, help='Last day to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollup(options['start'], options['end'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} rollup rows'))
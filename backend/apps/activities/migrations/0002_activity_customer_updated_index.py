@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['customer', 'updated_at', 'id'], name='activities__custome_ee4a16_idx'),
+        ),
+    ]
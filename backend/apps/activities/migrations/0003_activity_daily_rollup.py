@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0002_activity_customer_updated_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('outcome', models.CharField(choices=[('completed', 'Completed'), ('no_answer', 'No Answer'), ('left_message', 'Left Message'), ('callback_requested', 'Callback Requested'), ('not_interested', 'Not Interested'), ('interested', 'Interested'), ('follow_up_needed', 'Follow Up Needed'), ('other', 'Other')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('total_minutes', models.IntegerField(default=0)),
+                ('activity_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='activities.activitytype')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date', 'activity_type', 'user', 'outcome'], name='activities__date_f48943_idx'), models.Index(fields=['user', 'date'], name='activities__user_id_032ad7_idx')],
+            },
+        ),
+    ]
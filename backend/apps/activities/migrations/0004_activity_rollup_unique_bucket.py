@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    """Fold rows that share a bucket key into one so the constraint can be added."""
+    ActivityDailyRollup = apps.get_model('activities', 'ActivityDailyRollup')
+    key = ('date', 'activity_type_id', 'user_id', 'outcome')
+    duplicates = (
+        ActivityDailyRollup.objects.filter(user__isnull=False).values(*key)
+        .annotate(rows=Count('id'), keep=Min('id'), total=Sum('count'), minutes=Sum('total_minutes'))
+        .filter(rows__gt=1).order_by()
+    )
+    for row in duplicates:
+        bucket = ActivityDailyRollup.objects.filter(**{field: row[field] for field in key})
+        bucket.exclude(pk=row['keep']).delete()
+        bucket.update(count=row['total'], total_minutes=row['minutes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0003_activity_daily_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='activitydailyrollup',
+            name='activities__date_f48943_idx',
+        ),
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='activitydailyrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'activity_type', 'user', 'outcome'), name='unique_activity_rollup_bucket'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
 
 
 class ActivityType(models.Model):
@@ -72,6 +74,7 @@ class Activity(models.Model):
         indexes = [
             models.Index(fields=['customer', '-activity_datetime']),
             models.Index(fields=['-activity_datetime']),
+            models.Index(fields=['customer', 'updated_at', 'id']),
         ]
 
     def __str__(self):
@@ -82,3 +85,66 @@ class Activity(models.Model):
         if self.duration_minutes is None and self.activity_type:
             self.duration_minutes = self.activity_type.default_duration_minutes
         super().save(*args, **kwargs)
+
+
+class ActivityDailyRollup(models.Model):
+    """Pre-aggregated activity counts per day, type, rep and outcome.
+
+    Maintained incrementally by the Activity signals below; rebuild with
+    ``manage.py backfill_activity_rollup``. Read with Sum(), since a deleted
+    rep's rows can leave more than one row per key.
+    """
+    date = models.DateField()
+    activity_type = models.ForeignKey(ActivityType, on_delete=models.CASCADE, related_name='daily_rollups')
+    user = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='activity_rollups'
+    )
+    outcome = models.CharField(max_length=20, choices=Activity.OUTCOME_CHOICES)
+    count = models.IntegerField(default=0)
+    total_minutes = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            # NULLs are distinct, so a deleted rep's buckets may still share a key
+            models.UniqueConstraint(
+                fields=['date', 'activity_type', 'user', 'outcome'], name='unique_activity_rollup_bucket',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.activity_type_id}/{self.user_id}/{self.outcome}: {self.count}"
+
+
+@receiver(post_save, sender=ActivityType)
+@receiver(post_delete, sender=ActivityType)
+def invalidate_activity_type_catalog(sender, **kwargs):
+    from apps.services.catalog import activity_types
+    activity_types.invalidate_on_commit()
+
+
+@receiver(pre_save, sender=Activity)
+def remember_rollup_key(sender, instance, **kwargs):
+    """Capture the pre-edit rollup bucket so an update can move the activity between buckets."""
+    if instance.pk:
+        from .rollup import load_rollup_entry
+        instance._rollup_previous = load_rollup_entry(instance.pk)
+
+
+@receiver(post_save, sender=Activity)
+def update_rollup_on_save(sender, instance, **kwargs):
+    from .rollup import apply_entry, rollup_entry
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous:
+        apply_entry(previous, sign=-1)
+    apply_entry(rollup_entry(instance))
+    instance._rollup_previous = None
+
+
+@receiver(post_delete, sender=Activity)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    from .rollup import apply_entry, rollup_entry
+    apply_entry(rollup_entry(instance), sign=-1)
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ActivityTimelinePagination(CursorPagination):
+    """Newest-first cursor pagination; stable under inserts, unlike page numbers."""
+    ordering = ('-activity_datetime', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
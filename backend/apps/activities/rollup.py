@@ -0,0 +1,114 @@
+"""Maintenance of the ActivityDailyRollup table."""
+from collections import Counter
+from datetime import datetime, time
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import Activity, ActivityDailyRollup
+
+
+def rollup_key(activity_datetime, activity_type_id, user_id, outcome):
+    # Days are bucketed in the site's local time zone, matching the UI's notion of "today"
+    return (timezone.localtime(activity_datetime).date(), activity_type_id, user_id, outcome)
+
+
+def start_of_day(value):
+    """
+    Return the aware datetime at which a local date (or ISO date string) begins.
+
+    Raises ValueError for a string that isn't a valid YYYY-MM-DD date.
+    """
+    day = parse_date(value) if isinstance(value, str) else value
+    if day is None:
+        raise ValueError(f'Invalid date: {value!r}')
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def rollup_entry(activity):
+    """Return (key, minutes) for an Activity instance."""
+    key = rollup_key(
+        activity.activity_datetime, activity.activity_type_id, activity.created_by_id, activity.outcome,
+    )
+    return key, activity.duration_minutes or 0
+
+
+def load_rollup_entry(pk):
+    """Return the stored (key, minutes) for an activity, or None if it no longer exists."""
+    row = Activity.objects.filter(pk=pk).values_list(
+        'activity_datetime', 'activity_type_id', 'created_by_id', 'outcome', 'duration_minutes',
+    ).first()
+    if row is None:
+        return None
+    return rollup_key(*row[:4]), row[4] or 0
+
+
+def apply_delta(key, count, minutes):
+    """Add ``count``/``minutes`` to one rollup bucket, creating it if needed."""
+    day, activity_type_id, user_id, outcome = key
+    bucket = ActivityDailyRollup.objects.filter(
+        date=day, activity_type_id=activity_type_id, user_id=user_id, outcome=outcome,
+    )
+    pk = bucket.values_list('pk', flat=True).first()
+    if pk is None:
+        try:
+            with transaction.atomic():
+                ActivityDailyRollup.objects.create(
+                    date=day, activity_type_id=activity_type_id, user_id=user_id,
+                    outcome=outcome, count=count, total_minutes=minutes,
+                )
+            return
+        except IntegrityError:
+            pk = bucket.values_list('pk', flat=True).first()
+    ActivityDailyRollup.objects.filter(pk=pk).update(
+        count=F('count') + count, total_minutes=F('total_minutes') + minutes,
+    )
+
+
+def apply_entry(entry, sign=1):
+    key, minutes = entry
+    apply_delta(key, sign, sign * minutes)
+
+
+def apply_activities(activities, sign=1):
+    """Fold many activities into the rollup with one write per distinct bucket (for bulk paths)."""
+    counts = Counter()
+    minutes = Counter()
+    for activity in activities:
+        key, activity_minutes = rollup_entry(activity)
+        counts[key] += 1
+        minutes[key] += activity_minutes
+    for key, count in counts.items():
+        apply_delta(key, sign * count, sign * minutes[key])
+
+
+def rebuild_rollup(start_date=None, end_date=None):
+    """Recompute the rollup from the raw Activity table for an optional date range."""
+    rollups = ActivityDailyRollup.objects.all()
+    activities = Activity.objects.annotate(day=TruncDate('activity_datetime'))
+    if start_date:
+        rollups = rollups.filter(date__gte=start_date)
+        activities = activities.filter(day__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(date__lte=end_date)
+        activities = activities.filter(day__lte=end_date)
+
+    rows = activities.values('day', 'activity_type_id', 'created_by_id', 'outcome').annotate(
+        total=Count('id'), minutes=Coalesce(Sum('duration_minutes'), 0),
+    ).order_by()
+
+    with transaction.atomic():
+        rollups.delete()
+        created = ActivityDailyRollup.objects.bulk_create(
+            [
+                ActivityDailyRollup(
+                    date=row['day'], activity_type_id=row['activity_type_id'],
+                    user_id=row['created_by_id'], outcome=row['outcome'],
+                    count=row['total'], total_minutes=row['minutes'],
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+    return len(created)
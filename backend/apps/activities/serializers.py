@@ -69,5 +69,5 @@ class ActivityCreateSerializer(serializers.ModelSerializer):
             )
             customer.next_call_date = reminder_date
 
-        customer.save()
+        customer.save(update_fields=['last_call_date', 'next_call_date', 'updated_at'])
         return activity
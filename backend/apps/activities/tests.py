@@ -1,3 +1,250 @@
+from io import StringIO
+from datetime import date, datetime
 from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.customers.models import Customer
+from apps.activities.models import ActivityType, Activity, ActivityDailyRollup
+from apps.activities.rollup import rebuild_rollup
+from apps.accounts import business_calendar
 
-# Create your tests here.
+
+def local_datetime(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class ActivityRollupTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rep', password='testpass123')
+        self.customer = Customer.objects.create(business_name='Acme Lawn', created_by=self.user)
+        self.call = ActivityType.objects.create(name='call', display_name='Call', default_duration_minutes=5)
+        self.visit = ActivityType.objects.create(name='visit', display_name='Visit', default_duration_minutes=30)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _log(self, activity_type, when, outcome='completed', **extra):
+        return Activity.objects.create(
+            customer=self.customer, activity_type=activity_type, activity_datetime=when,
+            outcome=outcome, created_by=self.user, **extra,
+        )
+
+    def _bucket(self, **filters):
+        return ActivityDailyRollup.objects.filter(**filters).aggregate(
+            count=Sum('count'), minutes=Sum('total_minutes')
+        )
+
+    def test_create_update_delete_keep_rollup_in_step(self):
+        activity = self._log(self.call, local_datetime(2026, 3, 2, 9))
+        self._log(self.call, local_datetime(2026, 3, 2, 23, 30), duration_minutes=10)
+        self.assertEqual(
+            self._bucket(date=date(2026, 3, 2), activity_type=self.call),
+            {'count': 2, 'minutes': 15},
+        )
+
+        activity.outcome = 'no_answer'
+        activity.activity_datetime = local_datetime(2026, 3, 3, 9)
+        activity.save()
+        self.assertEqual(self._bucket(date=date(2026, 3, 2))['count'], 1)
+        self.assertEqual(self._bucket(date=date(2026, 3, 3), outcome='no_answer')['count'], 1)
+
+        activity.delete()
+        self.assertEqual(self._bucket(date=date(2026, 3, 3))['count'], 0)
+
+    def test_backfill_matches_incremental(self):
+        for day in (1, 1, 2, 5):
+            self._log(self.call, local_datetime(2026, 3, day, 10))
+        self._log(self.visit, local_datetime(2026, 3, 2, 14), outcome='interested')
+        incremental = sorted(
+            ActivityDailyRollup.objects.filter(count__gt=0).values_list(
+                'date', 'activity_type_id', 'user_id', 'outcome', 'count', 'total_minutes'
+            )
+        )
+
+        ActivityDailyRollup.objects.all().delete()
+        call_command('backfill_activity_rollup', stdout=StringIO())
+        rebuilt = sorted(
+            ActivityDailyRollup.objects.values_list(
+                'date', 'activity_type_id', 'user_id', 'outcome', 'count', 'total_minutes'
+            )
+        )
+        self.assertEqual(rebuilt, incremental)
+
+        # A ranged rebuild only touches rows inside the range
+        self.assertEqual(rebuild_rollup(date(2026, 3, 2), date(2026, 3, 2)), 2)
+        self.assertEqual(ActivityDailyRollup.objects.aggregate(total=Sum('count'))['total'], 5)
+
+    def test_by_type_reads_rollup(self):
+        self._log(self.call, local_datetime(2026, 3, 1, 10))
+        self._log(self.call, local_datetime(2026, 3, 2, 10))
+        self._log(self.visit, local_datetime(2026, 3, 2, 11))
+
+        resp = self.client.get('/activities/by_type/', {'start_date': '2026-03-02', 'end_date': '2026-03-02'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted((row['activity_type__display_name'], row['count']) for row in resp.data),
+            [('Call', 1), ('Visit', 1)],
+        )
+
+        # Rollup rows drive the report, not the raw activity table
+        ActivityDailyRollup.objects.filter(activity_type=self.call).update(count=7)
+        resp = self.client.get('/activities/by_type/')
+        self.assertEqual(resp.data[0]['activity_type__display_name'], 'Call')
+        self.assertEqual(resp.data[0]['count'], 14)
+
+    def test_date_range_filter_uses_local_days(self):
+        self._log(self.call, local_datetime(2026, 3, 2, 0, 15))
+        self._log(self.call, local_datetime(2026, 3, 2, 23, 45))
+        self._log(self.call, local_datetime(2026, 3, 3, 0, 5))
+
+        resp = self.client.get('/activities/', {'start_date': '2026-03-02', 'end_date': '2026-03-02'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['count'], 2)
+
+    def test_invalid_dates_are_rejected(self):
+        for params in ({'start_date': 'yesterday'}, {'end_date': '2026-02-30'}):
+            self.assertEqual(self.client.get('/activities/', params).status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(
+                self.client.get('/activities/by_type/', params).status_code, status.HTTP_400_BAD_REQUEST
+            )
+
+    def test_rollup_bucket_is_unique(self):
+        self._log(self.call, local_datetime(2026, 3, 2, 9))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ActivityDailyRollup.objects.create(
+                date=date(2026, 3, 2), activity_type=self.call, user=self.user, outcome='completed', count=1,
+            )
+
+
+class ActivityBulkLogTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rep', password='testpass123')
+        self.call = ActivityType.objects.create(name='call', display_name='Call', default_duration_minutes=5)
+        self.acme = Customer.objects.create(business_name='Acme Lawn', created_by=self.user)
+        self.birch = Customer.objects.create(
+            business_name='Birch Tree Co', created_by=self.user, last_call_date=date(2030, 1, 1),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _item(self, customer, **overrides):
+        item = {
+            'customer': customer.pk, 'activity_type': self.call.pk,
+            'activity_datetime': '2026-03-02T10:00:00-06:00', 'outcome': 'no_answer',
+        }
+        item.update(overrides)
+        return item
+
+    def test_bulk_log_creates_activities_reminders_and_call_dates(self):
+        from apps.reminders.models import Reminder
+
+        business_calendar.get_calendar()  # warm the per-process holiday table
+        items = [
+            self._item(self.acme),
+            self._item(self.acme, activity_datetime='2026-03-02T15:00:00-06:00', reminder_days=5),
+            self._item(self.birch, create_reminder=False),
+            self._item(self.birch, activity_type=9999),
+            self._item(self.acme, outcome='bogus'),
+        ]
+        with self.assertNumQueries(13):
+            resp = self.client.post('/activities/bulk_log/', {'activities': items}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data['created'], 3)
+        self.assertEqual(
+            [r['status'] for r in resp.data['results']],
+            ['created', 'created', 'created', 'invalid', 'invalid'],
+        )
+        self.assertIn('activity_type', resp.data['results'][3]['errors'])
+        self.assertIn('outcome', resp.data['results'][4]['errors'])
+        self.assertIsNone(resp.data['results'][2]['reminder_id'])
+
+        self.assertEqual(Activity.objects.count(), 3)
+        self.assertEqual(Activity.objects.filter(duration_minutes=5).count(), 3)
+        self.assertEqual(Reminder.objects.filter(customer=self.acme).count(), 2)
+
+        self.acme.refresh_from_db()
+        self.birch.refresh_from_db()
+        self.assertEqual(self.acme.last_call_date, date(2026, 3, 2))
+        last_reminder = Reminder.objects.get(pk=resp.data['results'][1]['reminder_id'])
+        self.assertEqual(self.acme.next_call_date, last_reminder.reminder_date)
+        # A later call date already on file is kept
+        self.assertEqual(self.birch.last_call_date, date(2030, 1, 1))
+
+        self.assertEqual(
+            ActivityDailyRollup.objects.filter(date=date(2026, 3, 2)).aggregate(total=Sum('count'))['total'], 3
+        )
+
+    def test_bulk_log_rejects_all_invalid(self):
+        resp = self.client.post(
+            '/activities/bulk_log/', {'activities': [{**self._item(self.acme), 'customer': 0}]}, format='json'
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Activity.objects.count(), 0)
+
+        resp = self.client.post('/activities/bulk_log/', {'activities': []}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProductivityReportTest(TestCase):
+
+    def setUp(self):
+        self.ann = User.objects.create_user(username='ann', first_name='Ann', last_name='Lee')
+        self.bob = User.objects.create_user(username='bob')
+        self.call = ActivityType.objects.create(name='call', display_name='Call', default_duration_minutes=5)
+        self.customer = Customer.objects.create(business_name='Acme Lawn', created_by=self.ann)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.ann)
+
+    def _log(self, user, day, outcome):
+        return Activity.objects.create(
+            customer=self.customer, activity_type=self.call, created_by=user,
+            activity_datetime=local_datetime(2026, 3, day, 10), outcome=outcome,
+        )
+
+    def test_volumes_connect_rates_and_funnel(self):
+        from apps.services.models import ServiceCategory, Service, Job
+
+        for outcome in ('completed', 'completed', 'no_answer', 'interested'):
+            self._log(self.ann, 2, outcome)
+        self._log(self.ann, 3, 'no_answer')
+        self._log(self.bob, 2, 'no_answer')
+        service = Service.objects.create(category=ServiceCategory.objects.create(name='Lawn'), name='Mow')
+        job = Job.objects.create(customer=self.customer, service=service, scheduled_date=date(2026, 3, 10), price=50)
+        Job.objects.filter(pk=job.pk).update(created_at=local_datetime(2026, 3, 5, 9))
+
+        resp = self.client.get('/activities/productivity/', {
+            'start_date': '2026-03-01', 'end_date': '2026-03-31',
+        })
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        day_two = [row for row in resp.data['rows'] if row['period'] == date(2026, 3, 2)]
+        self.assertEqual([(row['user_name'], row['total'], row['rank']) for row in day_two],
+                         [('Ann Lee', 4, 1), ('bob', 1, 2)])
+        self.assertEqual(day_two[0]['connect_rate'], round(2 / 3, 4))
+
+        ann = resp.data['reps'][0]
+        self.assertEqual((ann['user'], ann['total'], ann['active_days']), (self.ann.pk, 5, 2))
+        self.assertEqual(ann['per_active_day'], 2.5)
+        self.assertEqual(ann['connect_rate'], 0.5)
+        self.assertEqual((ann['interested'], ann['interested_won'], ann['interested_win_rate']), (1, 1, 1.0))
+        self.assertEqual(resp.data['reps'][1]['connect_rate'], 0.0)
+
+    def test_monthly_bucket_and_validation(self):
+        self._log(self.ann, 2, 'completed')
+        self._log(self.ann, 20, 'completed')
+        resp = self.client.get('/activities/productivity/', {
+            'start_date': '2026-03-01', 'end_date': '2026-03-31', 'bucket': 'month', 'user': self.ann.pk,
+        })
+        self.assertEqual([(row['period'], row['total']) for row in resp.data['rows']], [(date(2026, 3, 1), 2)])
+
+        resp = self.client.get('/activities/productivity/', {'bucket': 'hour'})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        for params in ({'user': 'ann'}, {'activity_type': '1.5'}):
+            resp = self.client.get('/activities/productivity/', params)
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,10 +1,14 @@
-from rest_framework import viewsets, filters
+from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Sum
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
-from .models import ActivityType, Activity
+from .models import ActivityType, Activity, ActivityDailyRollup
+from .rollup import start_of_day
 from .serializers import ActivityTypeSerializer, ActivitySerializer, ActivityCreateSerializer
 
 
@@ -40,10 +44,17 @@ class ActivityViewSet(viewsets.ModelViewSet):
         start_date = self.request.query_params.get('start_date', None)
         end_date = self.request.query_params.get('end_date', None)
 
-        if start_date:
-            queryset = queryset.filter(activity_datetime__date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(activity_datetime__date__lte=end_date)
+        # Compare against local-day boundaries rather than casting the column
+        # to a date, so the activity_datetime index can be used
+        try:
+            if start_date:
+                queryset = queryset.filter(activity_datetime__gte=start_of_day(start_date))
+            if end_date:
+                queryset = queryset.filter(
+                    activity_datetime__lt=start_of_day(end_date) + timedelta(days=1)
+                )
+        except ValueError:
+            raise ValidationError({'error': 'Dates must be YYYY-MM-DD'})
 
         return queryset
 
@@ -57,23 +68,96 @@ class ActivityViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def by_type(self, request):
-        """Get activity counts grouped by type."""
-        from django.db.models import Count
-
+        """Get activity counts grouped by type (read from the daily rollup)."""
         # Optional date range
         start_date = request.query_params.get('start_date', None)
         end_date = request.query_params.get('end_date', None)
 
-        queryset = Activity.objects.all()
+        try:
+            start_date = start_of_day(start_date).date() if start_date else None
+            end_date = start_of_day(end_date).date() if end_date else None
+        except ValueError:
+            return Response({'error': 'Dates must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = ActivityDailyRollup.objects.all()
         if start_date:
-            queryset = queryset.filter(activity_datetime__date__gte=start_date)
+            queryset = queryset.filter(date__gte=start_date)
         if end_date:
-            queryset = queryset.filter(activity_datetime__date__lte=end_date)
+            queryset = queryset.filter(date__lte=end_date)
 
         counts = queryset.values(
             'activity_type__display_name',
             'activity_type__icon',
             'activity_type__color'
-        ).annotate(count=Count('id')).order_by('-count')
+        ).annotate(count=Sum('count')).filter(count__gt=0).order_by('-count')
 
         return Response(list(counts))
+
+    @action(detail=False, methods=['get'])
+    def productivity(self, request):
+        """
+        Rep productivity and outcome funnel, read from the daily rollup.
+
+        Query params: `start_date`/`end_date` (default: the last 30 days),
+        `bucket` (day, week or month), optional `user` and `activity_type`.
+        """
+        from .analytics import BUCKETS, productivity_report
+
+        today = timezone.localdate()
+        try:
+            start_date = parse_date(request.query_params.get('start_date', '')) or today - timedelta(days=29)
+            end_date = parse_date(request.query_params.get('end_date', '')) or today
+        except ValueError:
+            return Response({'error': 'Dates must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in BUCKETS:
+            return Response(
+                {'error': f"bucket must be one of: {', '.join(BUCKETS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ids = {}
+        for param in ('user', 'activity_type'):
+            value = request.query_params.get(param)
+            if value:
+                if not value.isdigit():
+                    return Response({'error': f'{param} must be an ID'}, status=status.HTTP_400_BAD_REQUEST)
+                ids[f'{param}_id'] = int(value)
+
+        report = productivity_report(start_date, end_date, bucket, **ids)
+        return Response({'start_date': start_date, 'end_date': end_date, 'bucket': bucket, **report})
+
+    @action(detail=False, methods=['post'])
+    def bulk_log(self, request):
+        """
+        Log a batch of activities (`activities`: list of create payloads).
+
+        Each item is validated like a single create. Valid items are written
+        in one transaction; the response lists a result per item, in order.
+        """
+        from .bulk import MAX_ITEMS, log_activities, validate_items
+
+        items = request.data.get('activities')
+        if not isinstance(items, list) or not items or not all(isinstance(i, dict) for i in items):
+            return Response(
+                {'error': 'activities must be a non-empty list of objects'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > MAX_ITEMS:
+            return Response(
+                {'error': f'At most {MAX_ITEMS} activities per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        valid, errors = validate_items(items, self.get_serializer_context())
+        created = log_activities(valid, request.user) if valid else {}
+
+        results = [None] * len(items)
+        for index, result in created.items():
+            results[index] = {'status': 'created', **result}
+        for index, item_errors in errors:
+            results[index] = {'status': 'invalid', 'errors': item_errors}
+        return Response(
+            {'results': results, 'created': len(created), 'invalid': len(errors)},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
@@ -0,0 +1,179 @@
+"""Precomputed, prioritized call queues ("who to call next").
+
+Each morning a queue is built per rep by merging three ranked streams -
+customers due for a call, pending reminders and open leads - with a heap
+merge. Entries are stored in CallQueueEntry so serving the next target is
+an index seek, and logging an activity marks that customer as called.
+
+A rep's targets are the customers, reminders and leads they created.
+"""
+import heapq
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from .models import Customer, Lead, CallQueueEntry
+
+
+MAX_QUEUE_SIZE = 200
+MAX_OVERDUE_DAYS = 30
+
+CUSTOMER_DUE_PRIORITY = 50
+REMINDER_PRIORITY = {'high': 60, 'medium': 40, 'low': 20}
+LEAD_SCORE_WEIGHT = 10
+LEAD_STAGE_BONUS = {'interested': 8, 'quoted': 10}
+OPEN_LEAD_STATUSES = ['new', 'contacted', 'interested', 'quoted']
+
+# How the outcome of the last call changes a customer's urgency
+OUTCOME_ADJUSTMENTS = {
+    'callback_requested': 15,
+    'interested': 10,
+    'follow_up_needed': 8,
+    'no_answer': 5,
+    'left_message': 3,
+    'not_interested': -20,
+}
+
+
+class CallQueueBuilder:
+    """Build one rep's queue for one day."""
+
+    def __init__(self, user, queue_date=None):
+        self.user = user
+        self.queue_date = queue_date or timezone.localdate()
+
+    def _days_overdue(self, due):
+        return min(max((self.queue_date - due).days, 0), MAX_OVERDUE_DAYS)
+
+    def customer_stream(self):
+        """Customers whose next call date has arrived, adjusted by their last call outcome."""
+        from apps.activities.models import Activity
+
+        last_outcome = Activity.objects.filter(customer=OuterRef('pk')).order_by('-activity_datetime')
+        rows = Customer.objects.filter(
+            is_active=True, created_by=self.user, next_call_date__lte=self.queue_date,
+        ).exclude(last_call_date=self.queue_date).annotate(
+            last_outcome=Subquery(last_outcome.values('outcome')[:1])
+        ).values_list('id', 'next_call_date', 'last_outcome')
+
+        items = []
+        for pk, due, outcome in rows:
+            days = self._days_overdue(due)
+            reasons = [f'overdue {days}d' if days else 'due today']
+            if outcome:
+                reasons.append(f'last outcome: {outcome}')
+            priority = CUSTOMER_DUE_PRIORITY + days + OUTCOME_ADJUSTMENTS.get(outcome, 0)
+            items.append((priority, ('customer', pk), reasons))
+        return sorted(items, key=lambda item: -item[0])
+
+    def reminder_stream(self):
+        """Pending reminders due today or earlier, ranked by reminder priority and lateness."""
+        from apps.reminders.models import Reminder
+
+        rows = Reminder.objects.filter(
+            status='pending', created_by=self.user, reminder_date__lte=self.queue_date,
+            customer__is_active=True,
+        ).values_list('customer_id', 'priority', 'reminder_date', 'title')
+
+        items = []
+        for customer_id, priority, due, title in rows:
+            items.append((
+                REMINDER_PRIORITY.get(priority, 0) + self._days_overdue(due),
+                ('customer', customer_id),
+                [f'{priority} reminder: {title}'],
+            ))
+        return sorted(items, key=lambda item: -item[0])
+
+    def lead_stream(self):
+        """Open leads ranked by score, with a bump for leads further down the funnel."""
+        rows = Lead.objects.filter(
+            status__in=OPEN_LEAD_STATUSES, created_by=self.user,
+        ).exclude(last_contacted=self.queue_date).values_list('id', 'score', 'status')
+
+        items = []
+        for pk, score, status in rows:
+            items.append((
+                score * LEAD_SCORE_WEIGHT + LEAD_STAGE_BONUS.get(status, 0),
+                ('lead', pk),
+                [f'lead score {score} ({status})'],
+            ))
+        return sorted(items, key=lambda item: -item[0])
+
+    def ranked_targets(self):
+        """Heap-merge the ranked streams; a target's best entry wins, later ones add reasons."""
+        merged = heapq.merge(
+            self.customer_stream(), self.reminder_stream(), self.lead_stream(),
+            key=lambda item: -item[0],
+        )
+        targets = {}
+        for priority, target, reasons in merged:
+            if target in targets:
+                targets[target][1].extend(reasons)
+                continue
+            if len(targets) >= MAX_QUEUE_SIZE:
+                continue
+            targets[target] = (priority, list(reasons))
+        return targets
+
+    def build(self):
+        """Replace the rep's open entries for the day. Already served/called entries are kept."""
+        targets = self.ranked_targets()
+        with transaction.atomic():
+            existing = CallQueueEntry.objects.filter(user=self.user, queue_date=self.queue_date)
+            existing.filter(status='queued').delete()
+            handled = {
+                ('customer', c) if c else ('lead', l)
+                for c, l in existing.values_list('customer_id', 'lead_id')
+            }
+            entries = [
+                CallQueueEntry(
+                    user=self.user,
+                    queue_date=self.queue_date,
+                    customer_id=pk if kind == 'customer' else None,
+                    lead_id=pk if kind == 'lead' else None,
+                    priority=priority,
+                    reasons=reasons,
+                )
+                for (kind, pk), (priority, reasons) in targets.items()
+                if (kind, pk) not in handled
+            ]
+            # A concurrent build of the same queue may have inserted some targets already
+            CallQueueEntry.objects.bulk_create(entries, ignore_conflicts=True)
+        return len(entries)
+
+
+def build_all_queues(queue_date=None):
+    """Build today's queue for every active user. Returns {username: entries}."""
+    return {
+        user.username: CallQueueBuilder(user, queue_date).build()
+        for user in User.objects.filter(is_active=True)
+    }
+
+
+def pop_next(user, queue_date=None):
+    """Serve the rep's highest-priority open entry, building the day's queue on first use."""
+    queue_date = queue_date or timezone.localdate()
+    if not CallQueueEntry.objects.filter(user=user, queue_date=queue_date).exists():
+        CallQueueBuilder(user, queue_date).build()
+
+    with transaction.atomic():
+        entry = (
+            CallQueueEntry.objects.select_for_update()
+            .filter(user=user, queue_date=queue_date, status='queued')
+            .order_by('-priority', 'id')
+            .first()
+        )
+        if entry is None:
+            return None
+        entry.status = 'popped'
+        entry.popped_at = timezone.now()
+        entry.save(update_fields=['status', 'popped_at'])
+    return entry
+
+
+def mark_called(customer_ids, queue_date=None):
+    """Take customers that were just called out of every rep's queue for the day."""
+    queue_date = queue_date or timezone.localdate()
+    return CallQueueEntry.objects.filter(
+        customer_id__in=customer_ids, queue_date=queue_date, status__in=['queued', 'popped'],
+    ).update(status='done')
@@ -0,0 +1,99 @@
+"""Bulk lead-to-customer conversion."""
+from django.db import transaction
+from django.utils import timezone
+from .dedupe import normalize_email, normalize_name, normalize_phone
+from .geocoding import geocode_customers
+from .models import Customer, Lead
+
+
+def match_keys(name, phone, email):
+    """Keys under which two records are considered the same business."""
+    keys = []
+    phone = normalize_phone(phone)
+    if phone:
+        keys.append(f'phone:{phone}')
+    email = normalize_email(email)
+    if email:
+        keys.append(f'email:{email}')
+    name = normalize_name(name)
+    if name:
+        keys.append(f'name:{name}')
+    return keys
+
+
+def existing_customer_index():
+    """Map match key -> customer id for all active customers (one query, no model instances)."""
+    index = {}
+    rows = Customer.objects.filter(is_active=True).values_list(
+        'id', 'business_name', 'main_phone', 'main_email'
+    )
+    for pk, name, phone, email in rows.iterator(chunk_size=5000):
+        for key in match_keys(name, phone, email):
+            index.setdefault(key, pk)
+    return index
+
+
+def bulk_convert_leads(lead_ids, user=None, dedupe=True, geocode=False, geocoder=None):
+    """
+    Convert leads to customers with one bulk INSERT and one bulk UPDATE.
+
+    Returns ``{lead_id: {'status': ..., 'customer_id': ...}}`` where status is
+    ``created``, ``linked`` (matched an existing customer or an earlier lead
+    in the same batch), ``skipped`` (already converted) or ``not_found``.
+    """
+    results = {pk: {'status': 'not_found', 'customer_id': None} for pk in lead_ids}
+    index = existing_customer_index() if dedupe else {}
+
+    # Plan outside the transaction so slow geocoding doesn't hold row locks
+    new_customers = []  # unsaved Customer objects, in insert order
+    assignments = {}    # lead id -> existing customer id or unsaved Customer
+    batch_index = {}    # match key -> unsaved Customer created earlier in this batch
+    for lead in Lead.objects.filter(pk__in=lead_ids).order_by('pk'):
+        if lead.is_converted:
+            results[lead.pk] = {'status': 'skipped', 'customer_id': lead.converted_customer_id}
+            continue
+
+        keys = match_keys(lead.business_name, lead.phone, lead.email) if dedupe else []
+        target = next((index[k] for k in keys if k in index), None)
+        if target is None:
+            target = next((batch_index[k] for k in keys if k in batch_index), None)
+        if target is None:
+            target = lead.build_customer(user=user)
+            new_customers.append(target)
+            for key in keys:
+                batch_index.setdefault(key, target)
+            results[lead.pk] = {'status': 'created', 'customer_id': None}
+        else:
+            results[lead.pk] = {'status': 'linked', 'customer_id': None}
+        assignments[lead.pk] = target
+
+    if geocode and new_customers:
+        geocode_customers(new_customers, geocoder=geocoder)
+
+    with transaction.atomic():
+        leads = list(Lead.objects.select_for_update().filter(pk__in=assignments).order_by('pk'))
+        for lead in leads:
+            # Converted by someone else since planning
+            if lead.is_converted:
+                results[lead.pk] = {'status': 'skipped', 'customer_id': lead.converted_customer_id}
+                del assignments[lead.pk]
+        leads = [lead for lead in leads if lead.pk in assignments]
+
+        targets = {id(t) for t in assignments.values()}
+        created = Customer.objects.bulk_create([c for c in new_customers if id(c) in targets])
+        if any(c.latitude is not None for c in created):
+            # bulk_create skips post_save, so drop cached map tiles explicitly
+            from apps.routing.map_tiles import invalidate_layers
+            invalidate_layers()
+
+        now = timezone.now()
+        for lead in leads:
+            target = assignments[lead.pk]
+            customer_id = target.pk if isinstance(target, Customer) else target
+            lead.status = 'converted'
+            lead.converted_customer_id = customer_id
+            lead.updated_at = now
+            results[lead.pk]['customer_id'] = customer_id
+        Lead.objects.bulk_update(leads, ['status', 'converted_customer', 'updated_at'])
+
+    return results
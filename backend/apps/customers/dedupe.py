@@ -0,0 +1,236 @@
+"""Batch duplicate detection across Customers and Leads.
+
+Rather than comparing every record with every other record, each record is
+assigned a handful of blocking keys (phone digits, email domain, phonetic
+business name, ZIP + name prefix). Only records that share a key are
+compared, and each candidate pair is scored with a fuzzy similarity.
+"""
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from django.db import transaction
+from .models import Customer, Lead, DuplicateCandidate
+
+
+# Shared mailbox providers say nothing about which business an address belongs to
+FREE_EMAIL_DOMAINS = {
+    'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'aol.com',
+    'icloud.com', 'live.com', 'msn.com', 'comcast.net', 'mchsi.com',
+}
+
+# Words dropped before comparing business names
+NAME_STOPWORDS = {
+    'the', 'and', 'of', 'llc', 'inc', 'co', 'corp', 'corporation', 'company',
+    'ltd', 'lc', 'pc', 'pllc', 'incorporated',
+}
+
+NAME_WEIGHT = 0.5
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+
+def normalize_phone(value):
+    """Return the last 10 digits of a phone number, or '' if too short to be useful."""
+    digits = re.sub(r'\D', '', value or '')
+    if len(digits) < 7:
+        return ''
+    return digits[-10:]
+
+
+def normalize_email(value):
+    return (value or '').strip().lower()
+
+
+def normalize_name(value):
+    """Lowercase, strip punctuation and legal suffixes from a business name."""
+    value = (value or '').lower().replace('&', ' and ')
+    tokens = re.sub(r'[^a-z0-9 ]', ' ', value).split()
+    return ' '.join(t for t in tokens if t not in NAME_STOPWORDS)
+
+
+def soundex(word):
+    """Classic 4-character American Soundex code."""
+    word = re.sub(r'[^a-z]', '', word.lower())
+    if not word:
+        return ''
+    code = word[0].upper()
+    last = SOUNDEX_CODES.get(word[0], '')
+    for ch in word[1:]:
+        digit = SOUNDEX_CODES.get(ch, '')
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in 'hw':
+            last = digit
+    return code.ljust(4, '0')
+
+
+def blocking_keys(record):
+    """Yield the blocking keys for a normalized record."""
+    if record['phone']:
+        yield f"phone:{record['phone']}"
+    email = record['email']
+    if '@' in email:
+        domain = email.rsplit('@', 1)[1]
+        if domain in FREE_EMAIL_DOMAINS:
+            yield f'email:{email}'
+        else:
+            yield f'domain:{domain}'
+    tokens = record['name'].split()
+    if tokens:
+        yield 'name:' + ' '.join(soundex(t) for t in tokens[:2])
+        if record['zip']:
+            yield f"zip:{record['zip']}:{record['name'][:3]}"
+
+
+def score_pair(a, b, min_score=0.0):
+    """Return (score, reasons) for two normalized records.
+
+    Returns None when the pair cannot reach ``min_score``; the exact-match
+    signals are scored first so the expensive name comparison can be skipped.
+    """
+    reasons = []
+    score = 0.0
+
+    if a['phone'] and a['phone'] == b['phone']:
+        score += 0.25
+        reasons.append('phone')
+    if a['email'] and a['email'] == b['email']:
+        score += 0.15
+        reasons.append('email')
+    elif '@' in a['email'] and '@' in b['email']:
+        domain = a['email'].rsplit('@', 1)[1]
+        if domain == b['email'].rsplit('@', 1)[1] and domain not in FREE_EMAIL_DOMAINS:
+            score += 0.08
+            reasons.append('email_domain')
+    if a['zip'] and a['zip'] == b['zip']:
+        score += 0.1
+        reasons.append('zip')
+
+    name_ratio = 0.0
+    if a['name'] and b['name']:
+        needed = (min_score - score) / NAME_WEIGHT
+        matcher = SequenceMatcher(None, a['name'], b['name'])
+        # real_quick_ratio/quick_ratio are cheap upper bounds on ratio()
+        if needed > 1 or matcher.real_quick_ratio() < needed or matcher.quick_ratio() < needed:
+            return None
+        name_ratio = matcher.ratio()
+    score += NAME_WEIGHT * name_ratio
+    if score < min_score:
+        return None
+    reasons.insert(0, f'name:{name_ratio:.2f}')
+
+    return round(min(score, 1.0), 4), reasons
+
+
+class DuplicateDetector:
+    """Find likely duplicate Customers/Leads and write them to the review queue."""
+
+    DEFAULT_THRESHOLD = 0.6
+    # Blocks larger than this (e.g. a common name sound) are only compared
+    # within a sliding window over the name-sorted block
+    MAX_BLOCK_SIZE = 100
+    WINDOW_SIZE = 10
+    BATCH_SIZE = 1000
+
+    def __init__(self, threshold=None, include_leads=True):
+        self.threshold = self.DEFAULT_THRESHOLD if threshold is None else threshold
+        self.include_leads = include_leads
+
+    def load_records(self):
+        """Load the fields needed for matching as plain dicts (no model instances)."""
+        records = []
+        customers = Customer.objects.filter(is_active=True).values_list(
+            'id', 'business_name', 'main_phone', 'main_email', 'zip_code'
+        )
+        for pk, name, phone, email, zip_code in customers.iterator(chunk_size=5000):
+            records.append(self._normalize('customer', pk, name, phone, email, zip_code))
+
+        if self.include_leads:
+            leads = Lead.objects.exclude(status='converted').values_list(
+                'id', 'business_name', 'phone', 'email', 'zip_code'
+            )
+            for pk, name, phone, email, zip_code in leads.iterator(chunk_size=5000):
+                records.append(self._normalize('lead', pk, name, phone, email, zip_code))
+        return records
+
+    @staticmethod
+    def _normalize(record_type, pk, name, phone, email, zip_code):
+        return {
+            'key': (record_type, pk),
+            'name': normalize_name(name),
+            'phone': normalize_phone(phone),
+            'email': normalize_email(email),
+            'zip': (zip_code or '').strip()[:5],
+        }
+
+    def candidate_pairs(self, records):
+        """Group records by blocking key and yield each distinct index pair once."""
+        blocks = defaultdict(list)
+        for index, record in enumerate(records):
+            for key in blocking_keys(record):
+                blocks[key].append(index)
+
+        seen = set()
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            if len(members) > self.MAX_BLOCK_SIZE:
+                # Sorted neighbourhood: only compare names that sort close together
+                members = sorted(members, key=lambda index: records[index]['name'])
+                window = self.WINDOW_SIZE
+            else:
+                window = len(members)
+            for i, left in enumerate(members):
+                for right in members[i + 1:i + window]:
+                    pair = (left, right) if left < right else (right, left)
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+    def find(self, records=None):
+        """Return scored matches above the threshold, best first."""
+        if records is None:
+            records = self.load_records()
+        matches = []
+        for left, right in self.candidate_pairs(records):
+            scored = score_pair(records[left], records[right], self.threshold)
+            if scored is not None:
+                score, reasons = scored
+                a, b = sorted([records[left]['key'], records[right]['key']])
+                matches.append((score, a, b, reasons))
+        matches.sort(key=lambda m: m[0], reverse=True)
+        return matches
+
+    def run(self):
+        """Rebuild the pending review queue. Reviewed pairs are kept and not re-queued."""
+        records = self.load_records()
+        matches = self.find(records)
+
+        with transaction.atomic():
+            DuplicateCandidate.objects.filter(status='pending').delete()
+            reviewed = set(
+                DuplicateCandidate.objects.values_list('left_type', 'left_id', 'right_type', 'right_id')
+            )
+            to_create = [
+                DuplicateCandidate(
+                    left_type=a[0], left_id=a[1], right_type=b[0], right_id=b[1],
+                    score=score, reasons=reasons,
+                )
+                for score, a, b, reasons in matches
+                if (a[0], a[1], b[0], b[1]) not in reviewed
+            ]
+            DuplicateCandidate.objects.bulk_create(to_create, batch_size=self.BATCH_SIZE)
+
+        return {
+            'records': len(records),
+            'candidates': len(to_create),
+        }
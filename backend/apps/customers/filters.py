@@ -0,0 +1,24 @@
+import django_filters
+from django.utils import timezone
+from .models import Customer
+
+
+class CustomerBulkFilter(django_filters.FilterSet):
+    """Filter expression accepted by the customer bulk update endpoint."""
+    state = django_filters.CharFilter(lookup_expr='iexact')
+    city = django_filters.CharFilter(lookup_expr='iexact')
+    next_call_date_before = django_filters.DateFilter(field_name='next_call_date', lookup_expr='lt')
+    next_call_date_after = django_filters.DateFilter(field_name='next_call_date', lookup_expr='gte')
+    last_call_date_before = django_filters.DateFilter(field_name='last_call_date', lookup_expr='lt')
+    last_call_date_after = django_filters.DateFilter(field_name='last_call_date', lookup_expr='gte')
+    no_next_call_date = django_filters.BooleanFilter(field_name='next_call_date', lookup_expr='isnull')
+    overdue = django_filters.BooleanFilter(method='filter_overdue')
+
+    class Meta:
+        model = Customer
+        fields = ['region', 'is_active', 'zip_code']
+
+    def filter_overdue(self, queryset, name, value):
+        if value:
+            return queryset.filter(next_call_date__lt=timezone.now().date())
+        return queryset
@@ -0,0 +1,46 @@
+"""Address geocoding via OpenStreetMap Nominatim (geopy)."""
+import logging
+from decimal import Decimal
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Nominatim's usage policy allows at most one request per second
+NOMINATIM_MIN_DELAY_SECONDS = 1
+
+
+def get_geocoder():
+    """Return a rate-limited geocode callable."""
+    from geopy.extra.rate_limiter import RateLimiter
+    from geopy.geocoders import Nominatim
+
+    geolocator = Nominatim(user_agent=settings.SITE_NAME, timeout=5)
+    return RateLimiter(
+        geolocator.geocode, min_delay_seconds=NOMINATIM_MIN_DELAY_SECONDS, swallow_exceptions=True,
+    )
+
+
+def geocode_customers(customers, geocoder=None):
+    """
+    Fill latitude/longitude in place on unsaved or saved customers that lack them.
+
+    Returns the number of customers geocoded. Lookup failures are logged and skipped.
+    """
+    geocoder = geocoder or get_geocoder()
+    found = 0
+    for customer in customers:
+        if customer.latitude is not None and customer.longitude is not None:
+            continue
+        query = ', '.join(filter(None, [
+            customer.bill_to_address, customer.city, customer.state, customer.zip_code,
+        ]))
+        if not query:
+            continue
+        location = geocoder(query)
+        if location is None:
+            logger.info('No geocode result for %r', query)
+            continue
+        customer.latitude = Decimal(str(round(location.latitude, 7)))
+        customer.longitude = Decimal(str(round(location.longitude, 7)))
+        found += 1
+    return found
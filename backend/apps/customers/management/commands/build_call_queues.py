@@ -0,0 +1,14 @@
+"""Precompute each rep's call queue for the day. Intended to run every morning from cron."""
+from django.core.management.base import BaseCommand
+from apps.customers.call_queue import build_all_queues
+
+
+class Command(BaseCommand):
+    help = "Build today's prioritized call queue for every active user"
+
+    def handle(self, *args, **options):
+        built = build_all_queues()
+        total = sum(built.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Queued {total} call targets for {len(built)} users'
+        ))
@@ -0,0 +1,16 @@
+"""Recompute lead hot scores. Intended to run nightly (e.g. from cron)."""
+import time
+from django.core.management.base import BaseCommand
+from apps.customers.scoring import score_leads
+
+
+class Command(BaseCommand):
+    help = 'Recompute the 1-5 score for every open lead'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stats = score_leads()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {stats['scored']} leads ({stats['updated']} changed) in {elapsed:.1f}s"
+        ))
@@ -0,0 +1,104 @@
+"""Merge duplicate customers into a single surviving record."""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import Customer, Note, DuplicateCandidate
+
+
+# Scalar fields copied from a merged customer when the survivor has them blank
+FILL_BLANK_FIELDS = [
+    'bill_to_address', 'city', 'state', 'zip_code', 'primary_contact',
+    'main_email', 'main_phone', 'secondary_phone', 'fax', 'fleet_description',
+    'region_id', 'latitude', 'longitude',
+]
+
+
+def customer_foreign_keys():
+    """Yield (accessor_name, related_model, field_name) for every FK pointing at Customer."""
+    for rel in Customer._meta.related_objects:
+        if rel.one_to_many:
+            yield rel.get_accessor_name(), rel.related_model, rel.field.name
+
+
+def merge_customers(survivor, losers):
+    """
+    Fold ``losers`` into ``survivor`` inside one transaction.
+
+    Every related row is re-pointed with a single UPDATE per table, so the
+    cost doesn't grow with the amount of history attached to each customer.
+    Merged customers are soft-deleted and tagged with ``merged_into``.
+    Returns a dict of moved row counts keyed by relation name.
+    """
+    loser_ids = [c.pk for c in losers if c.pk != survivor.pk]
+    if not loser_ids:
+        return {}
+
+    with transaction.atomic():
+        # Lock all involved rows so concurrent edits can't interleave with the merge
+        locked = {
+            c.pk: c for c in Customer.objects.select_for_update().filter(pk__in=[survivor.pk, *loser_ids])
+        }
+        survivor = locked[survivor.pk]
+        losers = [locked[pk] for pk in loser_ids if pk in locked]
+        loser_ids = [c.pk for c in losers]
+
+        now = timezone.now()
+        moved = {}
+        for accessor, model, field_name in customer_foreign_keys():
+            changes = {field_name: survivor.pk}
+            # Re-pointed rows count as changed for ?since syncs
+            if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+                changes['updated_at'] = now
+            moved[accessor] = model._base_manager.filter(
+                **{f'{field_name}__in': loser_ids}
+            ).update(**changes)
+
+        # Only the newest note stays current after combining note histories
+        if moved.get('notes'):
+            current = survivor.notes.filter(is_current=True).order_by('-created_at', '-id').first()
+            if current:
+                Note.objects.filter(customer=survivor, is_current=True).exclude(pk=current.pk).update(
+                    is_current=False
+                )
+
+        _merge_fields(survivor, losers)
+        survivor.save()
+
+        for loser in losers:
+            loser.is_active = False
+            loser.custom_fields = {**loser.custom_fields, 'merged_into': survivor.pk}
+            loser.updated_at = now
+        Customer.objects.bulk_update(losers, ['is_active', 'custom_fields', 'updated_at'])
+
+        DuplicateCandidate.objects.filter(
+            Q(left_type='customer', left_id__in=loser_ids) | Q(right_type='customer', right_id__in=loser_ids)
+        ).update(status='merged', updated_at=now)
+
+        # bulk_update and update() skip post_save, so drop the cached tiles; job and
+        # revenue tiles carry the customer's ID and location too
+        from apps.routing.map_tiles import invalidate_layers
+        transaction.on_commit(invalidate_layers)
+
+    return moved
+
+
+def _merge_fields(survivor, losers):
+    """Fill the survivor's blanks from the losers; the survivor's own values always win."""
+    for loser in losers:
+        for field in FILL_BLANK_FIELDS:
+            if getattr(survivor, field) in (None, '') and getattr(loser, field) not in (None, ''):
+                setattr(survivor, field, getattr(loser, field))
+
+        custom_fields = dict(loser.custom_fields or {})
+        custom_fields.pop('merged_into', None)
+        custom_fields.update(survivor.custom_fields or {})
+        survivor.custom_fields = custom_fields
+
+        if loser.last_call_date and (
+            survivor.last_call_date is None or loser.last_call_date > survivor.last_call_date
+        ):
+            survivor.last_call_date = loser.last_call_date
+        if loser.next_call_date and (
+            survivor.next_call_date is None or loser.next_call_date < survivor.next_call_date
+        ):
+            survivor.next_call_date = loser.next_call_date
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_add_lead_model'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('left_type', models.CharField(choices=[('customer', 'Customer'), ('lead', 'Lead')], max_length=10)),
+                ('left_id', models.PositiveBigIntegerField()),
+                ('right_type', models.CharField(choices=[('customer', 'Customer'), ('lead', 'Lead')], max_length=10)),
+                ('right_id', models.PositiveBigIntegerField()),
+                ('score', models.FloatField(help_text='0-1 similarity')),
+                ('reasons', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending Review'), ('merged', 'Merged'), ('dismissed', 'Not a Duplicate')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reviewed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_duplicates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-score', 'id'],
+                'indexes': [models.Index(fields=['status', '-score'], name='customers_d_status_cb0cca_idx')],
+                'constraints': [models.UniqueConstraint(fields=('left_type', 'left_id', 'right_type', 'right_id'), name='unique_duplicate_pair')],
+            },
+        ),
+    ]
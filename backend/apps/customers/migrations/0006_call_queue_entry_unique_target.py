@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:22
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def drop_duplicate_entries(apps, schema_editor):
+    """Keep the first entry per rep, day and target so the constraints can be added."""
+    CallQueueEntry = apps.get_model('customers', 'CallQueueEntry')
+    for target in ('customer', 'lead'):
+        duplicates = (
+            CallQueueEntry.objects.filter(**{f'{target}__isnull': False})
+            .values('user_id', 'queue_date', f'{target}_id')
+            .annotate(rows=Count('id'), keep=Min('id')).filter(rows__gt=1).order_by()
+        )
+        for row in duplicates:
+            CallQueueEntry.objects.filter(
+                user_id=row['user_id'], queue_date=row['queue_date'], **{f'{target}_id': row[f'{target}_id']},
+            ).exclude(pk=row['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0005_call_queue_entry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='callqueueentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('customer__isnull', False)), fields=('user', 'queue_date', 'customer'), name='unique_call_queue_customer'),
+        ),
+        migrations.AddConstraint(
+            model_name='callqueueentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('lead__isnull', False)), fields=('user', 'queue_date', 'lead'), name='unique_call_queue_lead'),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
 
 
 class Region(models.Model):
@@ -154,6 +157,25 @@ class Lead(models.Model):
     def __str__(self):
         return f"{self.business_name} ({self.get_status_display()})"
 
+    @property
+    def is_converted(self):
+        return self.status == 'converted' and self.converted_customer_id is not None
+
+    def build_customer(self, user=None):
+        """Return an unsaved Customer populated from this lead."""
+        return Customer(
+            business_name=self.business_name,
+            primary_contact=self.contact_name,
+            main_phone=self.phone,
+            main_email=self.email,
+            bill_to_address=self.address,
+            city=self.city,
+            state=self.state,
+            zip_code=self.zip_code,
+            fleet_description=f"Services needed: {', '.join(self.services_needed)}. {self.notes}".strip(),
+            created_by=user,
+        )
+
 
 class Note(models.Model):
     """Notes with version history for customers."""
@@ -193,3 +215,100 @@ class Note(models.Model):
                 is_current=True
             ).update(is_current=False)
         super().save(*args, **kwargs)
+
+
+class DuplicateCandidate(models.Model):
+    """A suspected duplicate pair found by the batch dedupe job, queued for review."""
+    RECORD_TYPE_CHOICES = [
+        ('customer', 'Customer'),
+        ('lead', 'Lead'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending Review'),
+        ('merged', 'Merged'),
+        ('dismissed', 'Not a Duplicate'),
+    ]
+
+    # Pairs are stored in canonical order: (left_type, left_id) < (right_type, right_id)
+    left_type = models.CharField(max_length=10, choices=RECORD_TYPE_CHOICES)
+    left_id = models.PositiveBigIntegerField()
+    right_type = models.CharField(max_length=10, choices=RECORD_TYPE_CHOICES)
+    right_id = models.PositiveBigIntegerField()
+    score = models.FloatField(help_text='0-1 similarity')
+    reasons = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    reviewed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_duplicates'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-score', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['left_type', 'left_id', 'right_type', 'right_id'],
+                name='unique_duplicate_pair',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', '-score']),
+        ]
+
+    def __str__(self):
+        return f"{self.left_type} {self.left_id} ~ {self.right_type} {self.right_id} ({self.score:.2f})"
+
+
+class CallQueueEntry(models.Model):
+    """One precomputed "who to call next" target in a rep's daily call queue."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('popped', 'Served'),
+        ('done', 'Called'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='call_queue')
+    queue_date = models.DateField()
+    customer = models.ForeignKey(
+        Customer, on_delete=models.CASCADE, null=True, blank=True, related_name='call_queue_entries'
+    )
+    lead = models.ForeignKey(
+        Lead, on_delete=models.CASCADE, null=True, blank=True, related_name='call_queue_entries'
+    )
+    priority = models.FloatField()
+    reasons = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    popped_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-priority', 'id']
+        verbose_name_plural = 'Call queue entries'
+        indexes = [
+            # Serves "next target" as an index seek on the head of the rep's open queue
+            models.Index(fields=['user', 'queue_date', 'status', '-priority']),
+            models.Index(fields=['customer', 'queue_date']),
+        ]
+        constraints = [
+            # One entry per target a day; conditional because NULLs never collide
+            models.UniqueConstraint(
+                fields=['user', 'queue_date', 'customer'], condition=models.Q(customer__isnull=False),
+                name='unique_call_queue_customer',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'queue_date', 'lead'], condition=models.Q(lead__isnull=False),
+                name='unique_call_queue_lead',
+            ),
+        ]
+
+    def __str__(self):
+        target = self.customer or self.lead
+        return f"{target} for {self.user} on {self.queue_date} ({self.priority:.1f})"
+
+
+@receiver(post_save, sender='activities.Activity')
+def remove_called_customer_from_queues(sender, instance, created, **kwargs):
+    """Logging a call takes that customer out of the day's call queues."""
+    if created:
+        from .call_queue import mark_called
+        mark_called([instance.customer_id], timezone.localtime(instance.activity_datetime).date())
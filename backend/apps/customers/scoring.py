@@ -0,0 +1,168 @@
+"""Batch lead scoring.
+
+Scores are recomputed for every open lead in one pass: the handful of
+aggregate lookups (conversion rates, customer footprint, recurring
+services) are loaded up front with grouped queries, then each lead is
+scored from plain tuples and changed scores are written back with
+``bulk_update``.
+"""
+from django.db.models import Count, Q
+from django.utils import timezone
+from .models import Customer, Lead
+
+
+# Relative weight of each feature in the 0-1 score
+WEIGHTS = {
+    'conversion': 0.35,
+    'proximity': 0.2,
+    'services': 0.15,
+    'recency': 0.15,
+    'stage': 0.15,
+}
+
+STAGE_SCORES = {
+    'new': 0.4,
+    'contacted': 0.5,
+    'interested': 0.9,
+    'quoted': 1.0,
+}
+
+# Pseudo-count used to shrink small groups toward the overall conversion rate
+SMOOTHING = 5
+
+RECENT_CONTACT_DAYS = 14
+STALE_CONTACT_DAYS = 180
+
+
+def smoothed_rates(rows, key, prior):
+    """Map group value -> conversion rate, shrunk toward ``prior`` for small groups."""
+    return {
+        row[key]: (row['converted'] + prior * SMOOTHING) / (row['total'] + SMOOTHING)
+        for row in rows
+    }
+
+
+class LeadScorer:
+    """Recompute `Lead.score` (1-5) from source, type, category, services, recency and location."""
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, today=None):
+        self.today = today or timezone.now().date()
+
+    def fit(self):
+        """Load the aggregate lookups shared by every lead."""
+        outcome = Lead.objects.filter(status__in=['converted', 'not_interested'])
+        overall = outcome.aggregate(total=Count('id'), converted=Count('id', filter=Q(status='converted')))
+        self.prior = (
+            overall['converted'] / overall['total'] if overall['total'] else 0.5
+        )
+
+        def rates(field):
+            rows = outcome.values(field).annotate(
+                total=Count('id'), converted=Count('id', filter=Q(status='converted'))
+            ).order_by()
+            return smoothed_rates(rows, field, self.prior)
+
+        self.source_rates = rates('source')
+        self.type_rates = rates('type')
+        self.category_rates = {
+            (k or '').strip().lower(): v for k, v in rates('category').items()
+        }
+
+        footprint = Customer.objects.filter(is_active=True).values_list('zip_code', 'city').distinct()
+        self.customer_zips = set()
+        self.customer_cities = set()
+        for zip_code, city in footprint:
+            if zip_code:
+                self.customer_zips.add(zip_code.strip()[:5])
+            if city:
+                self.customer_cities.add(city.strip().lower())
+
+        from apps.services.models import Service
+        recurring = Service.objects.filter(is_active=True, is_recurring=True).values_list(
+            'name', 'category__name'
+        )
+        self.recurring_terms = set()
+        for name, category_name in recurring:
+            self.recurring_terms.add(name.strip().lower())
+            self.recurring_terms.add(category_name.strip().lower())
+        return self
+
+    def features(self, source, lead_type, category, services_needed, last_contacted, zip_code, city, status):
+        """Return the 0-1 value of each weighted feature for one lead."""
+        conversion = (
+            self.source_rates.get(source, self.prior)
+            + self.type_rates.get(lead_type, self.prior)
+            + self.category_rates.get((category or '').strip().lower(), self.prior)
+        ) / 3
+        # Normalize so a lead matching the historical average lands mid-scale
+        conversion = min(conversion / (2 * self.prior), 1.0) if self.prior else conversion
+
+        zip_code = (zip_code or '').strip()[:5]
+        if zip_code and zip_code in self.customer_zips:
+            proximity = 1.0
+        elif city and city.strip().lower() in self.customer_cities:
+            proximity = 0.6
+        else:
+            proximity = 0.0
+
+        services = [str(s).strip().lower() for s in (services_needed or [])]
+        services_score = min(len(services), 3) / 6
+        if any(s in self.recurring_terms for s in services):
+            services_score += 0.5
+
+        if last_contacted is None:
+            recency = 0.5
+        else:
+            age = (self.today - last_contacted).days
+            if age <= RECENT_CONTACT_DAYS:
+                recency = 1.0
+            elif age >= STALE_CONTACT_DAYS:
+                recency = 0.0
+            else:
+                recency = 1 - (age - RECENT_CONTACT_DAYS) / (STALE_CONTACT_DAYS - RECENT_CONTACT_DAYS)
+
+        return {
+            'conversion': conversion,
+            'proximity': proximity,
+            'services': services_score,
+            'recency': recency,
+            'stage': STAGE_SCORES.get(status, 0.0),
+        }
+
+    def score(self, *lead_values):
+        """Map one lead's raw values to the 1-5 hot score."""
+        status = lead_values[-1]
+        if status == 'not_interested':
+            return 1
+        features = self.features(*lead_values)
+        total = sum(WEIGHTS[name] * value for name, value in features.items())
+        return max(1, min(5, 1 + round(4 * total)))
+
+    def run(self, queryset=None):
+        """Score ``queryset`` (default: all open leads) and save changed scores. Returns counts."""
+        if not hasattr(self, 'prior'):
+            self.fit()
+        if queryset is None:
+            queryset = Lead.objects.all()
+        rows = queryset.exclude(status='converted').values_list(
+            'id', 'score', 'source', 'type', 'category', 'services_needed',
+            'last_contacted', 'zip_code', 'city', 'status',
+        )
+
+        scored = 0
+        changed = []
+        for pk, current, *lead_values in rows.iterator(chunk_size=5000):
+            scored += 1
+            new_score = self.score(*lead_values)
+            if new_score != current:
+                changed.append(Lead(pk=pk, score=new_score))
+
+        Lead.objects.bulk_update(changed, ['score'], batch_size=self.BATCH_SIZE)
+        return {'scored': scored, 'updated': len(changed)}
+
+
+def score_leads(queryset=None, today=None):
+    """Convenience wrapper used by the nightly command and after lead imports."""
+    return LeadScorer(today=today).run(queryset)
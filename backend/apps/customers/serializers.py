@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Region, Customer, Note, Lead
+from .models import Region, Customer, Note, Lead, DuplicateCandidate, CallQueueEntry
 
 
 class RegionSerializer(serializers.ModelSerializer):
@@ -109,6 +109,33 @@ class CustomerCreateUpdateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class CustomerBulkUpdateSerializer(serializers.Serializer):
+    """Validates a bulk customer change: which customers (IDs or a filter) and what to set."""
+    PATCHABLE_FIELDS = ['region', 'next_call_date', 'last_call_date', 'is_active']
+
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filter = serializers.DictField(required=False, allow_empty=False)
+    patch = serializers.DictField(allow_empty=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_patch(self, value):
+        unknown = set(value) - set(self.PATCHABLE_FIELDS)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Cannot bulk update: {', '.join(sorted(unknown))}. "
+                f"Allowed fields: {', '.join(self.PATCHABLE_FIELDS)}"
+            )
+        # Reuse the regular field validation so bulk and single edits accept the same values
+        field_serializer = CustomerCreateUpdateSerializer(data=value, partial=True)
+        field_serializer.is_valid(raise_exception=True)
+        return field_serializer.validated_data
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide exactly one of ids or filter.')
+        return attrs
+
+
 class LeadSerializer(serializers.ModelSerializer):
     added_date = serializers.DateTimeField(source='created_at', read_only=True)
 
@@ -128,3 +155,59 @@ class LeadSerializer(serializers.ModelSerializer):
         if request and request.user.is_authenticated:
             validated_data['created_by'] = request.user
         return super().create(validated_data)
+
+
+class LeadRescoreSerializer(serializers.Serializer):
+    """Validates a rescore request: optional lead IDs (all open leads when omitted)."""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+
+class DuplicateCandidateSerializer(serializers.ModelSerializer):
+    left_name = serializers.SerializerMethodField()
+    right_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DuplicateCandidate
+        fields = [
+            'id', 'left_type', 'left_id', 'left_name',
+            'right_type', 'right_id', 'right_name',
+            'score', 'reasons', 'status', 'reviewed_by', 'created_at',
+        ]
+        read_only_fields = fields
+
+    def _name(self, record_type, record_id):
+        # Names are resolved in bulk by the view and passed in via context
+        names = self.context.get('names')
+        if names is None:
+            model = Customer if record_type == 'customer' else Lead
+            return model.objects.filter(pk=record_id).values_list('business_name', flat=True).first()
+        return names.get((record_type, record_id))
+
+    def get_left_name(self, obj):
+        return self._name(obj.left_type, obj.left_id)
+
+    def get_right_name(self, obj):
+        return self._name(obj.right_type, obj.right_id)
+
+
+class CallQueueEntrySerializer(serializers.ModelSerializer):
+    target_type = serializers.SerializerMethodField()
+    name = serializers.SerializerMethodField()
+    phone = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CallQueueEntry
+        fields = [
+            'id', 'target_type', 'customer', 'lead', 'name', 'phone',
+            'priority', 'reasons', 'status', 'queue_date', 'popped_at',
+        ]
+        read_only_fields = fields
+
+    def get_target_type(self, obj):
+        return 'customer' if obj.customer_id else 'lead'
+
+    def get_name(self, obj):
+        return obj.customer.business_name if obj.customer_id else obj.lead.business_name
+
+    def get_phone(self, obj):
+        return obj.customer.main_phone if obj.customer_id else obj.lead.phone
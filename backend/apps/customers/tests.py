@@ -2,7 +2,13 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
-from apps.customers.models import Customer, Note, Lead
+from apps.customers.models import Customer, Note, Lead, DuplicateCandidate, CallQueueEntry
+from apps.customers.merge import merge_customers
+from apps.customers.scoring import LeadScorer, score_leads
+from apps.customers.conversion import bulk_convert_leads
+from apps.customers.call_queue import CallQueueBuilder, pop_next
+from apps.customers.dedupe import DuplicateDetector, normalize_name, normalize_phone, soundex
+from apps.customers.serializers import DuplicateCandidateSerializer
 
 
 class CustomerAPITest(TestCase):
@@ -176,3 +182,488 @@ class LeadAPITest(TestCase):
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         lead.refresh_from_db()
         self.assertEqual(lead.status, 'contacted')
+
+
+class DuplicateDetectionTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_normalizers(self):
+        self.assertEqual(normalize_phone('(563) 555-0142'), '5635550142')
+        self.assertEqual(normalize_phone('+1 563.555.0142'), '5635550142')
+        self.assertEqual(normalize_name('The Acme Landscaping, LLC'), 'acme landscaping')
+        self.assertEqual(soundex('Robert'), soundex('Rupert'))
+
+    def test_finds_customer_and_lead_duplicates(self):
+        Customer.objects.create(
+            business_name='Acme Landscaping LLC', main_phone='563-555-0142', zip_code='52801',
+        )
+        Customer.objects.create(
+            business_name='ACME Landscaping', main_phone='(563) 555-0142', zip_code='52801',
+        )
+        Customer.objects.create(business_name='Totally Different Co', zip_code='52801')
+        Lead.objects.create(business_name='Acme Landscaping Inc', phone='5635550142')
+
+        stats = DuplicateDetector().run()
+
+        self.assertEqual(stats['records'], 4)
+        # Every pair of the three Acme records, and nothing involving the unrelated customer
+        self.assertEqual(DuplicateCandidate.objects.count(), 3)
+        top = DuplicateCandidate.objects.first()
+        self.assertIn('phone', top.reasons)
+
+    def test_dismissed_pairs_are_not_requeued(self):
+        Customer.objects.create(business_name='Acme Landscaping', main_phone='563-555-0142')
+        Customer.objects.create(business_name='Acme Landscaping', main_phone='563-555-0142')
+        DuplicateDetector().run()
+        candidate = DuplicateCandidate.objects.get()
+
+        resp = self.client.post(f'/duplicates/{candidate.id}/dismiss/')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['left_name'], 'Acme Landscaping')
+
+        DuplicateDetector().run()
+        self.assertEqual(DuplicateCandidate.objects.count(), 1)
+        self.assertEqual(DuplicateCandidate.objects.get().status, 'dismissed')
+
+    def test_review_queue_lists_pending(self):
+        Customer.objects.create(business_name='Acme Landscaping', main_phone='563-555-0142')
+        Customer.objects.create(business_name='Acme Landscaping', main_phone='563-555-0142')
+        DuplicateDetector().run()
+        resp = self.client.get('/duplicates/')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['count'], 1)
+
+    def test_detail_includes_names(self):
+        Customer.objects.create(business_name='Acme Landscaping', main_phone='563-555-0142')
+        Lead.objects.create(business_name='Acme Landscaping', phone='563-555-0142')
+        DuplicateDetector().run()
+        candidate = DuplicateCandidate.objects.get()
+        resp = self.client.get(f'/duplicates/{candidate.id}/')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual((resp.data['left_name'], resp.data['right_name']), ('Acme Landscaping', 'Acme Landscaping'))
+
+        data = DuplicateCandidateSerializer(candidate).data
+        self.assertEqual(data['left_name'], 'Acme Landscaping')
+
+
+class CustomerMergeTest(TestCase):
+
+    def setUp(self):
+        from apps.activities.models import ActivityType
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.activity_type = ActivityType.objects.create(name='call', display_name='Call', icon='phone')
+        self.survivor = Customer.objects.create(
+            business_name='Acme Landscaping', main_phone='563-555-0142',
+            custom_fields={'gate_code': '1234'},
+        )
+        self.loser = Customer.objects.create(
+            business_name='ACME Landscaping LLC', main_email='office@acme.com',
+            custom_fields={'gate_code': '9999', 'dog': 'yes'},
+        )
+
+    def test_merge_drops_cached_customer_tiles(self):
+        from apps.routing.map_tiles import LAYERS, layer_version
+        before = {layer: layer_version(layer) for layer in LAYERS}
+        with self.captureOnCommitCallbacks(execute=True):
+            merge_customers(self.survivor, [self.loser])
+        for layer in LAYERS:
+            self.assertGreater(layer_version(layer), before[layer])
+
+    def test_merge_marks_repointed_rows_as_updated(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.activities.models import Activity
+        activity = Activity.objects.create(
+            customer=self.loser, activity_type=self.activity_type, activity_datetime=timezone.now(),
+        )
+        long_ago = timezone.now() - timedelta(days=30)
+        Activity.objects.filter(pk=activity.pk).update(updated_at=long_ago)
+
+        merge_customers(self.survivor, [self.loser])
+        activity.refresh_from_db()
+        self.assertGreater(activity.updated_at, long_ago + timedelta(days=1))
+
+    def test_merge_repoints_related_rows(self):
+        from django.utils import timezone
+        from apps.activities.models import Activity
+        from apps.reminders.models import Reminder
+        Activity.objects.create(
+            customer=self.loser, activity_type=self.activity_type, activity_datetime=timezone.now(),
+        )
+        Reminder.objects.create(customer=self.loser, title='Call back')
+        Note.objects.create(customer=self.survivor, content='Old')
+        Note.objects.create(customer=self.loser, content='Newer')
+        lead = Lead.objects.create(business_name='Acme', converted_customer=self.loser, status='converted')
+
+        resp = self.client.post(
+            f'/customers/{self.survivor.id}/merge/', {'merge_ids': [self.loser.id]}, format='json',
+        )
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['moved']['activities'], 1)
+        self.assertEqual(resp.data['moved']['reminders'], 1)
+        self.assertEqual(resp.data['moved']['notes'], 1)
+        self.assertEqual(resp.data['moved']['source_leads'], 1)
+        self.assertEqual(self.survivor.activities.count(), 1)
+        self.assertEqual(self.survivor.notes.filter(is_current=True).count(), 1)
+        lead.refresh_from_db()
+        self.assertEqual(lead.converted_customer_id, self.survivor.id)
+
+        self.survivor.refresh_from_db()
+        self.loser.refresh_from_db()
+        self.assertEqual(self.survivor.main_email, 'office@acme.com')
+        self.assertEqual(self.survivor.custom_fields, {'gate_code': '1234', 'dog': 'yes'})
+        self.assertFalse(self.loser.is_active)
+        self.assertEqual(self.loser.custom_fields['merged_into'], self.survivor.id)
+
+    def test_merge_marks_duplicate_candidates(self):
+        DuplicateCandidate.objects.create(
+            left_type='customer', left_id=self.survivor.id,
+            right_type='customer', right_id=self.loser.id, score=0.9,
+        )
+        merge_customers(self.survivor, [self.loser])
+        self.assertEqual(DuplicateCandidate.objects.get().status, 'merged')
+
+    def test_merge_rejects_self(self):
+        resp = self.client.post(
+            f'/customers/{self.survivor.id}/merge/', {'merge_ids': [self.survivor.id]}, format='json',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_merge_rejects_unknown_ids(self):
+        resp = self.client.post(
+            f'/customers/{self.survivor.id}/merge/', {'merge_ids': [99999]}, format='json',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CustomerBulkUpdateTest(TestCase):
+
+    def setUp(self):
+        from apps.customers.models import Region
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.east = Region.objects.create(name='East')
+        self.west = Region.objects.create(name='West')
+        self.customers = [
+            Customer.objects.create(business_name=f'Customer {i}', region=self.east, city='Davenport')
+            for i in range(3)
+        ]
+        self.other = Customer.objects.create(business_name='Elsewhere', region=self.west, city='Moline')
+
+    def test_bulk_update_by_ids(self):
+        ids = [c.id for c in self.customers[:2]]
+        resp = self.client.post('/customers/bulk_update/', {
+            'ids': ids, 'patch': {'next_call_date': '2026-11-02'},
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['count'], 2)
+        self.assertEqual(resp.data['ids'], sorted(ids))
+        self.assertEqual(
+            Customer.objects.filter(next_call_date='2026-11-02').count(), 2,
+        )
+
+    def test_bulk_update_by_filter_reassigns_region(self):
+        resp = self.client.post('/customers/bulk_update/', {
+            'filter': {'city': 'davenport'}, 'patch': {'region': self.west.id},
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['count'], 3)
+        self.assertEqual(Customer.objects.filter(region=self.west).count(), 4)
+
+    def test_bulk_update_drops_cached_customer_tiles_on_commit(self):
+        from apps.routing.map_tiles import LAYERS, layer_version
+        before = {layer: layer_version(layer) for layer in LAYERS}
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post('/customers/bulk_update/', {
+                'ids': [self.other.id], 'patch': {'is_active': False},
+            }, format='json')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual({layer: layer_version(layer) for layer in LAYERS}, before)
+        callbacks[0]()
+        for layer in LAYERS:
+            self.assertGreater(layer_version(layer), before[layer])
+
+    def test_dry_run_changes_nothing(self):
+        resp = self.client.post('/customers/bulk_update/', {
+            'filter': {'region': self.east.id}, 'patch': {'is_active': False}, 'dry_run': True,
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['count'], 3)
+        self.assertEqual(Customer.objects.filter(is_active=True).count(), 4)
+
+    def test_rejects_non_patchable_field(self):
+        resp = self.client.post('/customers/bulk_update/', {
+            'ids': [self.other.id], 'patch': {'business_name': 'Renamed'},
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rejects_invalid_patch_value(self):
+        resp = self.client.post('/customers/bulk_update/', {
+            'ids': [self.other.id], 'patch': {'next_call_date': 'not-a-date'},
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rejects_unknown_filter(self):
+        resp = self.client.post('/customers/bulk_update/', {
+            'filter': {'business_name': 'x'}, 'patch': {'is_active': False},
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LeadScoringTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        Customer.objects.create(business_name='Existing', city='Davenport', zip_code='52801')
+        # Referrals have historically converted; cold outreach hasn't
+        for i in range(4):
+            Lead.objects.create(business_name=f'Won {i}', source='referral', status='converted')
+            Lead.objects.create(business_name=f'Lost {i}', source='cold_outreach', status='not_interested')
+
+    def test_hot_lead_outscores_cold_lead(self):
+        from django.utils import timezone
+        hot = Lead.objects.create(
+            business_name='Hot', source='referral', status='quoted', zip_code='52801',
+            services_needed=['Snow Removal', 'Lawn Care'], last_contacted=timezone.now().date(),
+        )
+        cold = Lead.objects.create(
+            business_name='Cold', source='cold_outreach', status='new', zip_code='90210', city='Beverly Hills',
+        )
+        stats = score_leads()
+        hot.refresh_from_db()
+        cold.refresh_from_db()
+        self.assertEqual(stats['scored'], 6)  # converted leads are left alone
+        self.assertGreater(hot.score, cold.score)
+        self.assertTrue(1 <= cold.score <= 5)
+
+    def test_not_interested_scores_lowest(self):
+        lead = Lead.objects.create(business_name='Nope', source='referral', status='not_interested', score=5)
+        score_leads()
+        lead.refresh_from_db()
+        self.assertEqual(lead.score, 1)
+
+    def test_small_groups_shrink_toward_prior(self):
+        scorer = LeadScorer().fit()
+        self.assertGreater(scorer.source_rates['referral'], scorer.prior)
+        self.assertLess(scorer.source_rates['referral'], 1.0)
+
+    def test_rescore_endpoint(self):
+        lead = Lead.objects.create(business_name='New', source='referral', status='interested')
+        resp = self.client.post('/leads/rescore/', {'ids': [lead.id]}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['scored'], 1)
+
+    def test_rescore_rejects_bad_ids(self):
+        for ids in ['12', ['a', 'b']]:
+            resp = self.client.post('/leads/rescore/', {'ids': ids}, format='json')
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LeadBulkConvertTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_convert_creates_links_and_skips(self):
+        existing = Customer.objects.create(business_name='Riverside Property Mgmt', main_phone='563-555-0142')
+        dup_of_existing = Lead.objects.create(business_name='Riverside PM', phone='(563) 555-0142')
+        fresh = Lead.objects.create(business_name='Brand New LLC', services_needed=['Lawn Care'])
+        same_as_fresh = Lead.objects.create(business_name='Brand New, LLC')
+        done = Lead.objects.create(business_name='Old', status='converted', converted_customer=existing)
+
+        resp = self.client.post('/leads/bulk_convert/', {
+            'ids': [dup_of_existing.id, fresh.id, same_as_fresh.id, done.id, 99999],
+        }, format='json')
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        results = resp.data['results']
+        self.assertEqual(results[dup_of_existing.id], {'status': 'linked', 'customer_id': existing.id})
+        self.assertEqual(results[fresh.id]['status'], 'created')
+        self.assertEqual(results[same_as_fresh.id]['status'], 'linked')
+        self.assertEqual(results[same_as_fresh.id]['customer_id'], results[fresh.id]['customer_id'])
+        self.assertEqual(results[done.id]['status'], 'skipped')
+        self.assertEqual(results[99999]['status'], 'not_found')
+        self.assertEqual(Customer.objects.count(), 2)
+
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, 'converted')
+        customer = Customer.objects.get(pk=fresh.converted_customer_id)
+        self.assertIn('Lawn Care', customer.fleet_description)
+        self.assertEqual(customer.created_by, self.user)
+
+    def test_without_dedupe_every_lead_gets_a_customer(self):
+        Customer.objects.create(business_name='Acme')
+        leads = [Lead.objects.create(business_name='Acme') for _ in range(2)]
+        results = bulk_convert_leads([l.id for l in leads], user=self.user, dedupe=False)
+        self.assertTrue(all(r['status'] == 'created' for r in results.values()))
+        self.assertEqual(Customer.objects.count(), 3)
+
+    def test_geocode_fills_coordinates(self):
+        from types import SimpleNamespace
+        lead = Lead.objects.create(business_name='Geo', address='1847 River Dr', city='Davenport')
+        geocoder = lambda query: SimpleNamespace(latitude=41.5236, longitude=-90.5776)
+        results = bulk_convert_leads([lead.id], user=self.user, geocode=True, geocoder=geocoder)
+        customer = Customer.objects.get(pk=results[lead.id]['customer_id'])
+        self.assertAlmostEqual(float(customer.latitude), 41.5236)
+
+
+class CallQueueTest(TestCase):
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        self.user = User.objects.create_user(username='rep', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.localdate()
+        self.very_overdue = Customer.objects.create(
+            business_name='Very Overdue', created_by=self.user,
+            next_call_date=self.today - timedelta(days=5),
+        )
+        self.due_today = Customer.objects.create(
+            business_name='Due Today', created_by=self.user, next_call_date=self.today,
+        )
+        Customer.objects.create(
+            business_name='Not Yet', created_by=self.user, next_call_date=self.today + timedelta(days=3),
+        )
+        self.hot_lead = Lead.objects.create(business_name='Hot Lead', score=5, status='quoted', created_by=self.user)
+
+    def test_queue_is_ranked_across_sources(self):
+        CallQueueBuilder(self.user).build()
+        order = [
+            (e.customer_id, e.lead_id)
+            for e in CallQueueEntry.objects.filter(user=self.user).order_by('-priority', 'id')
+        ]
+        self.assertEqual(order, [
+            (None, self.hot_lead.id),
+            (self.very_overdue.id, None),
+            (self.due_today.id, None),
+        ])
+
+    def test_high_priority_reminder_boosts_customer(self):
+        from apps.reminders.models import Reminder
+        Reminder.objects.create(
+            customer=self.due_today, title='Urgent', priority='high',
+            reminder_date=self.today, created_by=self.user,
+        )
+        CallQueueBuilder(self.user).build()
+        entry = CallQueueEntry.objects.get(customer=self.due_today)
+        self.assertEqual(entry.priority, 60)
+        self.assertEqual(len(entry.reasons), 2)
+
+    def test_next_pops_in_priority_order_and_builds_lazily(self):
+        resp = self.client.post('/call-queue/next/')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['target_type'], 'lead')
+        self.assertEqual(resp.data['name'], 'Hot Lead')
+        resp = self.client.post('/call-queue/next/')
+        self.assertEqual(resp.data['customer'], self.very_overdue.id)
+        resp = self.client.get('/call-queue/')
+        self.assertEqual(resp.data['count'], 1)
+
+    def test_logging_activity_marks_customer_called(self):
+        from django.utils import timezone
+        from apps.activities.models import Activity, ActivityType
+        CallQueueBuilder(self.user).build()
+        call = ActivityType.objects.create(name='call', display_name='Call', icon='phone')
+        Activity.objects.create(
+            customer=self.very_overdue, activity_type=call, activity_datetime=timezone.now(),
+        )
+        self.assertEqual(CallQueueEntry.objects.get(customer=self.very_overdue).status, 'done')
+        # Rebuilding doesn't bring a called customer back
+        CallQueueBuilder(self.user).build()
+        self.assertEqual(CallQueueEntry.objects.filter(customer=self.very_overdue).count(), 1)
+
+    def test_late_evening_call_clears_todays_queue(self):
+        from datetime import datetime, time
+        from django.utils import timezone
+        from apps.activities.models import Activity, ActivityType
+        CallQueueBuilder(self.user).build()
+        call = ActivityType.objects.create(name='call', display_name='Call', icon='phone')
+        # 23:30 in Chicago is already tomorrow in UTC
+        Activity.objects.create(
+            customer=self.due_today, activity_type=call,
+            activity_datetime=timezone.make_aware(datetime.combine(self.today, time(23, 30))),
+        )
+        self.assertEqual(CallQueueEntry.objects.get(customer=self.due_today).status, 'done')
+
+    def test_one_entry_per_target_a_day(self):
+        from django.db import IntegrityError, transaction
+        CallQueueBuilder(self.user).build()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CallQueueEntry.objects.create(
+                user=self.user, queue_date=self.today, customer=self.due_today, priority=1,
+            )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CallQueueEntry.objects.create(user=self.user, queue_date=self.today, lead=self.hot_lead, priority=1)
+
+    def test_empty_queue_returns_204(self):
+        other = User.objects.create_user(username='other', password='x')
+        self.assertIsNone(pop_next(other))
+
+
+class CustomerActivityTimelineTest(TestCase):
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.activities.models import Activity, ActivityType
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.customer = Customer.objects.create(business_name='Timeline Co')
+        call = ActivityType.objects.create(name='call', display_name='Call', icon='phone')
+        now = timezone.now()
+        self.activities = [
+            Activity.objects.create(
+                customer=self.customer, activity_type=call, subject=f'Call {i}',
+                activity_datetime=now - timedelta(days=i),
+            )
+            for i in range(5)
+        ]
+
+    def test_timeline_is_cursor_paginated_newest_first(self):
+        url = f'/customers/{self.customer.id}/activities/'
+        resp = self.client.get(url, {'page_size': 2})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['subject'] for a in resp.data['results']], ['Call 0', 'Call 1'])
+        self.assertIsNotNone(resp.data['next'])
+
+        seen = []
+        next_url = url + '?page_size=2'
+        while next_url:
+            resp = self.client.get(next_url)
+            seen.extend(a['subject'] for a in resp.data['results'])
+            next_url = resp.data['next']
+        self.assertEqual(seen, [f'Call {i}' for i in range(5)])
+
+    def test_since_returns_only_changed_rows(self):
+        url = f'/customers/{self.customer.id}/activities/'
+        first = self.client.get(url, {'since': '2000-01-01T00:00:00Z'})
+        self.assertEqual(len(first.data['results']), 5)
+        self.assertFalse(first.data['has_more'])
+
+        params = {'since': first.data['next_since'].isoformat(), 'since_id': first.data['next_since_id']}
+        self.assertEqual(self.client.get(url, params).data['results'], [])
+
+        edited = self.activities[3]
+        edited.notes = 'Updated'
+        edited.save()
+        resp = self.client.get(url, params)
+        self.assertEqual([a['id'] for a in resp.data['results']], [edited.id])
+
+    def test_since_rejects_bad_timestamp(self):
+        resp = self.client.get(f'/customers/{self.customer.id}/activities/', {'since': 'yesterday'})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import RegionViewSet, CustomerViewSet, LeadViewSet
+from .views import RegionViewSet, CustomerViewSet, LeadViewSet, DuplicateCandidateViewSet, CallQueueViewSet
 
 router = DefaultRouter()
 router.register(r'regions', RegionViewSet)
 router.register(r'customers', CustomerViewSet)
 router.register(r'leads', LeadViewSet)
+router.register(r'duplicates', DuplicateCandidateViewSet)
+router.register(r'call-queue', CallQueueViewSet, basename='call-queue')
 
 urlpatterns = [
     path('', include(router.urls)),
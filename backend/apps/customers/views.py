@@ -2,17 +2,23 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
-from .models import Region, Customer, Note, Lead
+from .models import Region, Customer, Note, Lead, DuplicateCandidate, CallQueueEntry
 from .serializers import (
     RegionSerializer,
     CustomerListSerializer,
     CustomerDetailSerializer,
     CustomerCreateUpdateSerializer,
+    CustomerBulkUpdateSerializer,
     NoteSerializer,
     LeadSerializer,
+    LeadRescoreSerializer,
+    DuplicateCandidateSerializer,
+    CallQueueEntrySerializer,
 )
+from .filters import CustomerBulkFilter
 
 
 class RegionViewSet(viewsets.ModelViewSet):
@@ -34,6 +40,8 @@ class CustomerViewSet(viewsets.ModelViewSet):
     search_fields = ['business_name', 'primary_contact', 'main_email', 'main_phone', 'city']
     ordering_fields = ['business_name', 'city', 'state', 'last_call_date', 'next_call_date', 'created_at']
     ordering = ['business_name']
+    BULK_CHUNK_SIZE = 1000
+    SINCE_LIMIT = 200
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -55,7 +63,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
         if overdue == 'true':
             from django.utils import timezone
             queryset = queryset.filter(
-                next_call_date__lt=timezone.now().date()
+                next_call_date__lt=timezone.localdate()
             )
 
         return queryset
@@ -67,6 +75,53 @@ class CustomerViewSet(viewsets.ModelViewSet):
         customer.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['post'])
+    def bulk_update(self, request):
+        """
+        Apply one field patch to many customers with a single UPDATE.
+
+        Body: ``ids`` or ``filter`` (see CustomerBulkFilter), ``patch`` and
+        optional ``dry_run`` to only report which customers would change.
+        """
+        serializer = CustomerBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if 'ids' in data:
+            queryset = Customer.objects.filter(pk__in=data['ids'])
+        else:
+            filterset = CustomerBulkFilter(data=data['filter'], queryset=Customer.objects.filter(is_active=True))
+            if not filterset.is_valid():
+                return Response({'filter': filterset.errors}, status=status.HTTP_400_BAD_REQUEST)
+            unknown = set(data['filter']) - set(filterset.filters)
+            if unknown:
+                return Response(
+                    {'filter': f"Unknown filter: {', '.join(sorted(unknown))}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = filterset.qs
+
+        patch = data['patch']
+        with transaction.atomic():
+            ids = list(queryset.select_for_update().order_by('pk').values_list('pk', flat=True))
+            if not data['dry_run'] and ids:
+                now = timezone.now()
+                for start in range(0, len(ids), self.BULK_CHUNK_SIZE):
+                    Customer.objects.filter(pk__in=ids[start:start + self.BULK_CHUNK_SIZE]).update(
+                        **patch, updated_at=now
+                    )
+                # Queryset updates skip post_save, so drop cached map tiles
+                # explicitly, once the new values are visible to other readers
+                from apps.routing.map_tiles import invalidate_layers
+                transaction.on_commit(invalidate_layers)
+
+        return Response({
+            'dry_run': data['dry_run'],
+            'count': len(ids),
+            'ids': ids,
+            'patch': {key: getattr(value, 'pk', value) for key, value in patch.items()},
+        })
+
     @action(detail=True, methods=['get', 'post'])
     def notes(self, request, pk=None):
         """Get or add notes for a customer."""
@@ -92,12 +147,56 @@ class CustomerViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def activities(self, request, pk=None):
-        """Get activities for a customer."""
+        """
+        Activity timeline for a customer, newest first, paginated by cursor.
+
+        With ``?since=<updated_at>`` (and ``since_id`` from the previous
+        response) only activities created or changed after that point are
+        returned, oldest change first, so an open page can poll cheaply.
+        """
+        from apps.activities.pagination import ActivityTimelinePagination
+        from apps.activities.serializers import ActivitySerializer
+
         customer = self.get_object()
+        activities = customer.activities.select_related('customer', 'activity_type', 'created_by')
+
+        since = request.query_params.get('since')
+        if since:
+            return self._activities_since(activities, since, request.query_params.get('since_id'))
+
+        paginator = ActivityTimelinePagination()
+        # No view: the customer list's OrderingFilter must not override the timeline ordering
+        page = paginator.paginate_queryset(activities, request)
+        return paginator.get_paginated_response(ActivitySerializer(page, many=True).data)
+
+    def _activities_since(self, activities, since, since_id):
+        from django.utils.dateparse import parse_datetime
         from apps.activities.serializers import ActivitySerializer
-        activities = customer.activities.all()
-        serializer = ActivitySerializer(activities, many=True)
-        return Response(serializer.data)
+
+        since_dt = parse_datetime(since)
+        if since_dt is None:
+            return Response({'error': 'since must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(since_dt):
+            since_dt = timezone.make_aware(since_dt)
+        try:
+            since_id = int(since_id or 0)
+        except ValueError:
+            return Response({'error': 'since_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # (updated_at, id) is a strict cursor, so rows sharing a timestamp aren't skipped
+        changed = list(
+            activities.filter(Q(updated_at__gt=since_dt) | Q(updated_at=since_dt, id__gt=since_id))
+            .order_by('updated_at', 'id')[:self.SINCE_LIMIT + 1]
+        )
+        has_more = len(changed) > self.SINCE_LIMIT
+        changed = changed[:self.SINCE_LIMIT]
+        last = changed[-1] if changed else None
+        return Response({
+            'results': ActivitySerializer(changed, many=True).data,
+            'next_since': last.updated_at if last else since_dt,
+            'next_since_id': last.id if last else since_id,
+            'has_more': has_more,
+        })
 
     @action(detail=True, methods=['get'])
     def reminders(self, request, pk=None):
@@ -108,6 +207,38 @@ class CustomerViewSet(viewsets.ModelViewSet):
         serializer = ReminderSerializer(reminders, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['post'])
+    def merge(self, request, pk=None):
+        """Merge other customers (`merge_ids`) into this one, moving all of their history."""
+        from .merge import merge_customers
+
+        survivor = self.get_object()
+        merge_ids = request.data.get('merge_ids') or []
+        if not isinstance(merge_ids, list) or not merge_ids:
+            return Response({'error': 'merge_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            merge_ids = {int(i) for i in merge_ids}
+        except (TypeError, ValueError):
+            return Response({'error': 'merge_ids must be customer IDs'}, status=status.HTTP_400_BAD_REQUEST)
+        if survivor.pk in merge_ids:
+            return Response({'error': 'Cannot merge a customer into itself'}, status=status.HTTP_400_BAD_REQUEST)
+
+        losers = list(Customer.objects.filter(pk__in=merge_ids))
+        missing = merge_ids - {c.pk for c in losers}
+        if missing:
+            return Response(
+                {'error': 'Customers not found', 'ids': sorted(missing)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        moved = merge_customers(survivor, losers)
+        survivor.refresh_from_db()
+        return Response({
+            'customer': CustomerDetailSerializer(survivor).data,
+            'merged_ids': sorted(merge_ids),
+            'moved': moved,
+        })
+
 
 class LeadViewSet(viewsets.ModelViewSet):
     """API endpoint for leads / business development prospects."""
@@ -119,27 +250,30 @@ class LeadViewSet(viewsets.ModelViewSet):
     ordering_fields = ['score', 'created_at', 'business_name']
     ordering = ['-score', '-created_at']
 
+    @action(detail=False, methods=['post'])
+    def rescore(self, request):
+        """Recompute scores for all open leads, or only `ids` (e.g. right after an import)."""
+        from .scoring import score_leads
+
+        serializer = LeadRescoreSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = None
+        ids = serializer.validated_data.get('ids')
+        if ids:
+            queryset = Lead.objects.filter(pk__in=ids)
+        return Response(score_leads(queryset))
+
     @action(detail=True, methods=['post'])
     def convert_to_customer(self, request, pk=None):
         """Convert a lead into a Customer record."""
         lead = self.get_object()
-        if lead.status == 'converted' and lead.converted_customer:
+        if lead.is_converted:
             return Response(
                 {'error': 'Lead already converted', 'customer_id': lead.converted_customer_id},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        customer = Customer.objects.create(
-            business_name=lead.business_name,
-            primary_contact=lead.contact_name,
-            main_phone=lead.phone,
-            main_email=lead.email,
-            bill_to_address=lead.address,
-            city=lead.city,
-            state=lead.state,
-            zip_code=lead.zip_code,
-            fleet_description=f"Services needed: {', '.join(lead.services_needed)}. {lead.notes}".strip(),
-            created_by=request.user,
-        )
+        customer = lead.build_customer(user=request.user)
+        customer.save()
         lead.status = 'converted'
         lead.converted_customer = customer
         lead.save()
@@ -147,3 +281,129 @@ class LeadViewSet(viewsets.ModelViewSet):
             'lead': LeadSerializer(lead).data,
             'customer_id': customer.id,
         }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def bulk_convert(self, request):
+        """
+        Convert many leads (`ids`) to customers in one transaction.
+
+        Optional `dedupe` (default true) links leads to matching existing
+        customers instead of creating new ones; `geocode` (default false)
+        looks up coordinates for the new customers.
+        """
+        from .conversion import bulk_convert_leads
+
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = [int(i) for i in ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'ids must be lead IDs'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = bulk_convert_leads(
+            ids,
+            user=request.user,
+            dedupe=_as_bool(request.data.get('dedupe', True)),
+            geocode=_as_bool(request.data.get('geocode', False)),
+        )
+        summary = {}
+        for result in results.values():
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        return Response({'results': results, 'summary': summary})
+
+
+class DuplicateCandidateViewSet(viewsets.ReadOnlyModelViewSet):
+    """Review queue of suspected duplicates (populated by `manage.py find_duplicates`)."""
+    queryset = DuplicateCandidate.objects.all()
+    serializer_class = DuplicateCandidateSerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['status', 'left_type', 'right_type']
+    ordering_fields = ['score', 'created_at']
+    ordering = ['-score', 'id']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list' and 'status' not in self.request.query_params:
+            queryset = queryset.filter(status='pending')
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['names'] = getattr(self, '_names', {})
+        return context
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self._names = self._resolve_names(page if page is not None else queryset)
+        return page
+
+    def get_object(self):
+        candidate = super().get_object()
+        self._names = self._resolve_names([candidate])
+        return candidate
+
+    @staticmethod
+    def _resolve_names(candidates):
+        """Look up display names for a page of candidates with one query per record type."""
+        ids = {'customer': set(), 'lead': set()}
+        for candidate in candidates:
+            ids[candidate.left_type].add(candidate.left_id)
+            ids[candidate.right_type].add(candidate.right_id)
+        names = {}
+        for pk, name in Customer.objects.filter(id__in=ids['customer']).values_list('id', 'business_name'):
+            names[('customer', pk)] = name
+        for pk, name in Lead.objects.filter(id__in=ids['lead']).values_list('id', 'business_name'):
+            names[('lead', pk)] = name
+        return names
+
+    @action(detail=True, methods=['post'])
+    def dismiss(self, request, pk=None):
+        """Mark a pair as not a duplicate so future scans don't re-queue it."""
+        candidate = self.get_object()
+        candidate.status = 'dismissed'
+        candidate.reviewed_by = request.user
+        candidate.save()
+        return Response(self.get_serializer(candidate).data)
+
+
+class CallQueueViewSet(viewsets.GenericViewSet):
+    """The requesting rep's prioritized call queue for today."""
+    serializer_class = CallQueueEntrySerializer
+
+    def get_queryset(self):
+        return CallQueueEntry.objects.filter(
+            user=self.request.user, queue_date=timezone.localdate(), status='queued',
+        ).select_related('customer', 'lead')
+
+    def list(self, request):
+        """Upcoming targets, best first."""
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @action(detail=False, methods=['post'])
+    def next(self, request):
+        """Serve the next target to call."""
+        from .call_queue import pop_next
+
+        entry = pop_next(request.user)
+        if entry is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(self.get_serializer(entry).data)
+
+    @action(detail=False, methods=['post'])
+    def rebuild(self, request):
+        """Recompute today's queue (targets already served or called are kept out)."""
+        from .call_queue import CallQueueBuilder
+
+        queued = CallQueueBuilder(request.user).build()
+        return Response({'queued': queued})
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.lower() in ('true', '1', 'yes')
+    return bool(value)
@@ -0,0 +1,78 @@
+"""Apply one state change to many reminders with a single UPDATE."""
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Reminder, add_business_days
+from .summary import invalidate_summaries
+
+
+OPEN_STATUSES = ['pending', 'snoozed']
+
+# Statuses each action may be applied to; other rows are skipped
+ELIGIBLE_STATUSES = {
+    'complete': OPEN_STATUSES,
+    'snooze': OPEN_STATUSES,
+    'cancel': OPEN_STATUSES,
+    'reassign': OPEN_STATUSES,
+}
+
+CHUNK_SIZE = 1000
+
+
+class BulkActionConflict(Exception):
+    """Raised for all-or-nothing requests when some reminders can't take the change."""
+
+    def __init__(self, skipped, not_found):
+        super().__init__('Some reminders cannot be changed')
+        self.skipped = skipped
+        self.not_found = not_found
+
+
+def action_changes(action, user=None, days=1, use_business_days=True, assign_to=None):
+    """Return the ``update()`` kwargs for an action; expressions keep it a single statement."""
+    now = timezone.now()
+    if action == 'complete':
+        return {'status': 'completed', 'completed_at': now, 'completed_by': user, 'updated_at': now}
+    if action == 'cancel':
+        return {'status': 'cancelled', 'updated_at': now}
+    if action == 'reassign':
+        return {'created_by': assign_to, 'updated_at': now}
+    # Same rules as Reminder.snooze(): the date is counted from today
+    today = now.date()
+    new_date = add_business_days(today, days) if use_business_days else today + timedelta(days=days)
+    return {
+        'status': 'pending',
+        'reminder_date': new_date,
+        'original_date': Coalesce('original_date', 'reminder_date'),
+        'snooze_count': F('snooze_count') + 1,
+        'updated_at': now,
+    }
+
+
+def apply_bulk_action(queryset, action, requested_ids=None, atomic=False, **options):
+    """
+    Apply ``action`` to the open reminders in ``queryset``.
+
+    Returns ``{'ids': [...], 'skipped': [...], 'not_found': [...]}``; when
+    ``atomic`` is set and anything would be skipped or is missing, raises
+    BulkActionConflict and changes nothing.
+    """
+    changes = action_changes(action, **options)
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().order_by('pk').values_list('pk', 'status'))
+        eligible = ELIGIBLE_STATUSES[action]
+        ids = [pk for pk, status in rows if status in eligible]
+        skipped = [pk for pk, status in rows if status not in eligible]
+        not_found = sorted(set(requested_ids or ()) - {pk for pk, _ in rows})
+        if atomic and (skipped or not_found):
+            raise BulkActionConflict(skipped, not_found)
+
+        for start in range(0, len(ids), CHUNK_SIZE):
+            Reminder.objects.filter(pk__in=ids[start:start + CHUNK_SIZE]).update(**changes)
+
+    # Queryset updates skip post_save, so retire cached dashboard counts explicitly
+    if ids:
+        invalidate_summaries()
+    return {'ids': ids, 'skipped': skipped, 'not_found': not_found}
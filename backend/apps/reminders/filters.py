@@ -0,0 +1,19 @@
+import django_filters
+from django.utils import timezone
+from .models import Reminder
+
+
+class ReminderBulkFilter(django_filters.FilterSet):
+    """Filter expression accepted by the reminder bulk action endpoint."""
+    reminder_date_before = django_filters.DateFilter(field_name='reminder_date', lookup_expr='lt')
+    reminder_date_after = django_filters.DateFilter(field_name='reminder_date', lookup_expr='gte')
+    overdue = django_filters.BooleanFilter(method='filter_overdue')
+
+    class Meta:
+        model = Reminder
+        fields = ['status', 'priority', 'customer', 'created_by']
+
+    def filter_overdue(self, queryset, name, value):
+        if value:
+            return queryset.filter(status='pending', reminder_date__lt=timezone.now().date())
+        return queryset
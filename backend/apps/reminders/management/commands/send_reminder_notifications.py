@@ -0,0 +1,26 @@
+"""Email due/overdue reminder digests. Run from cron, or with --loop as a worker process."""
+import time
+from django.core.management.base import BaseCommand
+from apps.reminders.notifications import dispatch_notifications
+
+
+class Command(BaseCommand):
+    help = 'Send each user one digest of their due and overdue reminders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running, checking every --interval seconds')
+        parser.add_argument('--interval', type=int, default=300, help='Seconds between checks in loop mode')
+        parser.add_argument('--batch-size', type=int, default=50, help='Emails per SMTP batch')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = dispatch_notifications(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Sent {stats['emails']} digests covering {stats['reminders']} reminders"
+            ))
+            if not options['loop']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
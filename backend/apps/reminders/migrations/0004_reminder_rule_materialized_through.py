@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reminders', '0003_reminder_rule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminderrule',
+            name='materialized_through',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,18 +1,15 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
+from apps.accounts import business_calendar
 
 
 def add_business_days(start_date, num_days):
-    """Add business days (Mon-Fri) to a date."""
-    current_date = start_date
-    days_added = 0
-    while days_added < num_days:
-        current_date += timedelta(days=1)
-        if current_date.weekday() < 5:  # Monday = 0, Friday = 4
-            days_added += 1
-    return current_date
+    """Add business days (Mon-Fri, skipping company holidays) to a date."""
+    return business_calendar.add_business_days(start_date, num_days)
 
 
 def get_default_reminder_date():
@@ -62,6 +59,16 @@ class Reminder(models.Model):
         default='pending'
     )
 
+    # Set when this row materializes one occurrence of a recurring rule
+    rule = models.ForeignKey(
+        'ReminderRule',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='occurrences'
+    )
+    occurrence_date = models.DateField(null=True, blank=True)
+
     # Snooze tracking
     original_date = models.DateField(null=True, blank=True)
     snooze_count = models.PositiveIntegerField(default=0)
@@ -90,6 +97,11 @@ class Reminder(models.Model):
             models.Index(fields=['status', 'reminder_date']),
             models.Index(fields=['customer', 'status']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['rule', 'occurrence_date'], name='unique_rule_occurrence'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.customer.business_name} ({self.reminder_date})"
@@ -126,3 +138,126 @@ class Reminder(models.Model):
         self.snooze_count += 1
         self.status = 'pending'
         self.save()
+
+
+class ReminderRule(models.Model):
+    """
+    A recurring reminder ("call every March and September").
+
+    Future occurrences are expanded on demand inside the requested date
+    window (see recurrence.py). An occurrence gets a Reminder row once it
+    comes due, or earlier when it is completed or snoozed ahead of time, so
+    overdue lists, dashboard counts and notifications see it like any
+    other reminder.
+    """
+    customer = models.ForeignKey(
+        'customers.Customer',
+        on_delete=models.CASCADE,
+        related_name='reminder_rules'
+    )
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    priority = models.CharField(
+        max_length=10,
+        choices=Reminder.PRIORITY_CHOICES,
+        default='medium'
+    )
+    reminder_time = models.TimeField(null=True, blank=True)
+    rrule = models.CharField(max_length=255, help_text='e.g. FREQ=YEARLY;BYMONTH=3,9;BYMONTHDAY=1')
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    # Last day whose occurrences have Reminder rows (see recurrence.materialize_due)
+    materialized_through = models.DateField(null=True, blank=True, editable=False)
+
+    # Metadata
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='reminder_rules'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['start_date']
+        indexes = [
+            models.Index(fields=['is_active', 'start_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.customer.business_name} ({self.rrule})"
+
+    def occurrence_dates(self, start, end):
+        from .recurrence import occurrences, parse_rrule
+        return occurrences(parse_rrule(self.rrule), self.start_date, start, end, until=self.end_date)
+
+    def build_occurrence(self, occurrence_date):
+        """An unsaved Reminder standing in for one occurrence."""
+        return Reminder(
+            customer=self.customer,
+            rule=self,
+            occurrence_date=occurrence_date,
+            title=self.title,
+            description=self.description,
+            reminder_date=occurrence_date,
+            reminder_time=self.reminder_time,
+            priority=self.priority,
+            created_by=self.created_by,
+        )
+
+    def materialize(self, occurrence_date):
+        """Return the Reminder row for an occurrence, creating it if needed."""
+        if occurrence_date not in self.occurrence_dates(occurrence_date, occurrence_date):
+            raise ValueError(f'{occurrence_date} is not an occurrence of this rule')
+        existing = self.occurrences.filter(occurrence_date=occurrence_date).first()
+        if existing:
+            return existing
+        reminder = self.build_occurrence(occurrence_date)
+        try:
+            with transaction.atomic():
+                reminder.save()
+        except IntegrityError:
+            # Materialized concurrently
+            return self.occurrences.get(occurrence_date=occurrence_date)
+        return reminder
+
+
+class ReminderNotification(models.Model):
+    """A reminder included in a notification email, so reruns don't send it again."""
+    KIND_CHOICES = [
+        ('due', 'Due'),
+        ('overdue', 'Overdue'),
+    ]
+
+    reminder = models.ForeignKey(Reminder, on_delete=models.CASCADE, related_name='notifications')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reminder_notifications')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    notify_date = models.DateField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-sent_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['reminder', 'kind', 'notify_date'], name='unique_reminder_notification'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} notice for reminder {self.reminder_id} on {self.notify_date}"
+
+
+@receiver(post_save, sender=Reminder)
+@receiver(post_delete, sender=Reminder)
+def invalidate_reminder_summaries(sender, **kwargs):
+    from .summary import invalidate_summaries
+    invalidate_summaries()
+
+
+@receiver(post_save, sender=ReminderRule)
+@receiver(post_delete, sender=ReminderRule)
+def invalidate_due_occurrences(sender, **kwargs):
+    from .recurrence import forget_materialized
+    forget_materialized()
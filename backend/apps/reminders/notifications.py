@@ -0,0 +1,93 @@
+"""Email digests of due and overdue reminders.
+
+Each run collects, with one query per kind, the pending reminders that
+haven't been notified yet today, groups them by owner and sends each
+owner a single digest. Every reminder included in a sent digest is
+recorded in ReminderNotification, which is what makes reruns (cron, or
+the command's loop mode) idempotent: a reminder gets at most one "due"
+and one "overdue" notice per day.
+"""
+from collections import defaultdict
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from apps.accounts.mail import BATCH_SIZE, send_in_batches
+from .models import Reminder, ReminderNotification
+from .recurrence import materialize_due
+
+
+def pending_notifications(today):
+    """Return ``{user: {'due': [...], 'overdue': [...]}}`` for reminders not yet notified today."""
+    materialize_due(today)
+    base = Reminder.objects.filter(
+        status='pending', created_by__is_active=True,
+    ).exclude(created_by__email='').select_related('customer', 'created_by')
+
+    kinds = {
+        'due': base.filter(reminder_date=today, created_by__profile__reminder_notifications=True),
+        'overdue': base.filter(reminder_date__lt=today, created_by__profile__overdue_notifications=True),
+    }
+    digests = defaultdict(lambda: {'due': [], 'overdue': []})
+    for kind, queryset in kinds.items():
+        already_sent = ReminderNotification.objects.filter(
+            reminder=OuterRef('pk'), kind=kind, notify_date=today,
+        )
+        queryset = queryset.filter(~Exists(already_sent))
+        for reminder in queryset.order_by('reminder_date', 'reminder_time', 'pk'):
+            digests[reminder.created_by][kind].append(reminder)
+    return digests
+
+
+def render_digest(user, due, overdue, today):
+    """Build the plain-text digest email for one user."""
+    lines = [f"Hi {user.first_name or user.username},", '']
+    if due:
+        lines.append(f"Due today ({len(due)}):")
+        lines.extend(_reminder_line(r) for r in due)
+        lines.append('')
+    if overdue:
+        lines.append(f"Overdue ({len(overdue)}):")
+        lines.extend(
+            _reminder_line(r) + f" - {(today - r.reminder_date).days} days late" for r in overdue
+        )
+        lines.append('')
+
+    total = len(due) + len(overdue)
+    return EmailMessage(
+        subject=f"{total} reminder{'s' if total != 1 else ''} need your attention",
+        body='\n'.join(lines),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+
+
+def _reminder_line(reminder):
+    when = f" at {reminder.reminder_time.strftime('%H:%M')}" if reminder.reminder_time else ''
+    phone = f" ({reminder.customer.main_phone})" if reminder.customer.main_phone else ''
+    return f"  - [{reminder.priority}] {reminder.title}: {reminder.customer.business_name}{phone}{when}"
+
+
+def dispatch_notifications(today=None, connection=None, batch_size=BATCH_SIZE):
+    """Send every pending digest. Returns ``{'emails': ..., 'reminders': ...}``."""
+    today = today or timezone.localdate()
+    messages = []
+    records = {}  # id(message) -> notification rows to save once it is sent
+    for user, kinds in pending_notifications(today).items():
+        message = render_digest(user, kinds['due'], kinds['overdue'], today)
+        messages.append(message)
+        records[id(message)] = [
+            ReminderNotification(reminder=reminder, user=user, kind=kind, notify_date=today)
+            for kind, reminders in kinds.items()
+            for reminder in reminders
+        ]
+
+    recorded = []
+
+    def record(batch):
+        rows = [row for message in batch for row in records[id(message)]]
+        ReminderNotification.objects.bulk_create(rows, ignore_conflicts=True)
+        recorded.extend(rows)
+
+    sent = send_in_batches(messages, batch_size=batch_size, connection=connection, on_sent=record)
+    return {'emails': sent, 'reminders': len(recorded)}
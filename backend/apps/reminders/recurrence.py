@@ -0,0 +1,199 @@
+"""A small subset of iCalendar RRULE for recurring reminders.
+
+Supported: ``FREQ`` (DAILY, WEEKLY, MONTHLY, YEARLY), ``INTERVAL``,
+``BYDAY`` (weekday codes, WEEKLY only), ``BYMONTH`` and ``BYMONTHDAY``.
+The rule's start date and optional end date live on ReminderRule rather
+than in the string. Occurrences are computed directly inside a window,
+without walking from the start date, so expanding a rule costs the same
+whatever its age.
+"""
+import calendar
+from datetime import date, timedelta
+from django.core.cache import cache
+from django.utils import timezone
+
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+# The last day materialize_due ran for; rule writes clear it
+MATERIALIZED_KEY = 'reminder_rules:materialized_on'
+
+
+def _int_list(value, low, high, name):
+    try:
+        numbers = sorted({int(part) for part in value.split(',')})
+    except ValueError:
+        raise ValueError(f'{name} must be a comma-separated list of numbers')
+    if not all(low <= n <= high for n in numbers):
+        raise ValueError(f'{name} values must be between {low} and {high}')
+    return numbers
+
+
+def parse_rrule(text):
+    """Parse an RRULE string into a dict; raises ValueError for anything unsupported."""
+    parts = {}
+    for part in (text or '').strip().removeprefix('RRULE:').split(';'):
+        if not part:
+            continue
+        key, sep, value = part.partition('=')
+        if not sep or not value:
+            raise ValueError(f'Malformed rule part: {part!r}')
+        parts[key.strip().upper()] = value.strip().upper()
+
+    freq = parts.pop('FREQ', None)
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+    rule = {'freq': freq, 'interval': 1, 'byday': None, 'bymonth': None, 'bymonthday': None}
+
+    if 'INTERVAL' in parts:
+        rule['interval'] = _int_list(parts.pop('INTERVAL'), 1, 1000, 'INTERVAL')[0]
+    if 'BYDAY' in parts:
+        if freq != 'WEEKLY':
+            raise ValueError('BYDAY is only supported with FREQ=WEEKLY')
+        days = parts.pop('BYDAY').split(',')
+        if not all(day in WEEKDAYS for day in days):
+            raise ValueError(f"BYDAY values must be among {', '.join(WEEKDAYS)}")
+        rule['byday'] = sorted({WEEKDAYS.index(day) for day in days})
+    if 'BYMONTH' in parts:
+        rule['bymonth'] = _int_list(parts.pop('BYMONTH'), 1, 12, 'BYMONTH')
+    if 'BYMONTHDAY' in parts:
+        rule['bymonthday'] = _int_list(parts.pop('BYMONTHDAY'), 1, 31, 'BYMONTHDAY')
+    if parts:
+        raise ValueError(f"Unsupported rule parts: {', '.join(sorted(parts))}")
+    return rule
+
+
+def _month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def _monthly_candidates(rule, dtstart, start, end):
+    months = rule['bymonth']
+    monthdays = rule['bymonthday'] or [dtstart.day]
+    step = rule['interval'] * (12 if rule['freq'] == 'YEARLY' else 1)
+    if rule['freq'] == 'YEARLY' and not months:
+        months = [dtstart.month]
+    origin = _month_index(dtstart)
+    for index in range(_month_index(start), _month_index(end) + 1):
+        year, month = divmod(index, 12)
+        month += 1
+        if rule['freq'] == 'YEARLY':
+            if (year - dtstart.year) % rule['interval'] or month not in months:
+                continue
+        elif (index - origin) % step or (months and month not in months):
+            continue
+        last_day = calendar.monthrange(year, month)[1]
+        for monthday in monthdays:
+            # Like RFC 5545, months without that day are skipped rather than clamped
+            if monthday <= last_day:
+                yield date(year, month, monthday)
+
+
+def occurrences(rule, dtstart, start, end, until=None):
+    """Dates on which ``rule`` (parsed) occurs within ``start``..``end`` inclusive."""
+    start = max(start, dtstart)
+    if until:
+        end = min(end, until)
+    if start > end:
+        return []
+
+    if rule['freq'] == 'DAILY':
+        offset = (start - dtstart).days
+        first = dtstart + timedelta(days=-(-offset // rule['interval']) * rule['interval'])
+        count = (end - first).days // rule['interval'] + 1 if first <= end else 0
+        return [first + timedelta(days=i * rule['interval']) for i in range(count)]
+
+    if rule['freq'] == 'WEEKLY':
+        weekdays = rule['byday'] or [dtstart.weekday()]
+        origin = dtstart - timedelta(days=dtstart.weekday())
+        result = []
+        day = start
+        while day <= end:
+            week = (day - origin).days // 7
+            if week % rule['interval'] == 0 and day.weekday() in weekdays:
+                result.append(day)
+            day += timedelta(days=1)
+        return result
+
+    return sorted(d for d in _monthly_candidates(rule, dtstart, start, end) if start <= d <= end)
+
+
+def expand_rules(start, end, rules=None):
+    """
+    Unsaved Reminders for every rule occurrence in ``start``..``end``.
+
+    Occurrences that already have a row (completed, snoozed, ...) are left
+    out, since that row is returned by the regular reminder queries.
+    """
+    from django.db.models import Q
+    from .models import Reminder, ReminderRule
+
+    if rules is None:
+        rules = ReminderRule.objects.filter(is_active=True)
+    rules = list(
+        rules.filter(start_date__lte=end)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=start))
+        .select_related('customer', 'created_by')
+    )
+    if not rules:
+        return []
+    taken = set(
+        Reminder.objects.filter(
+            rule__in=rules, occurrence_date__gte=start, occurrence_date__lte=end,
+        ).values_list('rule_id', 'occurrence_date')
+    )
+    return [
+        rule.build_occurrence(day)
+        for rule in rules
+        for day in rule.occurrence_dates(start, end)
+        if (rule.pk, day) not in taken
+    ]
+
+
+def materialize_due(today, rules=None):
+    """
+    Create the Reminder rows for rule occurrences up to ``today`` that don't have one.
+
+    Each rule remembers the last day it was materialized through, so a run
+    only expands the days since then; occurrences from before the rule was
+    created are never due. Returns the number of occurrences found.
+    """
+    from django.db.models import Q
+    from .models import Reminder, ReminderRule
+    from .summary import invalidate_summaries
+
+    if rules is None:
+        rules = ReminderRule.objects.filter(is_active=True)
+    rules = list(
+        rules.filter(start_date__lte=today)
+        .filter(Q(materialized_through__isnull=True) | Q(materialized_through__lt=today))
+        .select_related('customer', 'created_by')
+    )
+    if not rules:
+        return 0
+    rows = []
+    for rule in rules:
+        if rule.materialized_through:
+            start = rule.materialized_through + timedelta(days=1)
+        else:
+            start = max(rule.start_date, timezone.localtime(rule.created_at).date())
+        rows.extend(rule.build_occurrence(day) for day in rule.occurrence_dates(start, today))
+    # Completed or snoozed-ahead occurrences already have a row; keep it
+    Reminder.objects.bulk_create(rows, ignore_conflicts=True)
+    ReminderRule.objects.filter(pk__in=[rule.pk for rule in rules]).update(materialized_through=today)
+    if rows:
+        invalidate_summaries()
+    return len(rows)
+
+
+def ensure_materialized(today):
+    """Run materialize_due at most once per day, or again after a rule changes."""
+    if cache.get(MATERIALIZED_KEY) == today.isoformat():
+        return
+    # Marked before running, so a rule saved meanwhile clears the mark again
+    cache.set(MATERIALIZED_KEY, today.isoformat(), None)
+    materialize_due(today)
+
+
+def forget_materialized():
+    cache.delete(MATERIALIZED_KEY)
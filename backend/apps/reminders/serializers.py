@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Reminder
+from django.contrib.auth.models import User
+from .models import Reminder, ReminderRule
 
 
 class ReminderSerializer(serializers.ModelSerializer):
@@ -8,6 +9,9 @@ class ReminderSerializer(serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     is_overdue = serializers.BooleanField(read_only=True)
     is_today = serializers.BooleanField(read_only=True)
+    # Identifies a rule occurrence whether or not it has a row yet; pass its
+    # date to the rule's complete/snooze actions
+    occurrence_key = serializers.SerializerMethodField()
 
     class Meta:
         model = Reminder
@@ -16,13 +20,20 @@ class ReminderSerializer(serializers.ModelSerializer):
             'title', 'description', 'reminder_date', 'reminder_time',
             'priority', 'status', 'original_date', 'snooze_count',
             'created_by', 'created_by_name', 'created_at', 'updated_at',
-            'completed_at', 'completed_by', 'is_overdue', 'is_today'
+            'completed_at', 'completed_by', 'is_overdue', 'is_today',
+            'rule', 'occurrence_date', 'occurrence_key'
         ]
         read_only_fields = [
             'created_by', 'created_at', 'updated_at',
-            'completed_at', 'completed_by', 'original_date', 'snooze_count'
+            'completed_at', 'completed_by', 'original_date', 'snooze_count',
+            'rule', 'occurrence_date'
         ]
 
+    def get_occurrence_key(self, obj):
+        if obj.rule_id is None:
+            return None
+        return f'{obj.rule_id}:{obj.occurrence_date.isoformat()}'
+
 
 class ReminderCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -35,3 +46,61 @@ class ReminderCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data['created_by'] = self.context['request'].user
         return super().create(validated_data)
+
+
+class ReminderSnoozeSerializer(serializers.Serializer):
+    """Validates the body of a snooze action."""
+    days = serializers.IntegerField(default=1, min_value=1)
+    use_business_days = serializers.BooleanField(default=True)
+
+
+class ReminderRuleSerializer(serializers.ModelSerializer):
+    customer_name = serializers.CharField(source='customer.business_name', read_only=True)
+
+    class Meta:
+        model = ReminderRule
+        fields = [
+            'id', 'customer', 'customer_name', 'title', 'description', 'priority',
+            'reminder_time', 'rrule', 'start_date', 'end_date', 'is_active',
+            'created_by', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['created_by', 'created_at', 'updated_at']
+
+    def validate_rrule(self, value):
+        from .recurrence import parse_rrule
+        try:
+            parse_rrule(value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value.strip().upper().removeprefix('RRULE:')
+
+    def validate(self, attrs):
+        start = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if start and end and end < start:
+            raise serializers.ValidationError({'end_date': 'Must be on or after start_date.'})
+        return attrs
+
+    def create(self, validated_data):
+        validated_data['created_by'] = self.context['request'].user
+        return super().create(validated_data)
+
+
+class ReminderBulkActionSerializer(serializers.Serializer):
+    """Validates a bulk reminder action: which reminders (IDs or a filter) and what to do."""
+    ACTIONS = ['complete', 'snooze', 'cancel', 'reassign']
+
+    action = serializers.ChoiceField(choices=ACTIONS)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    filter = serializers.DictField(required=False, allow_empty=False)
+    days = serializers.IntegerField(default=1, min_value=1)
+    use_business_days = serializers.BooleanField(default=True)
+    assign_to = serializers.PrimaryKeyRelatedField(queryset=User.objects.filter(is_active=True), required=False)
+    atomic = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide exactly one of ids or filter.')
+        if attrs['action'] == 'reassign' and 'assign_to' not in attrs:
+            raise serializers.ValidationError({'assign_to': 'Required for reassign.'})
+        return attrs
@@ -0,0 +1,76 @@
+"""Cached reminder dashboard counts.
+
+Every open browser tab polls the dashboard summary, so the counts are
+computed with one conditional aggregation and cached briefly per scope
+(everyone's reminders, or one user's). Upcoming rule occurrences that have
+no row yet are expanded and counted too, as the reminder lists show them. Reminder writes bump a version
+counter, which retires every cached summary at once; paths that write with
+bulk_create or queryset.update() must call ``invalidate_summaries()``.
+"""
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from .models import Reminder, ReminderRule
+from .recurrence import expand_rules
+
+
+SUMMARY_CACHE_SECONDS = 30
+VERSION_KEY = 'reminder_summary:version'
+
+
+def summary_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_summaries():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def compute_summary(today, user=None):
+    """Count pending reminders per dashboard bucket in a single query, plus upcoming rule occurrences."""
+    week_end = today + timedelta(days=(6 - today.weekday()))
+    next_monday = today + timedelta(days=(7 - today.weekday()))
+    next_sunday = next_monday + timedelta(days=6)
+    end_30_days = today + timedelta(days=30)
+
+    pending = Reminder.objects.filter(status='pending')
+    rules = ReminderRule.objects.filter(is_active=True)
+    if user is not None:
+        pending = pending.filter(created_by=user)
+        rules = rules.filter(created_by=user)
+
+    summary = pending.aggregate(
+        overdue=Count('id', filter=Q(reminder_date__lt=today)),
+        today=Count('id', filter=Q(reminder_date=today)),
+        this_week=Count('id', filter=Q(reminder_date__gte=today, reminder_date__lte=week_end)),
+        next_week=Count('id', filter=Q(reminder_date__gte=next_monday, reminder_date__lte=next_sunday)),
+        next_30_days=Count('id', filter=Q(reminder_date__gte=today, reminder_date__lte=end_30_days)),
+        total_pending=Count('id'),
+    )
+    # Due occurrences already have rows (see recurrence.materialize_due); count the rest
+    for occurrence in expand_rules(today, max(end_30_days, next_sunday), rules):
+        day = occurrence.reminder_date
+        summary['today'] += day == today
+        summary['this_week'] += day <= week_end
+        summary['next_week'] += next_monday <= day <= next_sunday
+        summary['next_30_days'] += day <= end_30_days
+    return summary
+
+
+def get_summary(user=None):
+    """Return the dashboard counts, for ``user``'s reminders only when given."""
+    from .recurrence import ensure_materialized
+
+    today = timezone.now().date()
+    ensure_materialized(today)
+    scope = user.pk if user is not None else 'all'
+    key = f'reminder_summary:v{summary_version()}:{scope}:{today.isoformat()}'
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_summary(today, user)
+        cache.set(key, summary, SUMMARY_CACHE_SECONDS)
+    return summary
@@ -1,3 +1,328 @@
+from datetime import timedelta
+from django.core.cache import cache
 from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.customers.models import Customer
+from apps.reminders.models import Reminder
 
-# Create your tests here.
+
+class ReminderDashboardSummaryTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rep', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.customer = Customer.objects.create(business_name='Acme Lawn', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date()
+
+    def _remind(self, days, user=None, **extra):
+        return Reminder.objects.create(
+            customer=self.customer, title='Call back', created_by=user or self.user,
+            reminder_date=self.today + timedelta(days=days), **extra,
+        )
+
+    def test_counts_match_buckets_in_one_query(self):
+        self._remind(-3)
+        self._remind(0)
+        self._remind(10)
+        self._remind(45)
+        self._remind(0, status='completed')
+        self._remind(0, user=self.other)
+
+        cache.clear()
+        with self.assertNumQueries(3):  # rule occurrences due today, the counts, upcoming rules
+            resp = self.client.get('/reminders/dashboard_summary/')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['overdue'], 1)
+        self.assertEqual(resp.data['today'], 2)
+        self.assertEqual(resp.data['next_30_days'], 3)
+        self.assertEqual(resp.data['total_pending'], 5)
+
+        resp = self.client.get('/reminders/dashboard_summary/', {'mine': 'true'})
+        self.assertEqual(resp.data['today'], 1)
+        self.assertEqual(resp.data['total_pending'], 4)
+
+    def test_cached_until_reminders_change(self):
+        reminder = self._remind(0)
+        self.client.get('/reminders/dashboard_summary/')
+        with self.assertNumQueries(0):
+            resp = self.client.get('/reminders/dashboard_summary/')
+        self.assertEqual(resp.data['today'], 1)
+
+        self.client.post(f'/reminders/{reminder.pk}/complete/')
+        resp = self.client.get('/reminders/dashboard_summary/')
+        self.assertEqual(resp.data['today'], 0)
+
+
+class ReminderBulkActionTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rep', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.customer = Customer.objects.create(business_name='Acme Lawn', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date()
+
+    def _remind(self, days, **extra):
+        return Reminder.objects.create(
+            customer=self.customer, title='Call back', created_by=self.user,
+            reminder_date=self.today + timedelta(days=days), **extra,
+        )
+
+    def _post(self, **data):
+        return self.client.post('/reminders/bulk_action/', data, format='json')
+
+    def test_complete_overdue_by_filter(self):
+        overdue = [self._remind(-d) for d in (1, 5, 20)]
+        upcoming = self._remind(3)
+        resp = self._post(action='complete', filter={'overdue': True})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(resp.data['ids']), sorted(r.pk for r in overdue))
+        self.assertEqual(Reminder.objects.filter(status='completed', completed_by=self.user).count(), 3)
+        upcoming.refresh_from_db()
+        self.assertEqual(upcoming.status, 'pending')
+
+    def test_snooze_keeps_first_original_date_in_one_update(self):
+        fresh = self._remind(-2)
+        snoozed_before = self._remind(-1, original_date=self.today - timedelta(days=9), snooze_count=2)
+        with self.assertNumQueries(4):  # savepoint, lock, update, release
+            resp = self._post(action='snooze', ids=[fresh.pk, snoozed_before.pk], days=3, use_business_days=False)
+        self.assertEqual(resp.data['count'], 2)
+
+        fresh.refresh_from_db()
+        snoozed_before.refresh_from_db()
+        self.assertEqual(fresh.reminder_date, self.today + timedelta(days=3))
+        self.assertEqual((fresh.original_date, fresh.snooze_count), (self.today - timedelta(days=2), 1))
+        self.assertEqual(
+            (snoozed_before.original_date, snoozed_before.snooze_count),
+            (self.today - timedelta(days=9), 3),
+        )
+
+    def test_atomic_request_changes_nothing_on_conflict(self):
+        open_reminder = self._remind(0)
+        done = self._remind(0, status='completed')
+        resp = self._post(action='cancel', ids=[open_reminder.pk, done.pk, 999], atomic=True)
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual((resp.data['skipped'], resp.data['not_found']), ([done.pk], [999]))
+        open_reminder.refresh_from_db()
+        self.assertEqual(open_reminder.status, 'pending')
+
+        resp = self._post(action='cancel', ids=[open_reminder.pk, done.pk])
+        self.assertEqual((resp.data['ids'], resp.data['skipped']), ([open_reminder.pk], [done.pk]))
+
+    def test_reassign_and_dashboard_cache_refresh(self):
+        reminder = self._remind(0)
+        self.assertEqual(self.client.get('/reminders/dashboard_summary/', {'mine': 'true'}).data['today'], 1)
+        resp = self._post(action='reassign', ids=[reminder.pk], assign_to=self.other.pk)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.created_by, self.other)
+        self.assertEqual(self.client.get('/reminders/dashboard_summary/', {'mine': 'true'}).data['today'], 0)
+
+        self.assertEqual(self._post(action='reassign', ids=[reminder.pk]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._post(action='complete').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReminderNotificationTest(TestCase):
+
+    def setUp(self):
+        self.rep = User.objects.create_user(username='rep', email='rep@example.com', first_name='Ann')
+        self.quiet = User.objects.create_user(username='quiet', email='quiet@example.com')
+        self.quiet.profile.reminder_notifications = False
+        self.quiet.profile.save()
+        self.customer = Customer.objects.create(business_name='Acme Lawn', main_phone='563-555-0100')
+        self.today = timezone.localdate()
+
+    def _remind(self, user, days, **extra):
+        return Reminder.objects.create(
+            customer=self.customer, title='Call back', created_by=user,
+            reminder_date=self.today + timedelta(days=days), **extra,
+        )
+
+    def test_one_digest_per_user_and_reruns_send_nothing(self):
+        from django.core import mail
+        from django.core.management import call_command
+        from io import StringIO
+
+        self._remind(self.rep, 0)
+        self._remind(self.rep, -4)
+        self._remind(self.rep, 2)
+        self._remind(self.rep, 0, status='completed')
+        self._remind(self.quiet, 0)
+        self._remind(self.quiet, -1)
+
+        call_command('send_reminder_notifications', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        by_recipient = {message.to[0]: message for message in mail.outbox}
+        rep_mail = by_recipient['rep@example.com']
+        self.assertIn('Due today (1)', rep_mail.body)
+        self.assertIn('4 days late', rep_mail.body)
+        self.assertIn('563-555-0100', rep_mail.body)
+        # Due notices are switched off for this user; overdue ones still go out
+        self.assertNotIn('Due today', by_recipient['quiet@example.com'].body)
+
+        call_command('send_reminder_notifications', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+
+        # A newly due reminder is picked up on the next run
+        self._remind(self.rep, 0)
+        call_command('send_reminder_notifications', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn('Due today (1)', mail.outbox[2].body)
+        self.assertNotIn('Overdue', mail.outbox[2].body)
+
+    def test_failed_batch_is_not_recorded(self):
+        from unittest import mock
+        from apps.reminders.models import ReminderNotification
+        from apps.reminders.notifications import dispatch_notifications
+
+        self._remind(self.rep, 0)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError), \
+                self.assertLogs('apps.accounts.mail', level='ERROR'):
+            self.assertEqual(dispatch_notifications(), {'emails': 0, 'reminders': 0})
+        self.assertFalse(ReminderNotification.objects.exists())
+        self.assertEqual(dispatch_notifications()['emails'], 1)
+
+
+class ReminderRuleTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='rep', password='testpass123')
+        self.customer = Customer.objects.create(business_name='Acme Lawn', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date()
+
+    def _rule(self, rrule, **extra):
+        resp = self.client.post('/reminders/rules/', {
+            'customer': self.customer.pk, 'title': 'Seasonal check-in', 'rrule': rrule,
+            'start_date': str(extra.pop('start_date', self.today - timedelta(days=400))), **extra,
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED, resp.data)
+        return resp.data['id']
+
+    def test_rrule_expansion(self):
+        from datetime import date
+        from apps.reminders.recurrence import occurrences, parse_rrule
+
+        seasonal = parse_rrule('FREQ=YEARLY;BYMONTH=3,9;BYMONTHDAY=1')
+        self.assertEqual(
+            occurrences(seasonal, date(2020, 1, 15), date(2026, 1, 1), date(2026, 12, 31)),
+            [date(2026, 3, 1), date(2026, 9, 1)],
+        )
+        biweekly = parse_rrule('FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH')
+        self.assertEqual(
+            occurrences(biweekly, date(2026, 1, 5), date(2026, 1, 1), date(2026, 1, 25)),
+            [date(2026, 1, 5), date(2026, 1, 8), date(2026, 1, 19), date(2026, 1, 22)],
+        )
+        month_end = parse_rrule('FREQ=MONTHLY;BYMONTHDAY=31')
+        self.assertEqual(
+            occurrences(month_end, date(2026, 1, 1), date(2026, 1, 1), date(2026, 4, 30)),
+            [date(2026, 1, 31), date(2026, 3, 31)],
+        )
+        self.assertEqual(
+            occurrences(parse_rrule('FREQ=DAILY;INTERVAL=3'), date(2026, 1, 1), date(2026, 1, 5), date(2026, 1, 12),
+                        until=date(2026, 1, 10)),
+            [date(2026, 1, 7), date(2026, 1, 10)],
+        )
+        for bad in ('FREQ=HOURLY', 'FREQ=DAILY;BYDAY=MO', 'FREQ=MONTHLY;BYMONTHDAY=40', 'FREQ=YEARLY;COUNT=3'):
+            with self.assertRaises(ValueError):
+                parse_rrule(bad)
+
+    def test_occurrences_are_virtual_until_due(self):
+        rule_id = self._rule('FREQ=DAILY')
+        resp = self.client.get('/reminders/today/')
+        self.assertEqual(len(resp.data), 1)
+        # Today's occurrence is due, so it has a row; days before the rule existed don't
+        self.assertEqual(Reminder.objects.get().pk, resp.data[0]['id'])
+        self.assertEqual((resp.data[0]['rule'], resp.data[0]['occurrence_date']), (rule_id, str(self.today)))
+        upcoming = self.client.get('/reminders/next_30_days/').data
+        self.assertEqual(len(upcoming), 31)
+        self.assertIsNone(upcoming[1]['id'])
+        self.assertEqual(upcoming[1]['occurrence_key'], f'{rule_id}:{self.today + timedelta(days=1)}')
+        self.assertEqual(Reminder.objects.count(), 1)
+
+        resp = self.client.post(f'/reminders/rules/{rule_id}/complete/', {'date': str(self.today)})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['status'], 'completed')
+        self.assertEqual(Reminder.objects.count(), 1)
+        self.assertEqual(self.client.get('/reminders/today/').data, [])
+        self.assertEqual(len(self.client.get('/reminders/next_30_days/').data), 30)
+
+    def test_past_occurrences_are_overdue_counted_and_notified(self):
+        from apps.reminders.models import ReminderRule
+        from apps.reminders.notifications import dispatch_notifications
+        from apps.reminders.recurrence import materialize_due
+
+        self.user.email = 'rep@example.com'
+        self.user.save()
+        rule_id = self._rule('FREQ=WEEKLY', start_date=self.today - timedelta(days=14))
+        # As if the rule had been created two weeks ago and nothing has looked at it since
+        ReminderRule.objects.filter(pk=rule_id).update(created_at=timezone.now() - timedelta(days=14))
+
+        overdue = self.client.get('/reminders/overdue/').data
+        self.assertEqual(
+            [r['occurrence_date'] for r in overdue],
+            [str(self.today - timedelta(days=14)), str(self.today - timedelta(days=7))],
+        )
+        self.assertTrue(all(r['id'] for r in overdue))
+        summary = self.client.get('/reminders/dashboard_summary/').data
+        self.assertEqual((summary['overdue'], summary['today']), (2, 1))
+        self.assertEqual(dispatch_notifications()['reminders'], 3)
+
+        # Later runs only expand the days since the last one
+        self.assertEqual(materialize_due(self.today), 0)
+        self.assertEqual(Reminder.objects.filter(rule=rule_id).count(), 3)
+
+    def test_snoozed_occurrence_moves_as_a_real_reminder(self):
+        rule_id = self._rule('FREQ=WEEKLY', start_date=self.today)
+        resp = self.client.post(f'/reminders/rules/{rule_id}/snooze/', {
+            'date': str(self.today), 'days': 2, 'use_business_days': False,
+        })
+        self.assertEqual(resp.data['reminder_date'], str(self.today + timedelta(days=2)))
+        self.assertEqual(resp.data['original_date'], str(self.today))
+
+        week = self.client.get('/reminders/next_30_days/').data
+        self.assertEqual(
+            [(r['reminder_date'], r['id'] is not None) for r in week[:2]],
+            [(str(self.today + timedelta(days=2)), True), (str(self.today + timedelta(days=7)), False)],
+        )
+
+        # Repeating the action reuses the same row; dates off the rule are rejected
+        self.client.post(f'/reminders/rules/{rule_id}/snooze/', {'date': str(self.today)})
+        self.assertEqual(Reminder.objects.count(), 1)
+        resp = self.client.post(f'/reminders/rules/{rule_id}/complete/', {'date': str(self.today + timedelta(days=1))})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        for days in ('soon', 0):
+            resp = self.client.post(f'/reminders/rules/{rule_id}/snooze/', {'date': str(self.today), 'days': days})
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_summary_counts_match_the_lists(self):
+        self._rule('FREQ=WEEKLY', start_date=self.today)
+        summary = self.client.get('/reminders/dashboard_summary/').data
+        for bucket, view in (('today', 'today'), ('this_week', 'week'), ('next_week', 'next_week'),
+                             ('next_30_days', 'next_30_days')):
+            self.assertEqual(summary[bucket], len(self.client.get(f'/reminders/{view}/').data), bucket)
+        self.assertEqual(summary['next_30_days'], 5)
+
+    def test_occurrence_preview_validates_window(self):
+        rule_id = self._rule('FREQ=DAILY')
+        url = f'/reminders/rules/{rule_id}/occurrences/'
+        resp = self.client.get(url, {'start': '2026-03-01', 'end': '2026-03-03'})
+        self.assertEqual(len(resp.data['dates']), 3)
+        for params in ({'start': '2026-02-30'}, {'start': '2026-03-05', 'end': '2026-03-01'},
+                       {'start': '2026-01-01', 'end': '2040-01-01'}):
+            self.assertEqual(self.client.get(url, params).status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_invalid_rule_rejected(self):
+        resp = self.client.post('/reminders/rules/', {
+            'customer': self.customer.pk, 'title': 'Bad', 'rrule': 'FREQ=SOMETIMES', 'start_date': str(self.today),
+        })
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('rrule', resp.data)
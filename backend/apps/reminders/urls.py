@@ -1,8 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ReminderViewSet
+from .views import ReminderViewSet, ReminderRuleViewSet
 
 router = DefaultRouter()
+# Registered first so 'rules/' isn't taken for a reminder ID
+router.register(r'rules', ReminderRuleViewSet, basename='reminder-rule')
 router.register(r'', ReminderViewSet, basename='reminder')
 
 urlpatterns = [
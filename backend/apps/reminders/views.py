@@ -3,9 +3,19 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from datetime import timedelta
-from .models import Reminder
-from .serializers import ReminderSerializer, ReminderCreateSerializer
+from django.utils.dateparse import parse_date
+from datetime import time, timedelta
+from .models import Reminder, ReminderRule
+from .recurrence import ensure_materialized, expand_rules
+from .filters import ReminderBulkFilter
+from .serializers import (
+    ReminderSerializer, ReminderCreateSerializer, ReminderBulkActionSerializer, ReminderRuleSerializer,
+    ReminderSnoozeSerializer,
+)
+
+
+# Longest window a rule's occurrences can be previewed over
+MAX_OCCURRENCE_WINDOW_DAYS = 366
 
 
 class ReminderViewSet(viewsets.ModelViewSet):
@@ -38,6 +48,7 @@ class ReminderViewSet(viewsets.ModelViewSet):
     def overdue(self, request):
         """Get overdue reminders."""
         today = timezone.now().date()
+        ensure_materialized(today)
         reminders = self.get_queryset().filter(
             status='pending',
             reminder_date__lt=today
@@ -45,14 +56,24 @@ class ReminderViewSet(viewsets.ModelViewSet):
         serializer = ReminderSerializer(reminders, many=True)
         return Response(serializer.data)
 
+    def _pending_between(self, start, end):
+        """Pending reminders in the window, plus future recurring-rule occurrences expanded on the fly."""
+        ensure_materialized(timezone.now().date())
+        reminders = list(self.get_queryset().filter(
+            status='pending',
+            reminder_date__gte=start,
+            reminder_date__lte=end
+        ))
+        if self.request.query_params.get('status', 'pending') == 'pending':
+            reminders.extend(expand_rules(start, end))
+            reminders.sort(key=lambda r: (r.reminder_date, r.reminder_time or time.min))
+        return reminders
+
     @action(detail=False, methods=['get'])
     def today(self, request):
         """Get reminders due today."""
         today = timezone.now().date()
-        reminders = self.get_queryset().filter(
-            status='pending',
-            reminder_date=today
-        )
+        reminders = self._pending_between(today, today)
         serializer = ReminderSerializer(reminders, many=True)
         return Response(serializer.data)
 
@@ -61,11 +82,7 @@ class ReminderViewSet(viewsets.ModelViewSet):
         """Get reminders due this week."""
         today = timezone.now().date()
         week_end = today + timedelta(days=(6 - today.weekday()))  # Sunday
-        reminders = self.get_queryset().filter(
-            status='pending',
-            reminder_date__gte=today,
-            reminder_date__lte=week_end
-        )
+        reminders = self._pending_between(today, week_end)
         serializer = ReminderSerializer(reminders, many=True)
         return Response(serializer.data)
 
@@ -75,11 +92,7 @@ class ReminderViewSet(viewsets.ModelViewSet):
         today = timezone.now().date()
         next_monday = today + timedelta(days=(7 - today.weekday()))
         next_sunday = next_monday + timedelta(days=6)
-        reminders = self.get_queryset().filter(
-            status='pending',
-            reminder_date__gte=next_monday,
-            reminder_date__lte=next_sunday
-        )
+        reminders = self._pending_between(next_monday, next_sunday)
         serializer = ReminderSerializer(reminders, many=True)
         return Response(serializer.data)
 
@@ -88,42 +101,17 @@ class ReminderViewSet(viewsets.ModelViewSet):
         """Get reminders due in the next 30 days."""
         today = timezone.now().date()
         end_date = today + timedelta(days=30)
-        reminders = self.get_queryset().filter(
-            status='pending',
-            reminder_date__gte=today,
-            reminder_date__lte=end_date
-        )
+        reminders = self._pending_between(today, end_date)
         serializer = ReminderSerializer(reminders, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def dashboard_summary(self, request):
-        """Get summary counts for dashboard."""
-        today = timezone.now().date()
-        week_end = today + timedelta(days=(6 - today.weekday()))
-        next_monday = today + timedelta(days=(7 - today.weekday()))
-        next_sunday = next_monday + timedelta(days=6)
-        end_30_days = today + timedelta(days=30)
-
-        pending = self.get_queryset().filter(status='pending')
-
-        return Response({
-            'overdue': pending.filter(reminder_date__lt=today).count(),
-            'today': pending.filter(reminder_date=today).count(),
-            'this_week': pending.filter(
-                reminder_date__gte=today,
-                reminder_date__lte=week_end
-            ).count(),
-            'next_week': pending.filter(
-                reminder_date__gte=next_monday,
-                reminder_date__lte=next_sunday
-            ).count(),
-            'next_30_days': pending.filter(
-                reminder_date__gte=today,
-                reminder_date__lte=end_30_days
-            ).count(),
-            'total_pending': pending.count(),
-        })
+        """Get summary counts for dashboard (`mine=true` counts only the user's own reminders)."""
+        from .summary import get_summary
+
+        mine = request.query_params.get('mine', '').lower() in ('true', '1', 'yes')
+        return Response(get_summary(user=request.user if mine else None))
 
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
@@ -137,9 +125,9 @@ class ReminderViewSet(viewsets.ModelViewSet):
     def snooze(self, request, pk=None):
         """Snooze a reminder."""
         reminder = self.get_object()
-        days = int(request.data.get('days', 1))
-        use_business_days = request.data.get('use_business_days', True)
-        reminder.snooze(days=days, use_business_days=use_business_days)
+        snooze = ReminderSnoozeSerializer(data=request.data)
+        snooze.is_valid(raise_exception=True)
+        reminder.snooze(**snooze.validated_data)
         serializer = ReminderSerializer(reminder)
         return Response(serializer.data)
 
@@ -151,3 +139,114 @@ class ReminderViewSet(viewsets.ModelViewSet):
         reminder.save()
         serializer = ReminderSerializer(reminder)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def bulk_action(self, request):
+        """
+        Complete, snooze, cancel or reassign many reminders with one UPDATE.
+
+        Body: `action`, `ids` or `filter` (see ReminderBulkFilter), `days` and
+        `use_business_days` for snooze, `assign_to` (user ID) for reassign,
+        and `atomic` to change nothing unless every reminder can be changed.
+        """
+        from .bulk import BulkActionConflict, apply_bulk_action
+
+        serializer = ReminderBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if 'ids' in data:
+            queryset = Reminder.objects.filter(pk__in=data['ids'])
+        else:
+            filterset = ReminderBulkFilter(data=data['filter'], queryset=Reminder.objects.all())
+            if not filterset.is_valid():
+                return Response({'filter': filterset.errors}, status=status.HTTP_400_BAD_REQUEST)
+            unknown = set(data['filter']) - set(filterset.filters)
+            if unknown:
+                return Response(
+                    {'filter': f"Unknown filter: {', '.join(sorted(unknown))}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = filterset.qs
+
+        try:
+            result = apply_bulk_action(
+                queryset,
+                data['action'],
+                requested_ids=data.get('ids'),
+                atomic=data['atomic'],
+                user=request.user,
+                days=data['days'],
+                use_business_days=data['use_business_days'],
+                assign_to=data.get('assign_to'),
+            )
+        except BulkActionConflict as conflict:
+            return Response({
+                'error': 'No reminders were changed: some cannot take this action.',
+                'skipped': conflict.skipped,
+                'not_found': conflict.not_found,
+            }, status=status.HTTP_409_CONFLICT)
+
+        return Response({'action': data['action'], 'count': len(result['ids']), **result})
+
+
+class ReminderRuleViewSet(viewsets.ModelViewSet):
+    """API endpoint for recurring reminder rules."""
+    queryset = ReminderRule.objects.select_related('customer')
+    serializer_class = ReminderRuleSerializer
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filterset_fields = ['customer', 'is_active', 'priority']
+    search_fields = ['title', 'customer__business_name']
+
+    def _occurrence(self, request):
+        """Materialize the occurrence named by `date`, or return an error Response."""
+        rule = self.get_object()
+        try:
+            occurrence_date = parse_date(str(request.data.get('date', '')))
+        except ValueError:
+            occurrence_date = None
+        if occurrence_date is None:
+            return None, Response({'error': 'date (YYYY-MM-DD) is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return rule.materialize(occurrence_date), None
+        except ValueError as exc:
+            return None, Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=['get'])
+    def occurrences(self, request, pk=None):
+        """Preview occurrences between `start` and `end` (default: the next 90 days, at most a year)."""
+        rule = self.get_object()
+        today = timezone.now().date()
+        try:
+            start = parse_date(request.query_params.get('start', '')) or today
+            end = parse_date(request.query_params.get('end', '')) or start + timedelta(days=90)
+        except ValueError:
+            return Response({'error': 'Dates must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if end < start:
+            return Response({'error': 'end must be on or after start'}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days > MAX_OCCURRENCE_WINDOW_DAYS:
+            return Response(
+                {'error': f'The window can span at most {MAX_OCCURRENCE_WINDOW_DAYS} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'dates': rule.occurrence_dates(start, end)})
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Complete one occurrence (`date`), creating its reminder row."""
+        reminder, error = self._occurrence(request)
+        if error:
+            return error
+        reminder.mark_complete(user=request.user)
+        return Response(ReminderSerializer(reminder).data)
+
+    @action(detail=True, methods=['post'])
+    def snooze(self, request, pk=None):
+        """Snooze one occurrence (`date`), creating its reminder row."""
+        snooze = ReminderSnoozeSerializer(data=request.data)
+        snooze.is_valid(raise_exception=True)
+        reminder, error = self._occurrence(request)
+        if error:
+            return error
+        reminder.snooze(**snooze.validated_data)
+        return Response(ReminderSerializer(reminder).data)
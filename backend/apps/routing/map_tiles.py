@@ -0,0 +1,128 @@
+"""Server-side map clustering.
+
+Points are binned into a fixed grid inside each Web Mercator (slippy map)
+tile, so a response never holds more than GRID_SIZE ** 2 clusters per tile
+no matter how many customers there are. Each (layer, zoom, tile) result is
+cached; writes to customers or jobs bump a per-layer version so stale tiles
+simply stop being read.
+"""
+import math
+from django.core.cache import cache
+from django.db.models import Avg, Count, ExpressionWrapper, F, FloatField, Min, Sum
+from django.db.models.functions import Floor
+
+
+LAYERS = ('customers', 'jobs', 'revenue')
+GRID_SIZE = 8
+MAX_ZOOM = 18
+MAX_TILES = 64
+TILE_CACHE_SECONDS = 60 * 60 * 24
+OPEN_JOB_STATUSES = ['scheduled', 'in_progress', 'weather_delay']
+
+
+def lon_to_tile_x(lon, zoom):
+    return int((lon + 180.0) / 360.0 * (1 << zoom))
+
+
+def lat_to_tile_y(lat, zoom):
+    lat = max(min(lat, 85.0511), -85.0511)
+    lat_rad = math.radians(lat)
+    return int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * (1 << zoom))
+
+
+def tile_bounds(zoom, x, y):
+    """Return (west, south, east, north) in degrees for a tile."""
+    n = 1 << zoom
+
+    def lat(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def tiles_for_bbox(west, south, east, north, zoom):
+    """List the (x, y) tiles covering a bounding box."""
+    max_index = (1 << zoom) - 1
+    x_min = max(lon_to_tile_x(west, zoom), 0)
+    x_max = min(lon_to_tile_x(east, zoom), max_index)
+    y_min = max(lat_to_tile_y(north, zoom), 0)
+    y_max = min(lat_to_tile_y(south, zoom), max_index)
+    return [(x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
+
+
+def layer_version(layer):
+    return cache.get_or_set(f'map_tiles:version:{layer}', 1, None)
+
+
+def invalidate_layers(*layers):
+    """Bump layer versions so previously cached tiles are ignored."""
+    for layer in layers or LAYERS:
+        key = f'map_tiles:version:{layer}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+def _layer_queryset(layer):
+    """Return (queryset, latitude field, longitude field) for a layer."""
+    from apps.customers.models import Customer
+    from apps.services.models import Job
+
+    if layer == 'customers':
+        queryset = Customer.objects.filter(is_active=True)
+        return queryset, 'latitude', 'longitude'
+    if layer == 'jobs':
+        queryset = Job.objects.filter(status__in=OPEN_JOB_STATUSES)
+    else:
+        queryset = Job.objects.filter(status='completed')
+    return queryset, 'customer__latitude', 'customer__longitude'
+
+
+def compute_tile(layer, zoom, x, y):
+    """Aggregate one tile into grid-cell clusters with a single grouped query."""
+    west, south, east, north = tile_bounds(zoom, x, y)
+    queryset, lat_field, lon_field = _layer_queryset(layer)
+    queryset = queryset.filter(**{
+        f'{lat_field}__gte': south, f'{lat_field}__lt': north,
+        f'{lon_field}__gte': west, f'{lon_field}__lt': east,
+    })
+
+    cells = queryset.annotate(
+        cell_x=Floor(ExpressionWrapper(
+            (F(lon_field) - west) * (GRID_SIZE / (east - west)), output_field=FloatField()
+        )),
+        cell_y=Floor(ExpressionWrapper(
+            (F(lat_field) - south) * (GRID_SIZE / (north - south)), output_field=FloatField()
+        )),
+    ).values('cell_x', 'cell_y').annotate(
+        count=Count('id'),
+        lat=Avg(lat_field),
+        lon=Avg(lon_field),
+        customer_id=Min('id' if layer == 'customers' else 'customer_id'),
+        **({'value': Sum('price')} if layer == 'revenue' else {}),
+    ).order_by()
+
+    clusters = []
+    for cell in cells:
+        cluster = {
+            'lat': round(float(cell['lat']), 6),
+            'lon': round(float(cell['lon']), 6),
+            'count': cell['count'],
+        }
+        if layer == 'revenue':
+            cluster['value'] = float(cell['value'] or 0)
+        if cell['count'] == 1:
+            cluster['customer_id'] = cell['customer_id']
+        clusters.append(cluster)
+    return clusters
+
+
+def get_tile(layer, zoom, x, y):
+    """Return a tile's clusters from cache, computing and caching on a miss."""
+    key = f'map_tiles:{layer}:v{layer_version(layer)}:{zoom}:{x}:{y}'
+    clusters = cache.get(key)
+    if clusters is None:
+        clusters = compute_tile(layer, zoom, x, y)
+        cache.set(key, clusters, TILE_CACHE_SECONDS)
+    return clusters
@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
 
 
 class Route(models.Model):
@@ -76,3 +78,88 @@ class RouteStop(models.Model):
 
     def __str__(self):
         return f"Stop {self.stop_order}: {self.customer.business_name}"
+
+
+# Fields that decide where (and whether) a record shows up on the map
+CUSTOMER_MAP_FIELDS = ('latitude', 'longitude', 'is_active')
+JOB_MAP_FIELDS = ('status', 'customer_id', 'scheduled_date', 'price')
+
+
+def _stored_map_fields(instance, fields, update_fields):
+    """The saved values of ``fields`` before this save; None for a new row or an untouched save."""
+    if instance.pk is None:
+        return None
+    names = set(fields) | {f.removesuffix('_id') for f in fields}
+    if update_fields is not None and not names & set(update_fields):
+        return dict(zip(fields, (getattr(instance, f) for f in fields)))
+    row = type(instance)._base_manager.filter(pk=instance.pk).values_list(*fields).first()
+    return dict(zip(fields, row)) if row else None
+
+
+def _job_layers(status):
+    from .map_tiles import OPEN_JOB_STATUSES
+    if status in OPEN_JOB_STATUSES:
+        return {'jobs'}
+    if status == 'completed':
+        return {'revenue'}
+    return set()
+
+
+@receiver(pre_save, sender='customers.Customer')
+def remember_customer_map_fields(sender, instance, update_fields=None, **kwargs):
+    instance._map_fields = _stored_map_fields(instance, CUSTOMER_MAP_FIELDS, update_fields)
+
+
+@receiver(post_save, sender='customers.Customer')
+def invalidate_customer_map_tiles(sender, instance, created, **kwargs):
+    """Drop cached tiles only when the customer moved or was (de)activated."""
+    from .map_tiles import invalidate_layers
+    previous = getattr(instance, '_map_fields', None)
+    instance._map_fields = None
+    if previous is None:
+        if created and instance.latitude is not None and instance.longitude is not None:
+            invalidate_layers('customers')
+        return
+    if (previous['latitude'], previous['longitude']) != (instance.latitude, instance.longitude):
+        # Job layers are placed by their customer's coordinates too
+        invalidate_layers()
+    elif previous['is_active'] != instance.is_active:
+        invalidate_layers('customers')
+
+
+@receiver(post_delete, sender='customers.Customer')
+def invalidate_deleted_customer_map_tiles(sender, instance, **kwargs):
+    # The customer's jobs are deleted with it and invalidate their own layers
+    if instance.latitude is not None and instance.longitude is not None:
+        from .map_tiles import invalidate_layers
+        invalidate_layers('customers')
+
+
+@receiver(pre_save, sender='services.Job')
+def remember_job_map_fields(sender, instance, update_fields=None, **kwargs):
+    instance._map_fields = _stored_map_fields(instance, JOB_MAP_FIELDS, update_fields)
+
+
+@receiver(post_save, sender='services.Job')
+def invalidate_job_map_tiles(sender, instance, created, **kwargs):
+    """Drop the job layers the job was or now is on, if its status, customer, date or price changed."""
+    from .map_tiles import invalidate_layers
+    previous = getattr(instance, '_map_fields', None)
+    instance._map_fields = None
+    layers = _job_layers(instance.status)
+    if previous is not None:
+        if all(previous[f] == getattr(instance, f) for f in JOB_MAP_FIELDS):
+            return
+        layers |= _job_layers(previous['status'])
+    elif not created:
+        return
+    if layers:
+        invalidate_layers(*sorted(layers))
+
+
+@receiver(post_delete, sender='services.Job')
+def invalidate_deleted_job_map_tiles(sender, instance, **kwargs):
+    layers = _job_layers(instance.status)
+    if layers:
+        from .map_tiles import invalidate_layers
+        invalidate_layers(*sorted(layers))
@@ -1,3 +1,119 @@
+from decimal import Decimal
 from django.test import TestCase
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from apps.customers.models import Customer
+from apps.routing.map_tiles import tile_bounds, tiles_for_bbox, lon_to_tile_x, lat_to_tile_y
 
-# Create your tests here.
+
+# Roughly the Quad Cities
+QC_BBOX = '-90.75,41.40,-90.35,41.65'
+
+
+class MapTileMathTest(TestCase):
+
+    def test_tile_bounds_contain_point(self):
+        x, y = lon_to_tile_x(-90.5776, 10), lat_to_tile_y(41.5236, 10)
+        west, south, east, north = tile_bounds(10, x, y)
+        self.assertTrue(west <= -90.5776 < east)
+        self.assertTrue(south <= 41.5236 < north)
+
+    def test_tiles_for_bbox_at_zoom_zero_is_single_tile(self):
+        self.assertEqual(tiles_for_bbox(-180, -85, 180, 85, 0), [(0, 0)])
+
+
+class MapClustersAPITest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        # Two customers on the same block, one across the river
+        self.a = Customer.objects.create(
+            business_name='A', latitude=Decimal('41.5236'), longitude=Decimal('-90.5776'),
+        )
+        Customer.objects.create(
+            business_name='B', latitude=Decimal('41.5237'), longitude=Decimal('-90.5777'),
+        )
+        Customer.objects.create(
+            business_name='C', latitude=Decimal('41.4697'), longitude=Decimal('-90.5153'),
+        )
+        Customer.objects.create(business_name='No coords')
+
+    def _clusters(self, zoom=10, layer='customers'):
+        resp = self.client.get('/routes/map/', {'layer': layer, 'bbox': QC_BBOX, 'zoom': zoom})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return [c for tile in resp.data['tiles'] for c in tile['clusters']]
+
+    def test_customers_are_clustered(self):
+        clusters = self._clusters()
+        self.assertEqual(sum(c['count'] for c in clusters), 3)
+        self.assertEqual(sorted(c['count'] for c in clusters), [1, 2])
+        single = next(c for c in clusters if c['count'] == 1)
+        self.assertIn('customer_id', single)
+
+    def test_tiles_are_cached_and_invalidated_on_customer_change(self):
+        self._clusters()
+        with self.assertNumQueries(0):
+            self._clusters()
+        self.a.latitude = Decimal('41.4698')
+        self.a.longitude = Decimal('-90.5154')
+        self.a.save()
+        clusters = self._clusters()
+        self.assertEqual(sorted(c['count'] for c in clusters), [1, 2])
+        self.assertNotIn(self.a.id, [c.get('customer_id') for c in clusters])
+
+    def test_unrelated_saves_keep_tiles_cached(self):
+        from datetime import date
+        from apps.routing.map_tiles import layer_version
+        from apps.services.models import ServiceCategory, Service, Job
+        service = Service.objects.create(category=ServiceCategory.objects.create(name='Lawn'), name='Mow')
+        job = Job.objects.create(customer=self.a, service=service, scheduled_date=date(2026, 6, 1),
+                                 price=Decimal('50.00'))
+        versions = {layer: layer_version(layer) for layer in ('customers', 'jobs', 'revenue')}
+
+        def bumped():
+            return {layer for layer, version in versions.items() if layer_version(layer) != version}
+
+        self.a.main_phone = '563-555-0100'
+        self.a.last_call_date = date(2026, 6, 1)
+        self.a.save()
+        job.completion_notes = 'Gate code 1234'
+        job.save()
+        self.assertEqual(bumped(), set())
+
+        self.a.is_active = False
+        self.a.save()
+        self.assertEqual(bumped(), {'customers'})
+
+        job.status = 'completed'
+        job.save()
+        self.assertEqual(bumped(), {'customers', 'jobs', 'revenue'})
+
+    def test_revenue_layer_sums_completed_jobs(self):
+        from datetime import date
+        from apps.services.models import ServiceCategory, Service, Job
+        service = Service.objects.create(category=ServiceCategory.objects.create(name='Lawn'), name='Mow')
+        Job.objects.create(customer=self.a, service=service, scheduled_date=date.today(),
+                           price=Decimal('100.00'), status='completed')
+        Job.objects.create(customer=self.a, service=service, scheduled_date=date.today(),
+                           price=Decimal('50.00'), status='scheduled')
+        clusters = self._clusters(layer='revenue')
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['value'], 100.0)
+
+    def test_rejects_bad_params(self):
+        resp = self.client.get('/routes/map/', {'layer': 'nope', 'bbox': QC_BBOX, 'zoom': 10})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        resp = self.client.get('/routes/map/', {'bbox': 'a,b', 'zoom': 10})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        for bbox in ('nan,0,1,1', '-inf,0,1,1', '0,0,inf,1', '-200,0,1,1', '0,-91,1,1'):
+            resp = self.client.get('/routes/map/', {'bbox': bbox, 'zoom': 0})
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, bbox)
+        resp = self.client.get('/routes/map/', {'bbox': '-180,-90,180,90', 'zoom': 0})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_rejects_too_many_tiles(self):
+        resp = self.client.get('/routes/map/', {'bbox': '-120,30,-70,49', 'zoom': 12})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
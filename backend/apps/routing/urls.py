@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import RouteViewSet
+from .views import RouteViewSet, map_clusters
 
 router = DefaultRouter()
 router.register(r'', RouteViewSet, basename='route')
 
 urlpatterns = [
+    path('map/', map_clusters, name='map-clusters'),
     path('', include(router.urls)),
 ]
@@ -1,8 +1,8 @@
 from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from django.utils import timezone
-from math import radians, cos, sin, asin, sqrt
+from math import radians, cos, sin, asin, sqrt, isfinite
 from .models import Route, RouteStop
 from .serializers import RouteSerializer, RouteStopSerializer, RouteCreateSerializer
 from apps.customers.models import Customer
@@ -173,3 +173,51 @@ class RouteViewSet(viewsets.ModelViewSet):
         stop.save()
 
         return Response(RouteStopSerializer(stop).data)
+
+
+@api_view(['GET'])
+def map_clusters(request):
+    """
+    Clustered map points for a bounding box.
+
+    Query params: ``layer`` (customers, jobs or revenue), ``bbox``
+    (west,south,east,north in degrees) and ``zoom`` (0-18).
+    """
+    from .map_tiles import LAYERS, MAX_TILES, MAX_ZOOM, get_tile, tiles_for_bbox
+
+    layer = request.query_params.get('layer', 'customers')
+    if layer not in LAYERS:
+        return Response(
+            {'error': f"layer must be one of: {', '.join(LAYERS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        west, south, east, north = (float(v) for v in request.query_params.get('bbox', '').split(','))
+        zoom = int(request.query_params.get('zoom', ''))
+    except ValueError:
+        return Response(
+            {'error': 'bbox=west,south,east,north and integer zoom are required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    valid_bbox = (
+        all(isfinite(v) for v in (west, south, east, north))
+        and -180 <= west < east <= 180 and -90 <= south < north <= 90
+    )
+    if not 0 <= zoom <= MAX_ZOOM or not valid_bbox:
+        return Response({'error': 'Invalid bbox or zoom'}, status=status.HTTP_400_BAD_REQUEST)
+
+    tiles = tiles_for_bbox(west, south, east, north, zoom)
+    if len(tiles) > MAX_TILES:
+        return Response(
+            {'error': f'Bounding box spans {len(tiles)} tiles; zoom out or shrink it (max {MAX_TILES})'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response({
+        'layer': layer,
+        'zoom': zoom,
+        'tiles': [
+            {'x': x, 'y': y, 'clusters': get_tile(layer, zoom, x, y)}
+            for x, y in tiles
+        ],
+    })
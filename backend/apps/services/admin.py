@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ServiceCategory, Service, Job, Estimate, Invoice
+from .models import ServiceCategory, Service, Crew, Job, Estimate, Invoice
 
 
 @admin.register(ServiceCategory)
@@ -15,10 +15,18 @@ class ServiceAdmin(admin.ModelAdmin):
     search_fields = ['name']
 
 
+@admin.register(Crew)
+class CrewAdmin(admin.ModelAdmin):
+    list_display = ['name', 'daily_capacity_minutes', 'workday_start', 'workday_end', 'is_active']
+    list_filter = ['is_active']
+    search_fields = ['name']
+    filter_horizontal = ['members']
+
+
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ['service', 'customer', 'scheduled_date', 'status', 'price', 'assigned_to']
-    list_filter = ['status', 'scheduled_date', 'service__category']
+    list_filter = ['status', 'scheduled_date', 'service__category', 'crew']
     search_fields = ['customer__business_name', 'service__name']
     date_hierarchy = 'scheduled_date'
 
@@ -0,0 +1,103 @@
+"""In-process cache of the small, rarely changing catalogs.
+
+Activity types, service categories and services are loaded once per
+process and served from memory by ID or name. Each catalog has a version
+counter in the Django cache; saves and deletes bump it once their
+transaction commits (see the receivers in activities/models.py and
+services/models.py), and every process reloads when it sees a newer
+version. Returned instances are shared, so treat them as read-only.
+"""
+import threading
+import time
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+
+
+# How long a process trusts its copy before re-reading the shared version
+VERSION_CHECK_SECONDS = 1.0
+
+
+class Catalog:
+    """All rows of one model, indexed by primary key and by name."""
+
+    def __init__(self, model_label, name_field='name', select_related=()):
+        self.model_label = model_label
+        self.name_field = name_field
+        self.select_related = select_related
+        self.version_key = f'catalog:version:{model_label}'
+        self._lock = threading.Lock()
+        self._state = None  # (version, checked_at, rows, by_id, by_name)
+
+    def version(self):
+        return cache.get_or_set(self.version_key, 1, None)
+
+    def invalidate(self):
+        """Drop this process's copy and tell other processes to reload theirs."""
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 2, None)
+        self._state = None
+
+    def invalidate_on_commit(self):
+        """
+        Drop this process's copy now and bump the shared version once the
+        current transaction commits, so other processes can't reload rows
+        that aren't visible to them yet.
+        """
+        self._state = None
+        transaction.on_commit(self.invalidate)
+
+    def _load(self, version):
+        model = apps.get_model(self.model_label)
+        rows = list(model.objects.select_related(*self.select_related))
+        by_name = {}
+        for row in rows:
+            by_name.setdefault(getattr(row, self.name_field), row)
+        return version, time.monotonic(), rows, {row.pk: row for row in rows}, by_name
+
+    def _current(self):
+        state = self._state
+        if state is not None and time.monotonic() - state[1] < VERSION_CHECK_SECONDS:
+            return state
+        version = self.version()
+        if state is not None and state[0] == version:
+            state = (version, time.monotonic(), *state[2:])
+        else:
+            with self._lock:
+                state = self._load(version)
+        self._state = state
+        return state
+
+    def all(self):
+        """Every row, in the model's default ordering."""
+        return list(self._current()[2])
+
+    def get(self, pk):
+        """Row by primary key, or None."""
+        try:
+            return self._current()[3].get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by_name(self, name):
+        """First row (in default ordering) with exactly this name, or None."""
+        return self._current()[4].get(name)
+
+    def in_bulk(self, pks):
+        """Map each known primary key in ``pks`` to its row."""
+        by_id = self._current()[3]
+        return {pk: by_id[pk] for pk in pks if pk in by_id}
+
+    def filter(self, **attrs):
+        """Rows whose attributes equal every given value."""
+        return [
+            row for row in self._current()[2]
+            if all(getattr(row, attr) == value for attr, value in attrs.items())
+        ]
+
+
+activity_types = Catalog('activities.ActivityType')
+service_categories = Catalog('services.ServiceCategory')
+services = Catalog('services.Service', select_related=('category',))
@@ -0,0 +1,126 @@
+"""Company dashboard numbers, computed in four grouped queries and cached.
+
+There is a single company per deployment, so one cache entry serves every
+user. Job and Invoice saves/deletes bump a version counter (see the
+receivers in models.py); code that writes jobs or invoices with
+bulk_create or queryset.update() must call ``invalidate_dashboard()``.
+"""
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from .models import Job, Invoice
+
+
+DASHBOARD_CACHE_SECONDS = 60 * 10
+VERSION_KEY = 'services_dashboard:version'
+
+
+def dashboard_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_dashboard():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def _add_months(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def _money(value):
+    return float(value or 0)
+
+
+def compute_dashboard(today):
+    week_end = today + timedelta(days=7)
+    month_start = today.replace(day=1)
+    first_month = _add_months(month_start, -11)
+    next_month = _add_months(month_start, 1)
+
+    completed = Q(status='completed')
+    is_today = Q(scheduled_date=today)
+    this_week = Q(scheduled_date__gte=today, scheduled_date__lt=week_end)
+    this_month = Q(scheduled_date__gte=month_start, scheduled_date__lte=today)
+
+    jobs = Job.objects.filter(scheduled_date__gte=month_start, scheduled_date__lt=week_end).aggregate(
+        today_total=Count('id', filter=is_today),
+        today_completed=Count('id', filter=is_today & completed),
+        today_in_progress=Count('id', filter=is_today & Q(status='in_progress')),
+        today_scheduled=Count('id', filter=is_today & Q(status='scheduled')),
+        today_revenue=Sum('price', filter=is_today & completed),
+        week_total=Count('id', filter=this_week),
+        week_completed=Count('id', filter=this_week & completed),
+        week_revenue=Sum('price', filter=this_week & completed),
+        month_completed=Count('id', filter=this_month & completed),
+        month_revenue=Sum('price', filter=this_month & completed),
+    )
+
+    overdue = Q(due_date__lt=today)
+    invoices = Invoice.objects.exclude(status__in=['paid', 'void']).aggregate(
+        open_count=Count('id'),
+        open_total=Sum('total'),
+        open_paid=Sum('amount_paid'),
+        overdue_count=Count('id', filter=overdue),
+        overdue_total=Sum('total', filter=overdue),
+        overdue_paid=Sum('amount_paid', filter=overdue),
+    )
+
+    job_months = dict(
+        Job.objects.filter(status='completed', scheduled_date__gte=first_month, scheduled_date__lt=next_month)
+        .annotate(month=TruncMonth('scheduled_date')).values('month')
+        .annotate(revenue=Sum('price')).values_list('month', 'revenue').order_by()
+    )
+    invoice_months = dict(
+        Invoice.objects.filter(status='paid', issued_date__gte=first_month, issued_date__lt=next_month)
+        .annotate(month=TruncMonth('issued_date')).values('month')
+        .annotate(revenue=Sum('total')).values_list('month', 'revenue').order_by()
+    )
+    monthly_revenue = []
+    for i in range(12):
+        month = _add_months(first_month, i)
+        monthly_revenue.append({
+            'month': month.strftime('%b %Y'),
+            'revenue': float(max(job_months.get(month) or 0, invoice_months.get(month) or 0)),
+        })
+
+    return {
+        'today': {
+            'total_jobs': jobs['today_total'],
+            'completed': jobs['today_completed'],
+            'in_progress': jobs['today_in_progress'],
+            'scheduled': jobs['today_scheduled'],
+            'revenue': _money(jobs['today_revenue']),
+        },
+        'this_week': {
+            'total_jobs': jobs['week_total'],
+            'completed': jobs['week_completed'],
+            'revenue': _money(jobs['week_revenue']),
+        },
+        'this_month': {
+            'revenue': _money(jobs['month_revenue']),
+            'jobs_completed': jobs['month_completed'],
+        },
+        'outstanding': {
+            'invoices_count': invoices['open_count'],
+            'total_owed': float((invoices['open_total'] or 0) - (invoices['open_paid'] or 0)),
+            'overdue_count': invoices['overdue_count'],
+            'overdue_amount': float((invoices['overdue_total'] or 0) - (invoices['overdue_paid'] or 0)),
+        },
+        'monthly_revenue': monthly_revenue,
+    }
+
+
+def get_dashboard():
+    today = timezone.now().date()
+    key = f'services_dashboard:v{dashboard_version()}:{today.isoformat()}'
+    data = cache.get(key)
+    if data is None:
+        data = compute_dashboard(today)
+        cache.set(key, data, DASHBOARD_CACHE_SECONDS)
+    return data
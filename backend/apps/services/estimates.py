@@ -0,0 +1,108 @@
+"""Turning an accepted estimate into jobs."""
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.utils import timezone
+from apps.reminders.recurrence import occurrences, parse_rrule
+from . import catalog
+from .models import Job
+from .recurrence import FREQUENCY_RULES
+
+
+# How far ahead a schedule may spread an estimate's jobs
+MAX_SCHEDULE_DAYS = 366 * 5
+
+
+def resolve_services(line_items):
+    """
+    The catalog Service for each line item (None when it matches nothing).
+
+    ``service_id`` wins; the ``service`` name is the fallback. Services come
+    from the in-process catalog, so resolving costs no queries once it is loaded.
+    """
+    by_id = catalog.services.in_bulk({
+        int(item['service_id']) for item in line_items
+        if str(item.get('service_id') or '').isdigit()
+    })
+    resolved = []
+    for item in line_items:
+        service = None
+        if str(item.get('service_id') or '').isdigit():
+            service = by_id.get(int(item['service_id']))
+        if service is None and item.get('service'):
+            service = catalog.services.get_by_name(item['service'])
+        resolved.append(service)
+    return resolved
+
+
+def schedule_dates(start_date, count, recurrence=None, jobs_per_date=1):
+    """
+    Dates for ``count`` jobs: all on ``start_date``, or ``jobs_per_date`` per
+    occurrence of ``recurrence`` (a Service frequency such as ``weekly`` or an
+    RRULE string) from ``start_date`` on. Raises ValueError for a bad rule.
+    """
+    if not recurrence or count == 0:
+        return [start_date] * count
+    rule = parse_rrule(FREQUENCY_RULES.get(recurrence, recurrence))
+    needed = -(-count // jobs_per_date)
+    days = occurrences(rule, start_date, start_date, start_date + timedelta(days=MAX_SCHEDULE_DAYS))[:needed]
+    if len(days) < needed:
+        raise ValueError(f'The schedule has fewer than {needed} dates in the next {MAX_SCHEDULE_DAYS} days')
+    return [days[i // jobs_per_date] for i in range(count)]
+
+
+def accept_estimate(estimate, user, create_jobs=True, start_date=None, recurrence=None, jobs_per_date=1):
+    """
+    Mark ``estimate`` accepted and, optionally, create a job per matched line item.
+
+    Everything happens in one transaction with a single bulk INSERT, so a
+    failure leaves the estimate untouched. Returns ``(jobs, unmatched)``
+    where ``unmatched`` lists the indexes of line items with no service.
+    Raises ValueError for a bad schedule or price before anything is saved.
+
+    Jobs spread over a ``recurrence`` are the estimate's own schedule, so
+    they are saved as one-off jobs; otherwise each would be a separate
+    recurring template and generate_recurring_jobs would repeat them all.
+    """
+    from . import rollup
+    from .dashboard import invalidate_dashboard
+
+    start_date = start_date or timezone.localdate()
+    services = resolve_services(estimate.line_items) if create_jobs else []
+    matched = [(i, service) for i, service in enumerate(services) if service]
+    unmatched = [i for i, service in enumerate(services) if service is None]
+    dates = schedule_dates(start_date, len(matched), recurrence, jobs_per_date)
+    prices = []
+    for i, service in matched:
+        try:
+            prices.append(Decimal(str(estimate.line_items[i].get('price', service.default_price))))
+        except InvalidOperation:
+            raise ValueError(f'Line item {i} has an invalid price')
+
+    with transaction.atomic():
+        estimate.status = 'accepted'
+        estimate.responded_at = timezone.now()
+        jobs = []
+        if create_jobs:
+            jobs = Job.objects.bulk_create([
+                Job(
+                    customer_id=estimate.customer_id,
+                    service_id=service.pk,
+                    scheduled_date=day,
+                    estimated_duration=service.estimated_duration_minutes,
+                    price=price,
+                    is_recurring=service.is_recurring and not recurrence,
+                    created_by=user,
+                )
+                for (i, service), day, price in zip(matched, dates, prices)
+            ])
+            estimate.converted_to_jobs = True
+            # bulk_create skips the Job signals, so update their side effects here
+            rollup.apply_jobs(jobs)
+        estimate.save()
+
+    if jobs:
+        from apps.routing.map_tiles import invalidate_layers
+        invalidate_layers('jobs')
+        invalidate_dashboard()
+    return jobs, unmatched
@@ -0,0 +1,16 @@
+"""Rebuild the monthly job rollup, e.g. after first deploying it or a bulk import."""
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+from apps.services.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly job rollup from the job table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=parse_date, help='First day to rebuild (YYYY-MM-DD); whole months')
+        parser.add_argument('--end', type=parse_date, help='Last day to rebuild (YYYY-MM-DD); whole months')
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollup(options['start'], options['end'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} rollup rows'))
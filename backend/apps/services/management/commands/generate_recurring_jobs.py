@@ -0,0 +1,19 @@
+"""Fill the rolling horizon with jobs from recurring templates; run daily."""
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+from apps.services.recurrence import DEFAULT_HORIZON_WEEKS, generate_recurring_jobs
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming occurrences of recurring jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=DEFAULT_HORIZON_WEEKS,
+                            help=f'Horizon in weeks (default {DEFAULT_HORIZON_WEEKS})')
+        parser.add_argument('--date', type=parse_date, help='Treat this day as today (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        result = generate_recurring_jobs(today=options['date'], weeks=options['weeks'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} jobs from {result['templates']} recurring templates"
+        ))
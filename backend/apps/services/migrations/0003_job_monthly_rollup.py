@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0002_alter_invoice_invoice_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('crew', models.CharField(blank=True, max_length=200)),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('rescheduled', 'Rescheduled'), ('weather_delay', 'Weather Delay')], max_length=15)),
+                ('job_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_minutes', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='services.servicecategory')),
+            ],
+            options={
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['status', 'month'], name='services_jo_status_01d5bb_idx')],
+                'constraints': [models.UniqueConstraint(fields=('month', 'category', 'crew', 'status'), name='unique_job_rollup_bucket')],
+            },
+        ),
+    ]
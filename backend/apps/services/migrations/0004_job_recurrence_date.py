@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_job_monthly_rollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='recurrence_date',
+            field=models.DateField(blank=True, help_text='Occurrence of the parent this job was generated for', null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(fields=('recurring_parent', 'recurrence_date'), name='unique_job_recurrence'),
+        ),
+    ]
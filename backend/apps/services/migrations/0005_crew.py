@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:38
+
+import datetime
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0004_job_recurrence_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Crew',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('daily_capacity_minutes', models.IntegerField(default=480)),
+                ('workday_start', models.TimeField(default=datetime.time(7, 0))),
+                ('workday_end', models.TimeField(default=datetime.time(17, 0))),
+                ('home_latitude', models.DecimalField(blank=True, decimal_places=7, max_digits=10, null=True)),
+                ('home_longitude', models.DecimalField(blank=True, decimal_places=7, max_digits=10, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('members', models.ManyToManyField(blank=True, related_name='crews', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='crew',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='services.crew'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['crew', 'scheduled_date'], name='services_jo_crew_id_73aad4_idx'),
+        ),
+    ]
@@ -1,5 +1,8 @@
+from datetime import time
 from django.db import models
 from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
 from apps.customers.models import Customer
 
 
@@ -56,6 +59,26 @@ class Service(models.Model):
         return f"{self.name} ({self.category.name})"
 
 
+class Crew(models.Model):
+    """A field crew that jobs are assigned to"""
+    name = models.CharField(max_length=200, unique=True)
+    members = models.ManyToManyField(User, blank=True, related_name='crews')
+    daily_capacity_minutes = models.IntegerField(default=480)
+    workday_start = models.TimeField(default=time(7, 0))
+    workday_end = models.TimeField(default=time(17, 0))
+    home_latitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
+    home_longitude = models.DecimalField(max_digits=10, decimal_places=7, null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
 class Job(models.Model):
     """A scheduled or completed service job"""
     STATUS_CHOICES = [
@@ -75,7 +98,8 @@ class Job(models.Model):
     scheduled_time = models.TimeField(null=True, blank=True)
     estimated_duration = models.IntegerField(default=60, help_text='Minutes')
 
-    # Assignment
+    # Assignment; assigned_to mirrors the crew's name when a crew is set
+    crew = models.ForeignKey(Crew, null=True, blank=True, on_delete=models.SET_NULL, related_name='jobs')
     assigned_to = models.CharField(max_length=200, blank=True)
 
     # Status
@@ -94,6 +118,7 @@ class Job(models.Model):
     # Recurring
     is_recurring = models.BooleanField(default=False)
     recurring_parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='recurrences')
+    recurrence_date = models.DateField(null=True, blank=True, help_text='Occurrence of the parent this job was generated for')
 
     # Meta
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
@@ -105,12 +130,44 @@ class Job(models.Model):
         indexes = [
             models.Index(fields=['scheduled_date', 'status']),
             models.Index(fields=['customer', 'scheduled_date']),
+            models.Index(fields=['crew', 'scheduled_date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['recurring_parent', 'recurrence_date'], name='unique_job_recurrence'),
         ]
 
     def __str__(self):
         return f"{self.service.name} - {self.customer.business_name} ({self.scheduled_date})"
 
 
+class JobMonthlyRollup(models.Model):
+    """Pre-aggregated job counts, revenue and minutes per month, category, crew and status.
+
+    Maintained incrementally by the Job signals below; rebuild with
+    ``manage.py backfill_job_rollup``. Revenue is the sum of job prices and
+    minutes use the actual duration when recorded, else the estimate.
+    """
+    month = models.DateField(help_text='First day of the month')
+    category = models.ForeignKey(ServiceCategory, on_delete=models.CASCADE, related_name='monthly_rollups')
+    crew = models.CharField(max_length=200, blank=True)
+    status = models.CharField(max_length=15, choices=Job.STATUS_CHOICES)
+    job_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_minutes = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(fields=['month', 'category', 'crew', 'status'], name='unique_job_rollup_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.category_id}/{self.crew or '-'}/{self.status}: {self.job_count}"
+
+
 class Estimate(models.Model):
     """Price quotes for potential work"""
     STATUS_CHOICES = [
@@ -195,3 +252,65 @@ class Invoice(models.Model):
             else:
                 self.invoice_number = f'INV-{year}-0001'
         super().save(*args, **kwargs)
+
+
+@receiver(pre_save, sender=Service)
+def remember_service_category(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_category_id = (
+            Service.objects.filter(pk=instance.pk).values_list('category_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Service)
+def rebucket_job_rollup(sender, instance, created, **kwargs):
+    """Move the service's jobs to their new category's rollup buckets."""
+    previous = getattr(instance, '_previous_category_id', None)
+    if not created and previous is not None and previous != instance.category_id:
+        from .rollup import move_service_jobs
+        move_service_jobs(instance.pk, previous, instance.category_id)
+    instance._previous_category_id = None
+
+
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_service_catalogs(sender, **kwargs):
+    # Cached services carry their category, so both catalogs reload together
+    from .catalog import service_categories, services
+    service_categories.invalidate_on_commit()
+    services.invalidate_on_commit()
+
+
+@receiver(pre_save, sender=Job)
+def remember_job_rollup_key(sender, instance, **kwargs):
+    """Capture the pre-edit rollup bucket so an update can move the job between buckets."""
+    if instance.pk:
+        from .rollup import load_rollup_entry
+        instance._rollup_previous = load_rollup_entry(instance.pk)
+
+
+@receiver(post_save, sender=Job)
+def update_job_rollup_on_save(sender, instance, **kwargs):
+    from .rollup import apply_entry, rollup_entry
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous:
+        apply_entry(previous, sign=-1)
+    apply_entry(rollup_entry(instance))
+    instance._rollup_previous = None
+
+
+@receiver(post_delete, sender=Job)
+def update_job_rollup_on_delete(sender, instance, **kwargs):
+    from .rollup import apply_entry, rollup_entry
+    apply_entry(rollup_entry(instance), sign=-1)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+def invalidate_dashboard_cache(sender, **kwargs):
+    from .dashboard import invalidate_dashboard
+    invalidate_dashboard()
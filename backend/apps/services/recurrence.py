@@ -0,0 +1,117 @@
+"""Materialize future jobs from recurring templates.
+
+A template is a recurring job with no parent; its service's
+``recurring_frequency`` sets the cadence, starting from the template's own
+date. Each run fills a rolling horizon with child jobs, one per occurrence,
+and records the occurrence in ``recurrence_date`` so reruns (and jobs later
+rescheduled or cancelled) never produce duplicates. Occurrences outside the
+category's season are skipped; ones landing on a weekday holiday move to
+the next business day.
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from apps.accounts.business_calendar import WORKING_WEEKDAYS, get_calendar
+from apps.reminders.recurrence import occurrences, parse_rrule
+from .models import Job
+
+
+DEFAULT_HORIZON_WEEKS = 6
+BATCH_SIZE = 1000
+
+# Service.recurring_frequency -> RRULE; 'seasonal' and 'one_time' are scheduled by hand
+FREQUENCY_RULES = {
+    'weekly': 'FREQ=WEEKLY',
+    'biweekly': 'FREQ=WEEKLY;INTERVAL=2',
+    'monthly': 'FREQ=MONTHLY',
+}
+
+
+def in_season(category, day):
+    """Whether ``day`` falls inside the category's season (which may wrap the new year)."""
+    if not category.is_seasonal or not category.season_start or not category.season_end:
+        return True
+    if category.season_start <= category.season_end:
+        return category.season_start <= day.month <= category.season_end
+    return day.month >= category.season_start or day.month <= category.season_end
+
+
+def recurring_templates():
+    return (
+        Job.objects.filter(
+            is_recurring=True, recurring_parent__isnull=True,
+            service__is_active=True, service__recurring_frequency__in=FREQUENCY_RULES,
+            customer__is_active=True,
+        )
+        .exclude(status='cancelled')
+        .select_related('service__category')
+    )
+
+
+def build_occurrence(template, occurrence_date, scheduled_date):
+    return Job(
+        customer_id=template.customer_id,
+        service_id=template.service_id,
+        scheduled_date=scheduled_date,
+        scheduled_time=template.scheduled_time,
+        estimated_duration=template.estimated_duration,
+        crew_id=template.crew_id,
+        assigned_to=template.assigned_to,
+        price=template.price,
+        is_recurring=True,
+        recurring_parent=template,
+        recurrence_date=occurrence_date,
+        created_by_id=template.created_by_id,
+    )
+
+
+def plan_occurrences(templates, start, end):
+    """Unsaved jobs for every template occurrence in ``start``..``end`` that has no row yet."""
+    rules = {frequency: parse_rrule(text) for frequency, text in FREQUENCY_RULES.items()}
+    taken = set(
+        Job.objects.filter(
+            recurring_parent__isnull=False, recurrence_date__gte=start, recurrence_date__lte=end,
+        ).values_list('recurring_parent_id', 'recurrence_date')
+    )
+    # Leave room for rolling a holiday at the end of the horizon forward
+    calendar = get_calendar(start, end + timedelta(days=31))
+
+    jobs = []
+    for template in templates:
+        service = template.service
+        first = max(start, template.scheduled_date + timedelta(days=1))
+        for day in occurrences(rules[service.recurring_frequency], template.scheduled_date, first, end):
+            if (template.pk, day) in taken or not in_season(service.category, day):
+                continue
+            scheduled = day
+            if day.weekday() in WORKING_WEEKDAYS and not calendar.is_business_day(day):
+                scheduled = calendar.add(day, 1)
+            jobs.append(build_occurrence(template, day, scheduled))
+    return jobs
+
+
+def generate_recurring_jobs(today=None, weeks=DEFAULT_HORIZON_WEEKS, templates=None):
+    """
+    Create missing occurrences from ``today`` through ``weeks`` weeks ahead.
+
+    Returns ``{'templates': ..., 'created': ...}``. Safe to rerun: occurrences
+    that already have a job are skipped.
+    """
+    from . import rollup
+    from .dashboard import invalidate_dashboard
+
+    today = today or timezone.localdate()
+    end = today + timedelta(weeks=weeks)
+    templates = list(recurring_templates() if templates is None else templates)
+
+    with transaction.atomic():
+        jobs = plan_occurrences(templates, today, end)
+        created = Job.objects.bulk_create(jobs, batch_size=BATCH_SIZE)
+        # bulk_create skips the Job signals, so update their side effects here
+        rollup.apply_jobs(created)
+
+    if created:
+        from apps.routing.map_tiles import invalidate_layers
+        invalidate_layers('jobs')
+        invalidate_dashboard()
+    return {'templates': len(templates), 'created': len(created)}
@@ -0,0 +1,163 @@
+"""Maintenance of the JobMonthlyRollup table."""
+from collections import Counter
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils.dateparse import parse_date
+from . import catalog
+from .models import Job, JobMonthlyRollup, Service
+
+
+def rollup_key(scheduled_date, category_id, crew, status):
+    if isinstance(scheduled_date, str):
+        # Assigned straight from request data, e.g. by JobViewSet.reschedule
+        scheduled_date = parse_date(scheduled_date)
+    return (scheduled_date.replace(day=1), category_id, crew or '', status)
+
+
+def job_minutes(actual_duration, estimated_duration):
+    return actual_duration if actual_duration is not None else (estimated_duration or 0)
+
+
+def rollup_entry(job):
+    """Return (key, revenue, minutes) for a Job instance, or None if its service is gone."""
+    service = catalog.services.get(job.service_id)
+    if service is not None:
+        category_id = service.category_id
+    else:
+        # Not in this process's catalog yet, e.g. created by another worker a moment ago
+        category_id = Service.objects.filter(pk=job.service_id).values_list('category_id', flat=True).first()
+        if category_id is None:
+            return None
+    key = rollup_key(job.scheduled_date, category_id, job.assigned_to, job.status)
+    return key, Decimal(job.price or 0), job_minutes(job.actual_duration, job.estimated_duration)
+
+
+def load_rollup_entry(pk):
+    """Return the stored (key, revenue, minutes) for a job, or None if it no longer exists."""
+    row = Job.objects.filter(pk=pk).values_list(
+        'scheduled_date', 'service__category_id', 'assigned_to', 'status',
+        'price', 'actual_duration', 'estimated_duration',
+    ).first()
+    if row is None:
+        return None
+    return rollup_key(*row[:4]), row[4] or Decimal(0), job_minutes(row[5], row[6])
+
+
+def apply_delta(key, count, revenue, minutes):
+    """Add ``count``/``revenue``/``minutes`` to one rollup bucket, creating it if needed."""
+    month, category_id, crew, status = key
+    bucket = JobMonthlyRollup.objects.filter(month=month, category_id=category_id, crew=crew, status=status)
+    if not bucket.update(
+        job_count=F('job_count') + count, revenue=F('revenue') + revenue,
+        total_minutes=F('total_minutes') + minutes,
+    ):
+        try:
+            with transaction.atomic():
+                JobMonthlyRollup.objects.create(
+                    month=month, category_id=category_id, crew=crew, status=status,
+                    job_count=count, revenue=revenue, total_minutes=minutes,
+                )
+        except IntegrityError:
+            # Created concurrently since our update; add to it instead
+            bucket.update(
+                job_count=F('job_count') + count, revenue=F('revenue') + revenue,
+                total_minutes=F('total_minutes') + minutes,
+            )
+
+
+def apply_entry(entry, sign=1):
+    if entry is None:
+        return
+    key, revenue, minutes = entry
+    apply_delta(key, sign, sign * revenue, sign * minutes)
+
+
+def apply_entries(entries, sign=1):
+    """Fold many (key, revenue, minutes) entries into the rollup with one write per bucket."""
+    counts = Counter()
+    revenue = Counter()
+    minutes = Counter()
+    for entry in entries:
+        if entry is None:
+            continue
+        key, entry_revenue, entry_minutes = entry
+        counts[key] += 1
+        revenue[key] += entry_revenue
+        minutes[key] += entry_minutes
+    for key, count in counts.items():
+        if count:
+            apply_delta(key, sign * count, sign * revenue[key], sign * minutes[key])
+
+
+def apply_jobs(jobs, sign=1):
+    """Fold Job instances into the rollup (for bulk_create/bulk_update paths, which skip signals)."""
+    apply_entries((rollup_entry(job) for job in jobs), sign)
+
+
+def load_rollup_entries(pks):
+    """Stored entries for many jobs in one query; pair with apply_entries(..., sign=-1) before a bulk update."""
+    rows = Job.objects.filter(pk__in=pks).values_list(
+        'scheduled_date', 'service__category_id', 'assigned_to', 'status',
+        'price', 'actual_duration', 'estimated_duration',
+    )
+    return [
+        (rollup_key(*row[:4]), row[4] or Decimal(0), job_minutes(row[5], row[6]))
+        for row in rows
+    ]
+
+
+def rebuild_rollup(start_date=None, end_date=None):
+    """Recompute the rollup from the Job table for the months touching an optional date range."""
+    rollups = JobMonthlyRollup.objects.all()
+    jobs = Job.objects.all()
+    if start_date:
+        start_date = start_date.replace(day=1)
+        rollups = rollups.filter(month__gte=start_date)
+        jobs = jobs.filter(scheduled_date__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(month__lte=end_date)
+        jobs = jobs.filter(scheduled_date__lt=_next_month(end_date))
+
+    rows = _bucket_totals(jobs, 'service__category_id')
+
+    with transaction.atomic():
+        rollups.delete()
+        created = JobMonthlyRollup.objects.bulk_create(
+            [
+                JobMonthlyRollup(
+                    month=row['month'], category_id=row['service__category_id'],
+                    crew=row['assigned_to'], status=row['status'], job_count=row['jobs'],
+                    revenue=row['total'], total_minutes=row['actual'] + row['estimated'],
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def move_service_jobs(service_id, old_category_id, new_category_id):
+    """Move a service's jobs from ``old_category_id``'s buckets to ``new_category_id``'s."""
+    for row in _bucket_totals(Job.objects.filter(service_id=service_id)):
+        minutes = row['actual'] + row['estimated']
+        for category_id, sign in ((old_category_id, -1), (new_category_id, 1)):
+            key = rollup_key(row['month'], category_id, row['assigned_to'], row['status'])
+            apply_delta(key, sign * row['jobs'], sign * row['total'], sign * minutes)
+
+
+def _bucket_totals(jobs, *fields):
+    """Count, revenue and minute sums of ``jobs`` per month, crew and status (and ``fields``)."""
+    return jobs.annotate(month=TruncMonth('scheduled_date')).values(
+        'month', *fields, 'assigned_to', 'status',
+    ).annotate(
+        jobs=Count('id'),
+        total=Coalesce(Sum('price'), Decimal(0)),
+        actual=Coalesce(Sum('actual_duration'), 0),
+        estimated=Coalesce(Sum('estimated_duration', filter=Q(actual_duration__isnull=True)), 0),
+    ).order_by()
+
+
+def _next_month(day):
+    return day.replace(year=day.year + day.month // 12, month=day.month % 12 + 1, day=1)
@@ -0,0 +1,230 @@
+"""Crew workload, double-booking and capacity checks.
+
+A CrewSchedule loads the jobs of some crews over a date range in one query
+and keeps, per crew and day, the timed jobs sorted by start minute along
+with a running maximum of their end minutes. Whether a new interval
+overlaps anything is then one bisect: the only jobs that can overlap
+[start, end) start before ``end``, and one of them does exactly when the
+largest end among them is after ``start``. Jobs without a time count
+toward the day's capacity but can't conflict.
+"""
+from bisect import bisect_left
+from datetime import time, timedelta
+from .models import Crew, Job
+
+
+# Statuses that occupy a crew's time
+BOOKED_STATUSES = ['scheduled', 'in_progress', 'completed']
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def to_time(minutes):
+    minutes = max(0, min(minutes, 24 * 60 - 1))
+    return time(minutes // 60, minutes % 60)
+
+
+class SchedulingConflict(Exception):
+    """An assignment would double-book a crew or exceed its daily capacity."""
+
+    def __init__(self, check):
+        self.check = check
+        super().__init__(check.message)
+
+
+class AssignmentCheck:
+    """Outcome of checking one job against a crew's day."""
+
+    def __init__(self, crew, day, booked_minutes, duration, conflicts):
+        self.crew = crew
+        self.day = day
+        self.booked_minutes = booked_minutes
+        self.duration = duration
+        self.conflicts = conflicts
+
+    @property
+    def over_capacity(self):
+        return self.booked_minutes + self.duration > self.crew.daily_capacity_minutes
+
+    @property
+    def ok(self):
+        return not self.conflicts and not self.over_capacity
+
+    @property
+    def message(self):
+        problems = []
+        if self.conflicts:
+            problems.append(f'overlaps job(s) {", ".join(str(pk) for pk in self.conflicts)}')
+        if self.over_capacity:
+            problems.append(
+                f'needs {self.booked_minutes + self.duration} of {self.crew.daily_capacity_minutes} minutes'
+            )
+        return f'{self.crew.name} on {self.day}: ' + '; '.join(problems) if problems else ''
+
+    def as_dict(self):
+        return {
+            'crew': self.crew.pk,
+            'date': self.day,
+            'conflicts': self.conflicts,
+            'over_capacity': self.over_capacity,
+            'booked_minutes': self.booked_minutes,
+            'capacity_minutes': self.crew.daily_capacity_minutes,
+        }
+
+
+class CrewDay:
+    """One crew's booked intervals on one day."""
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.max_ends = []  # max_ends[i]: latest end among jobs 0..i
+        self.job_ids = []
+        self.untimed_ids = []
+        self.booked_minutes = 0
+
+    def add(self, job_id, start, duration):
+        """Book ``duration`` minutes, starting at minute ``start`` (None for an untimed job)."""
+        self.booked_minutes += duration
+        if start is None:
+            self.untimed_ids.append(job_id)
+            return
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, start + duration)
+        self.job_ids.insert(i, job_id)
+        previous = self.max_ends[i - 1] if i else 0
+        self.max_ends[i:] = []
+        for end in self.ends[i:]:
+            previous = max(previous, end)
+            self.max_ends.append(previous)
+
+    def overlaps(self, start, end):
+        i = bisect_left(self.starts, end)
+        return i > 0 and self.max_ends[i - 1] > start
+
+    def conflicts(self, start, end):
+        """IDs of booked jobs overlapping [start, end), latest start first."""
+        found = []
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_ends[i] > start:
+            if self.ends[i] > start:
+                found.append(self.job_ids[i])
+            i -= 1
+        return found
+
+    def free_gaps(self, day_start, day_end, min_minutes=1):
+        """Unbooked (start, end) minute ranges within the working day."""
+        gaps = []
+        cursor = day_start
+        for start, end in zip(self.starts, self.ends):
+            if start > cursor:
+                gaps.append((cursor, min(start, day_end)))
+            cursor = max(cursor, end)
+            if cursor >= day_end:
+                break
+        if cursor < day_end:
+            gaps.append((cursor, day_end))
+        return [(start, end) for start, end in gaps if end - start >= min_minutes]
+
+
+class CrewSchedule:
+    """Interval index of crews' booked jobs between two dates (inclusive)."""
+
+    def __init__(self, start, end, crews=None, exclude=()):
+        self.start = start
+        self.end = end
+        if crews is None:
+            crews = Crew.objects.filter(is_active=True)
+        self.crews = {crew.pk: crew for crew in crews}
+        self.days = {}
+        rows = (
+            Job.objects.filter(
+                crew__in=list(self.crews), scheduled_date__gte=start, scheduled_date__lte=end,
+                status__in=BOOKED_STATUSES,
+            )
+            .exclude(pk__in=exclude)
+            .values_list('pk', 'crew_id', 'scheduled_date', 'scheduled_time', 'estimated_duration')
+        )
+        for pk, crew_id, day, start_time, duration in rows:
+            self.add(crew_id, day, pk, start_time, duration)
+
+    def day(self, crew_id, day):
+        key = (crew_id, day)
+        if key not in self.days:
+            self.days[key] = CrewDay()
+        return self.days[key]
+
+    def add(self, crew_id, day, job_id, start_time, duration):
+        self.day(crew_id, day).add(
+            job_id, to_minutes(start_time) if start_time is not None else None, duration or 0,
+        )
+
+    def check(self, crew, day, start_time, duration):
+        """Check booking ``duration`` minutes for ``crew`` on ``day`` at ``start_time`` (may be None)."""
+        crew_day = self.day(crew.pk, day)
+        conflicts = []
+        if start_time is not None:
+            start = to_minutes(start_time)
+            if crew_day.overlaps(start, start + duration):
+                conflicts = crew_day.conflicts(start, start + duration)
+        return AssignmentCheck(crew, day, crew_day.booked_minutes, duration, conflicts)
+
+    def dates(self):
+        day = self.start
+        while day <= self.end:
+            yield day
+            day += timedelta(days=1)
+
+    def board(self, min_gap_minutes=15):
+        """Per crew and day: booked minutes, capacity and free gaps in the working day."""
+        board = []
+        for crew in self.crews.values():
+            day_start, day_end = to_minutes(crew.workday_start), to_minutes(crew.workday_end)
+            days = []
+            for day in self.dates():
+                crew_day = self.days.get((crew.pk, day)) or CrewDay()
+                days.append({
+                    'date': day,
+                    'job_ids': crew_day.job_ids + crew_day.untimed_ids,
+                    'booked_minutes': crew_day.booked_minutes,
+                    'capacity_minutes': crew.daily_capacity_minutes,
+                    'remaining_minutes': max(crew.daily_capacity_minutes - crew_day.booked_minutes, 0),
+                    'free_gaps': [
+                        {'start': to_time(start), 'end': to_time(end), 'minutes': end - start}
+                        for start, end in crew_day.free_gaps(day_start, day_end, min_gap_minutes)
+                    ],
+                })
+            board.append({'crew': crew.pk, 'name': crew.name, 'days': days})
+        return board
+
+
+def check_assignment(job, crew, day=None, start_time=None, duration=None):
+    """Check placing ``job`` with ``crew`` (defaults: the job's own date, time and duration)."""
+    day = day or job.scheduled_date
+    start_time = start_time if start_time is not None else job.scheduled_time
+    duration = duration if duration is not None else job.estimated_duration
+    schedule = CrewSchedule(day, day, crews=[crew], exclude=[job.pk] if job.pk else ())
+    return schedule.check(crew, day, start_time, duration or 0)
+
+
+def assign_crew(job, crew, day=None, start_time=None, allow_conflicts=False):
+    """
+    Assign ``job`` to ``crew``, optionally moving it to ``day``/``start_time``.
+
+    Raises SchedulingConflict on a double booking or over-capacity day
+    unless ``allow_conflicts`` is set, in which case the job is saved and
+    the check is returned so the caller can flag it.
+    """
+    check = check_assignment(job, crew, day, start_time)
+    if not check.ok and not allow_conflicts:
+        raise SchedulingConflict(check)
+    job.crew = crew
+    job.assigned_to = crew.name
+    job.scheduled_date = check.day
+    if start_time is not None:
+        job.scheduled_time = start_time
+    job.save()
+    return check
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import ServiceCategory, Service, Job, Estimate, Invoice
+from .models import ServiceCategory, Service, Crew, Job, Estimate, Invoice
+from . import catalog
 
 
 class ServiceSerializer(serializers.ModelSerializer):
@@ -15,7 +16,7 @@ class ServiceSerializer(serializers.ModelSerializer):
 
 
 class ServiceCategorySerializer(serializers.ModelSerializer):
-    services = ServiceSerializer(many=True, read_only=True)
+    services = serializers.SerializerMethodField()
     service_count = serializers.SerializerMethodField()
 
     class Meta:
@@ -26,8 +27,35 @@ class ServiceCategorySerializer(serializers.ModelSerializer):
             'is_active', 'sort_order', 'services', 'service_count',
         ]
 
+    # Both read the in-process catalog instead of querying once per category
+    def get_services(self, obj):
+        return ServiceSerializer(catalog.services.filter(category_id=obj.pk), many=True).data
+
     def get_service_count(self, obj):
-        return obj.services.filter(is_active=True).count()
+        return len(catalog.services.filter(category_id=obj.pk, is_active=True))
+
+
+class CrewSerializer(serializers.ModelSerializer):
+    member_names = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Crew
+        fields = [
+            'id', 'name', 'members', 'member_names', 'daily_capacity_minutes',
+            'workday_start', 'workday_end', 'home_latitude', 'home_longitude',
+            'is_active', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['created_at', 'updated_at']
+
+    def get_member_names(self, obj):
+        return [user.get_full_name() or user.username for user in obj.members.all()]
+
+    def validate(self, attrs):
+        start = attrs.get('workday_start', getattr(self.instance, 'workday_start', None))
+        end = attrs.get('workday_end', getattr(self.instance, 'workday_end', None))
+        if start and end and start >= end:
+            raise serializers.ValidationError({'workday_end': 'Must be after workday_start.'})
+        return attrs
 
 
 class JobListSerializer(serializers.ModelSerializer):
@@ -45,7 +73,7 @@ class JobListSerializer(serializers.ModelSerializer):
             'id', 'customer', 'customer_name', 'customer_address', 'customer_phone',
             'service', 'service_name', 'category_name', 'category_color', 'category_icon',
             'scheduled_date', 'scheduled_time', 'estimated_duration',
-            'assigned_to', 'status', 'price', 'is_invoiced', 'is_paid',
+            'crew', 'assigned_to', 'status', 'price', 'is_invoiced', 'is_paid',
             'is_recurring', 'completed_at', 'actual_duration',
         ]
 
@@ -58,7 +86,8 @@ class JobListSerializer(serializers.ModelSerializer):
 class JobDetailSerializer(JobListSerializer):
     class Meta(JobListSerializer.Meta):
         fields = JobListSerializer.Meta.fields + [
-            'completion_notes', 'created_by', 'created_at', 'updated_at',
+            'completion_notes', 'recurring_parent', 'recurrence_date',
+            'created_by', 'created_at', 'updated_at',
         ]
 
 
@@ -67,15 +96,57 @@ class JobCreateUpdateSerializer(serializers.ModelSerializer):
         model = Job
         fields = [
             'customer', 'service', 'scheduled_date', 'scheduled_time',
-            'estimated_duration', 'assigned_to', 'status', 'price',
+            'estimated_duration', 'crew', 'assigned_to', 'status', 'price',
             'actual_duration', 'completion_notes', 'is_recurring',
         ]
 
+    SCHEDULING_FIELDS = ('crew', 'scheduled_date', 'scheduled_time', 'estimated_duration')
+
+    def validate(self, attrs):
+        """Reject double-booking a crew or going over its daily capacity."""
+        from .scheduling import BOOKED_STATUSES, check_assignment
+
+        def value(field):
+            return attrs.get(field, getattr(self.instance, field, None))
+
+        crew = value('crew')
+        if crew is not None and 'crew' in attrs and not attrs.get('assigned_to'):
+            attrs['assigned_to'] = crew.name
+        if crew is None or value('status') not in (BOOKED_STATUSES + [None]):
+            return attrs
+        if self.instance is not None:
+            # Only a change to the slot, or booking a job that wasn't, is checked; an
+            # accepted (e.g. force-assigned) placement can still be edited otherwise
+            moved = any(
+                field in attrs and attrs[field] != getattr(self.instance, field)
+                for field in self.SCHEDULING_FIELDS
+            )
+            if not moved and self.instance.status in BOOKED_STATUSES:
+                return attrs
+        check = check_assignment(
+            self.instance or Job(), crew, value('scheduled_date'),
+            value('scheduled_time'), value('estimated_duration') or 0,
+        )
+        if not check.ok:
+            raise serializers.ValidationError({'crew': check.message})
+        return attrs
+
     def create(self, validated_data):
         validated_data['created_by'] = self.context['request'].user
         return super().create(validated_data)
 
 
+class WeatherDelaySerializer(serializers.Serializer):
+    """Validates a bulk weather delay: which day, which jobs, and how far to spread them."""
+    date = serializers.DateField()
+    business_days = serializers.IntegerField(default=3, min_value=1, max_value=10)
+    categories = serializers.PrimaryKeyRelatedField(
+        queryset=ServiceCategory.objects.all(), many=True, required=False,
+    )
+    crews = serializers.PrimaryKeyRelatedField(queryset=Crew.objects.all(), many=True, required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+
 class EstimateListSerializer(serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.business_name', read_only=True)
 
@@ -1,11 +1,18 @@
 from decimal import Decimal
+from unittest import mock
 from datetime import date, timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.db.models import Sum
 from django.test import TestCase
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework import status
 from apps.customers.models import Customer
-from apps.services.models import ServiceCategory, Service, Job, Estimate, Invoice
+from apps.services.models import ServiceCategory, Service, Crew, Job, JobMonthlyRollup, Estimate, Invoice
+from apps.services import catalog
 
 
 class BaseAPITestCase(TestCase):
@@ -56,6 +63,53 @@ class ServiceCatalogPermissionsTest(TestCase):
         self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
 
 
+class CatalogCacheTest(BaseAPITestCase):
+
+    def test_lookups_hit_memory_after_first_load(self):
+        catalog.services.get(self.service.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog.services.get(self.service.pk).category.name, 'Lawn Care')
+            self.assertEqual(catalog.services.get_by_name('Basic Mowing'), self.service)
+            self.assertIsNone(catalog.services.get('bogus'))
+
+    def test_saves_and_deletes_refresh_catalog(self):
+        self.assertEqual(catalog.service_categories.get(self.category.pk).name, 'Lawn Care')
+        self.category.name = 'Turf'
+        self.category.save()
+        self.assertEqual(catalog.service_categories.get(self.category.pk).name, 'Turf')
+        self.assertEqual(catalog.services.get(self.service.pk).category.name, 'Turf')
+
+        self.service.delete()
+        self.assertIsNone(catalog.services.get(self.service.pk))
+
+    def test_shared_version_bumps_on_commit(self):
+        version = catalog.services.version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.name = 'Premium Mowing'
+            self.service.save()
+            # Other processes keep their copy until the new row is visible to them
+            self.assertEqual(catalog.services.version(), version)
+            self.assertEqual(catalog.services.get(self.service.pk).name, 'Premium Mowing')
+        self.assertEqual(catalog.services.version(), version + 1)
+
+    def test_version_bump_from_another_process_is_picked_up(self):
+        catalog.services.get(self.service.pk)
+        Service.objects.filter(pk=self.service.pk).update(name='Premium Mowing')
+        # Simulate another worker's invalidation: only the shared version changes
+        cache.incr(catalog.services.version_key)
+        with mock.patch.object(catalog, 'VERSION_CHECK_SECONDS', 0):
+            self.assertEqual(catalog.services.get(self.service.pk).name, 'Premium Mowing')
+
+    def test_category_list_counts_from_catalog(self):
+        Service.objects.create(category=self.category, name='Edging', is_active=False)
+        catalog.services.all()
+        catalog.service_categories.all()
+        with self.assertNumQueries(1):
+            resp = self.client.get('/api/categories/')
+        self.assertEqual(resp.data[0]['service_count'], 1)
+        self.assertEqual(len(resp.data[0]['services']), 2)
+
+
 class JobViewSetTest(BaseAPITestCase):
 
     def _create_job(self, **overrides):
@@ -155,6 +209,67 @@ class EstimateViewSetTest(BaseAPITestCase):
         self.assertEqual(estimate.status, 'accepted')
         self.assertTrue(estimate.converted_to_jobs)
 
+    def _estimate(self, line_items):
+        return Estimate.objects.create(
+            customer=self.customer, title='Commercial Package', line_items=line_items, total=Decimal('0'),
+        )
+
+    def _accept(self, estimate, **body):
+        return self.client.post(f'/api/estimates/{estimate.id}/accept/', body, format='json')
+
+    def test_accept_query_count_does_not_grow_with_line_items(self):
+        other = Service.objects.create(category=self.category, name='Edging', default_price=Decimal('20.00'))
+        catalog.services.all()  # warm the catalog
+
+        def count_queries(items):
+            estimate = self._estimate(items)
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self._accept(estimate, start_date='2026-06-01')
+            self.assertEqual(resp.data['jobs_created'], len(items))
+            return len(ctx.captured_queries)
+
+        # The first accept also creates the rollup bucket the later ones add to
+        count_queries([{'service_id': self.service.id}])
+        small = count_queries([{'service_id': self.service.id}, {'service': 'Edging'}])
+        large = count_queries(
+            [{'service_id': self.service.id, 'price': 80}] * 20 + [{'service': 'Edging'}] * 20
+        )
+        self.assertEqual(small, large)
+        self.assertEqual(Job.objects.filter(service=other).count(), 21)
+        self.assertEqual(Job.objects.filter(price=Decimal('80.00')).count(), 20)
+
+    def test_accept_spreads_jobs_over_recurrence(self):
+        estimate = self._estimate([{'service_id': self.service.id}] * 5 + [{'service': 'Unknown'}])
+        resp = self._accept(estimate, start_date='2026-06-01', recurrence='weekly', jobs_per_date=2)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['unmatched_items'], [5])
+        self.assertEqual(
+            list(Job.objects.order_by('scheduled_date').values_list('scheduled_date', flat=True)),
+            [date(2026, 6, 1)] * 2 + [date(2026, 6, 8)] * 2 + [date(2026, 6, 15)],
+        )
+
+    def test_spread_jobs_are_not_recurring_templates(self):
+        from apps.services.recurrence import generate_recurring_jobs
+        self.service.is_recurring = True
+        self.service.recurring_frequency = 'weekly'
+        self.service.save()
+        estimate = self._estimate([{'service_id': self.service.id}] * 3)
+        self._accept(estimate, start_date='2026-06-01', recurrence='weekly')
+
+        self.assertFalse(Job.objects.filter(is_recurring=True).exists())
+        self.assertEqual(generate_recurring_jobs(today=date(2026, 6, 1))['created'], 0)
+        self.assertEqual(Job.objects.count(), 3)
+
+    def test_accept_failure_changes_nothing(self):
+        estimate = self._estimate([{'service_id': self.service.id}, {'service_id': self.service.id, 'price': 'n/a'}])
+        resp = self._accept(estimate)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        resp = self._accept(estimate, recurrence='FREQ=HOURLY')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        estimate.refresh_from_db()
+        self.assertEqual(estimate.status, 'draft')
+        self.assertFalse(Job.objects.exists())
+
 
 class InvoiceViewSetTest(BaseAPITestCase):
 
@@ -245,6 +360,62 @@ class DashboardSummaryTest(BaseAPITestCase):
         self.assertEqual(resp.data['today']['total_jobs'], 0)
         self.assertEqual(resp.data['today']['revenue'], 0)
 
+    def _job(self, scheduled_date, status='scheduled', price='75.00'):
+        return Job.objects.create(
+            customer=self.customer, service=self.service, scheduled_date=scheduled_date,
+            status=status, price=Decimal(price),
+        )
+
+    def _invoice(self, number, status, total, issued_date, due_date, amount_paid='0'):
+        return Invoice.objects.create(
+            customer=self.customer, invoice_number=number, subtotal=Decimal(total),
+            total=Decimal(total), amount_paid=Decimal(amount_paid), status=status,
+            issued_date=issued_date, due_date=due_date,
+        )
+
+    def test_dashboard_totals(self):
+        from django.utils import timezone
+        today = timezone.now().date()
+        self._job(today, status='completed')
+        self._job(today, status='in_progress')
+        self._job(today + timedelta(days=3))
+        self._job(today + timedelta(days=10))
+        self._invoice('INV-D1', 'paid', '100.00', today, today)
+        self._invoice('INV-D2', 'sent', '50.00', today, today - timedelta(days=1), amount_paid='20.00')
+        self._invoice('INV-D3', 'sent', '40.00', today, today + timedelta(days=30))
+
+        data = self.client.get('/api/dashboard/summary/').data
+        self.assertEqual(data['today'], {
+            'total_jobs': 2, 'completed': 1, 'in_progress': 1, 'scheduled': 0, 'revenue': 75.0,
+        })
+        self.assertEqual(data['this_week'], {'total_jobs': 3, 'completed': 1, 'revenue': 75.0})
+        self.assertEqual(data['this_month'], {'revenue': 75.0, 'jobs_completed': 1})
+        self.assertEqual(data['outstanding'], {
+            'invoices_count': 2, 'total_owed': 70.0, 'overdue_count': 1, 'overdue_amount': 30.0,
+        })
+        self.assertEqual(data['monthly_revenue'][-1], {'month': today.strftime('%b %Y'), 'revenue': 100.0})
+
+    def test_dashboard_uses_four_queries(self):
+        from django.utils import timezone
+        from apps.services.dashboard import compute_dashboard
+        with self.assertNumQueries(4):
+            compute_dashboard(timezone.now().date())
+
+    def test_dashboard_is_cached_until_a_job_or_invoice_changes(self):
+        from django.utils import timezone
+        today = timezone.now().date()
+        cache.clear()
+        self.client.get('/api/dashboard/summary/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/dashboard/summary/')
+
+        job = self._job(today, status='completed')
+        self.assertEqual(self.client.get('/api/dashboard/summary/').data['today']['completed'], 1)
+        job.delete()
+        self.assertEqual(self.client.get('/api/dashboard/summary/').data['today']['completed'], 0)
+        self._invoice('INV-D4', 'sent', '10.00', today, today + timedelta(days=30))
+        self.assertEqual(self.client.get('/api/dashboard/summary/').data['outstanding']['invoices_count'], 1)
+
 
 class ReportsEndpointTest(BaseAPITestCase):
 
@@ -260,7 +431,383 @@ class ReportsEndpointTest(BaseAPITestCase):
         self.assertIn('summary', data)
         self.assertEqual(len(data['monthly_revenue_current']), 12)
 
+    def _job(self, scheduled_date, status='completed', price='75.00', crew='', **extra):
+        return Job.objects.create(
+            customer=self.customer, service=self.service, scheduled_date=scheduled_date,
+            status=status, price=Decimal(price), assigned_to=crew, **extra,
+        )
+
+    def _bucket(self, **filters):
+        return JobMonthlyRollup.objects.filter(**filters).aggregate(
+            jobs=Sum('job_count'), revenue=Sum('revenue'), minutes=Sum('total_minutes'),
+        )
+
+    def test_rollup_follows_job_create_update_delete(self):
+        job = self._job(date(2025, 3, 10), crew='Crew A', estimated_duration=45)
+        self._job(date(2025, 3, 20), crew='Crew A', actual_duration=30)
+        self.assertEqual(
+            self._bucket(month=date(2025, 3, 1), crew='Crew A', status='completed'),
+            {'jobs': 2, 'revenue': Decimal('150.00'), 'minutes': 75},
+        )
+
+        job.scheduled_date = date(2025, 4, 2)
+        job.status = 'cancelled'
+        job.save()
+        self.assertEqual(
+            self._bucket(month=date(2025, 3, 1), status='completed'),
+            {'jobs': 1, 'revenue': Decimal('75.00'), 'minutes': 30},
+        )
+        self.assertEqual(self._bucket(month=date(2025, 4, 1), status='cancelled')['jobs'], 1)
+
+        job.delete()
+        self.assertEqual(self._bucket(month=date(2025, 4, 1))['jobs'], 0)
+
+    def test_backfill_matches_incremental_rollup(self):
+        self._job(date(2024, 12, 31), crew='Crew A')
+        self._job(date(2025, 1, 1), crew='Crew B', actual_duration=20)
+        self._job(date(2025, 1, 15), status='scheduled')
+        expected = sorted(JobMonthlyRollup.objects.values_list(
+            'month', 'category_id', 'crew', 'status', 'job_count', 'revenue', 'total_minutes',
+        ))
+
+        JobMonthlyRollup.objects.all().delete()
+        call_command('backfill_job_rollup', stdout=mock.MagicMock())
+        self.assertEqual(sorted(JobMonthlyRollup.objects.values_list(
+            'month', 'category_id', 'crew', 'status', 'job_count', 'revenue', 'total_minutes',
+        )), expected)
+
+    def test_service_category_change_moves_rollup_buckets(self):
+        self._job(date(2025, 3, 10), crew='Crew A', actual_duration=30)
+        self._job(date(2025, 4, 1), status='scheduled')
+        other = ServiceCategory.objects.create(name='Snow')
+        self.service.category = other
+        self.service.save()
+
+        self.assertEqual(self._bucket(category=self.category)['jobs'], 0)
+        self.assertEqual(
+            self._bucket(category=other, month=date(2025, 3, 1), crew='Crew A'),
+            {'jobs': 1, 'revenue': Decimal('75.00'), 'minutes': 30},
+        )
+        self.assertEqual(self._bucket(category=other, status='scheduled')['jobs'], 1)
+
+    def test_rollup_entry_falls_back_when_catalog_misses(self):
+        from apps.services import rollup
+        job = self._job(date(2025, 3, 10))
+        with mock.patch.object(catalog.services, 'get', return_value=None):
+            self.assertEqual(rollup.rollup_entry(job)[0][1], self.category.pk)
+        job.service_id = 0
+        self.assertIsNone(rollup.rollup_entry(job))
+
+    def test_reports_read_rollup(self):
+        from django.utils import timezone
+        this_year = timezone.now().year
+        self._job(date(this_year, 2, 5), crew='Crew A', price='100.00')
+        self._job(date(this_year, 2, 6), crew='Crew A')
+        self._job(date(this_year - 1, 7, 1), crew='Crew B')
+        self._job(date(this_year, 2, 7), status='scheduled', crew='Crew B')
+
+        with self.assertNumQueries(4):
+            data = self.client.get('/api/reports/').data
+        self.assertEqual(data['monthly_revenue_current'][1], {'month': 'Feb', 'revenue': 175.0, 'jobs': 2})
+        self.assertEqual(data['monthly_revenue_previous'][6], {'month': 'Jul', 'revenue': 75.0, 'jobs': 1})
+        self.assertEqual(data['jobs_by_status'], [
+            {'status': 'Completed', 'count': 3, 'color': '#16a34a'},
+            {'status': 'Scheduled', 'count': 1, 'color': '#3b82f6'},
+        ])
+        self.assertEqual(data['revenue_by_category'], [
+            {'category': 'Lawn Care', 'revenue': 250.0, 'color': '#16a34a'},
+        ])
+        self.assertEqual(data['crew_productivity'], [
+            {'name': 'Crew A', 'jobs': 2, 'revenue': 175.0},
+            {'name': 'Crew B', 'jobs': 1, 'revenue': 75.0},
+        ])
+        self.assertEqual(data['summary'], {
+            'total_revenue': 175.0, 'total_jobs': 2, 'avg_job_value': 88, 'top_category': 'Lawn Care',
+        })
+
     def test_reports_requires_auth(self):
         anon = APIClient()
         resp = anon.get('/api/reports/')
         self.assertIn(resp.status_code, [status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN])
+
+
+class RecurringJobGenerationTest(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        from apps.accounts.business_calendar import invalidate_calendar
+        invalidate_calendar()
+        self.addCleanup(invalidate_calendar)
+        self.service.is_recurring = True
+        self.service.recurring_frequency = 'weekly'
+        self.service.save()
+        # Monday
+        self.template = Job.objects.create(
+            customer=self.customer, service=self.service, scheduled_date=date(2026, 5, 4),
+            price=Decimal('75.00'), assigned_to='Crew A', is_recurring=True, created_by=self.user,
+        )
+
+    def _generate(self, today, weeks=3):
+        from apps.services.recurrence import generate_recurring_jobs
+        return generate_recurring_jobs(today=today, weeks=weeks)
+
+    def _children(self):
+        return list(self.template.recurrences.order_by('recurrence_date').values_list(
+            'recurrence_date', 'scheduled_date',
+        ))
+
+    def test_fills_horizon_and_is_idempotent(self):
+        self.assertEqual(self._generate(date(2026, 5, 1)), {'templates': 1, 'created': 2})
+        self.assertEqual(self._children(), [
+            (date(2026, 5, 11), date(2026, 5, 11)),
+            (date(2026, 5, 18), date(2026, 5, 18)),
+        ])
+        self.assertEqual(self._generate(date(2026, 5, 1))['created'], 0)
+        self.assertEqual(self._generate(date(2026, 5, 8))['created'], 1)
+
+        child = self.template.recurrences.get(recurrence_date=date(2026, 5, 25))
+        self.assertEqual((child.assigned_to, child.price, child.is_recurring), ('Crew A', Decimal('75.00'), True))
+        self.assertEqual(
+            JobMonthlyRollup.objects.filter(month=date(2026, 5, 1)).aggregate(n=Sum('job_count'))['n'], 4,
+        )
+
+    def test_rescheduled_occurrence_is_not_regenerated(self):
+        self._generate(date(2026, 5, 1))
+        child = self.template.recurrences.get(recurrence_date=date(2026, 5, 11))
+        resp = self.client.post(f'/api/jobs/{child.pk}/reschedule/', {'date': '2026-05-13'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self._generate(date(2026, 5, 1))['created'], 0)
+
+    def test_skips_out_of_season_and_rolls_holidays(self):
+        from apps.accounts.models import Holiday
+        Holiday.objects.create(date=date(2026, 5, 25), name='Memorial Day')
+        self.category.is_seasonal = True
+        self.category.season_start = 4
+        self.category.season_end = 5
+        self.category.save()
+
+        self._generate(date(2026, 5, 20), weeks=3)
+        self.assertEqual(self._children(), [(date(2026, 5, 25), date(2026, 5, 26))])
+
+    def test_cancelled_template_is_ignored(self):
+        self.template.status = 'cancelled'
+        self.template.save()
+        self.assertEqual(self._generate(date(2026, 5, 1)), {'templates': 0, 'created': 0})
+
+    def test_command(self):
+        out = mock.MagicMock()
+        call_command('generate_recurring_jobs', '--date', '2026-05-01', '--weeks', '2', stdout=out)
+        self.assertEqual(len(self._children()), 1)
+
+
+class CrewSchedulingTest(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.crew = Crew.objects.create(name='Crew A', daily_capacity_minutes=240)
+        self.crew.members.add(self.user)
+        self.day = date(2026, 6, 3)  # Wednesday
+
+    def _job(self, start, minutes=60, crew=None, **extra):
+        return Job.objects.create(
+            customer=self.customer, service=self.service, scheduled_date=self.day,
+            scheduled_time=start, estimated_duration=minutes, price=Decimal('75.00'),
+            crew=crew if crew is not None else self.crew, **extra,
+        )
+
+    def test_crew_day_interval_index(self):
+        from apps.services.scheduling import CrewDay
+        day = CrewDay()
+        day.add(1, 8 * 60, 240)   # 08:00-12:00
+        day.add(2, 9 * 60, 30)    # 09:00-09:30, already double-booked
+        day.add(3, 13 * 60, 60)   # 13:00-14:00
+        day.add(4, None, 45)
+        self.assertTrue(day.overlaps(11 * 60, 11 * 60 + 30))
+        self.assertEqual(day.conflicts(9 * 60 + 15, 10 * 60), [2, 1])
+        self.assertFalse(day.overlaps(12 * 60, 13 * 60))
+        self.assertEqual(day.booked_minutes, 375)
+        self.assertEqual(day.free_gaps(7 * 60, 17 * 60), [(420, 480), (720, 780), (840, 1020)])
+
+    def test_assign_crew_rejects_overlap_unless_forced(self):
+        from datetime import time
+        booked = self._job(time(9, 0), 90)
+        job = self._job(None, crew=Crew.objects.create(name='Crew B'))
+
+        resp = self.client.post(f'/api/jobs/{job.pk}/assign-crew/', {'crew': self.crew.pk, 'time': '10:00'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(resp.data['conflicts'], [booked.pk])
+
+        resp = self.client.post(
+            f'/api/jobs/{job.pk}/assign-crew/', {'crew': self.crew.pk, 'time': '10:00', 'force': True}, format='json',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['warnings']['conflicts'], [booked.pk])
+        job.refresh_from_db()
+        self.assertEqual((job.crew_id, job.assigned_to, job.scheduled_time), (self.crew.pk, 'Crew A', time(10, 0)))
+
+        resp = self.client.post(f'/api/jobs/{job.pk}/assign-crew/', {'crew': self.crew.pk, 'time': '10:30'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIsNone(resp.data['warnings'])
+
+    def test_force_assigned_job_can_still_be_edited(self):
+        from datetime import time
+        self._job(time(9, 0), 90)
+        job = self._job(None, crew=Crew.objects.create(name='Crew B'))
+        self.client.post(
+            f'/api/jobs/{job.pk}/assign-crew/', {'crew': self.crew.pk, 'time': '10:00', 'force': True}, format='json',
+        )
+
+        resp = self.client.patch(f'/api/jobs/{job.pk}/', {'status': 'completed', 'crew': self.crew.pk}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK, resp.data)
+        # Moving it within the day is still checked
+        resp = self.client.patch(f'/api/jobs/{job.pk}/', {'scheduled_time': '09:30'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reschedule_checks_the_crew(self):
+        from datetime import time
+        booked = self._job(time(9, 0), 90)
+        booked.scheduled_date = date(2026, 6, 4)
+        booked.save()
+        job = Job.objects.create(
+            customer=self.customer, service=self.service, scheduled_date=self.day, scheduled_time=time(10, 0),
+            estimated_duration=60, price=Decimal('75.00'), crew=self.crew,
+        )
+
+        resp = self.client.post(f'/api/jobs/{job.pk}/reschedule/', {'date': '2026-06-04'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(resp.data['conflicts'], [booked.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'scheduled')
+
+        resp = self.client.post(
+            f'/api/jobs/{job.pk}/reschedule/', {'date': '2026-06-04', 'time': '11:00'}, format='json',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(resp.data['warnings'])
+        self.assertEqual(resp.data['crew'], self.crew.pk)
+
+    def test_over_capacity_is_rejected_on_create(self):
+        from datetime import time
+        self._job(time(7, 0), 180)
+        resp = self.client.post('/api/jobs/', {
+            'customer': self.customer.pk, 'service': self.service.pk, 'scheduled_date': '2026-06-03',
+            'scheduled_time': '13:00', 'estimated_duration': 90, 'price': '75.00', 'crew': self.crew.pk,
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('240 minutes', str(resp.data['crew']))
+
+        resp = self.client.post('/api/jobs/', {
+            'customer': self.customer.pk, 'service': self.service.pk, 'scheduled_date': '2026-06-03',
+            'scheduled_time': '13:00', 'estimated_duration': 60, 'price': '75.00', 'crew': self.crew.pk,
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Job.objects.latest('pk').assigned_to, 'Crew A')
+
+    def test_week_board_lists_free_gaps(self):
+        from datetime import time
+        job = self._job(time(9, 0), 120)
+        self._job(time(13, 0), 60, status='cancelled')
+        resp = self.client.get('/api/crews/board/', {'week': '2026-06-03'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual((resp.data['start'], resp.data['end']), (date(2026, 6, 1), date(2026, 6, 7)))
+        days = resp.data['crews'][0]['days']
+        self.assertEqual(len(days), 7)
+        wednesday = days[2]
+        self.assertEqual(wednesday['job_ids'], [job.pk])
+        self.assertEqual(wednesday['remaining_minutes'], 120)
+        self.assertEqual(
+            [(gap['start'], gap['end']) for gap in wednesday['free_gaps']],
+            [(time(7, 0), time(9, 0)), (time(11, 0), time(17, 0))],
+        )
+        self.assertEqual(len(days[0]['free_gaps']), 1)
+
+
+class WeatherDelayTest(BaseAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        from apps.accounts.business_calendar import invalidate_calendar
+        invalidate_calendar()
+        self.addCleanup(invalidate_calendar)
+        self.crew = Crew.objects.create(
+            name='Crew A', daily_capacity_minutes=120,
+            home_latitude=Decimal('41.5236'), home_longitude=Decimal('-90.5776'),
+        )
+        self.rain_day = date(2026, 6, 5)  # Friday; next business days are Mon 8 - Wed 10
+
+    def _job(self, day, start=None, minutes=60, crew=None, customer=None, **extra):
+        return Job.objects.create(
+            customer=customer or self.customer, service=self.service, scheduled_date=day,
+            scheduled_time=start, estimated_duration=minutes, price=Decimal('75.00'),
+            crew=crew, assigned_to=crew.name if crew else '', **extra,
+        )
+
+    def _post(self, **body):
+        return self.client.post('/api/jobs/weather-delay/', {'date': '2026-06-05', **body}, format='json')
+
+    def test_spreads_jobs_by_capacity_in_one_pass(self):
+        from datetime import time
+        far = Customer.objects.create(
+            business_name='Far Farm', latitude=Decimal('42.5'), longitude=Decimal('-91.5'), created_by=self.user,
+        )
+        near = Customer.objects.create(
+            business_name='Near Shop', latitude=Decimal('41.52'), longitude=Decimal('-90.57'), created_by=self.user,
+        )
+        self._job(date(2026, 6, 8), time(8, 0), 60, crew=self.crew)  # Monday half full
+        first = self._job(self.rain_day, time(8, 0), 60, crew=self.crew, customer=near)
+        second = self._job(self.rain_day, time(9, 0), 60, crew=self.crew, customer=far)
+        third = self._job(self.rain_day, time(10, 0), 60, crew=self.crew, customer=near)
+        loose = self._job(self.rain_day, time(11, 0))
+        done = self._job(self.rain_day, status='completed')
+
+        resp = self._post()
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data['targets'], [date(2026, 6, 8), date(2026, 6, 9), date(2026, 6, 10)])
+        after = {c['job']: (c['after']['date'], c['after']['time']) for c in resp.data['changes']}
+        self.assertEqual(after, {
+            # Monday has room for one more hour; 08:00 is taken, so the first free gap
+            first.pk: (date(2026, 6, 8), time(7, 0)),
+            second.pk: (date(2026, 6, 9), time(9, 0)),
+            # Tuesday has room, but Wednesday is far closer to home than the farm
+            third.pk: (date(2026, 6, 10), time(10, 0)),
+            loose.pk: (date(2026, 6, 8), time(11, 0)),
+        })
+
+        self.assertEqual(
+            set(Job.objects.filter(scheduled_date=self.rain_day).values_list('pk', 'status')),
+            {(first.pk, 'weather_delay'), (second.pk, 'weather_delay'), (third.pk, 'weather_delay'),
+             (loose.pk, 'weather_delay'), (done.pk, 'completed')},
+        )
+        new_ids = {c['job']: c['new_job'] for c in resp.data['changes']}
+        moved = Job.objects.get(pk=new_ids[first.pk])
+        self.assertEqual((moved.crew_id, moved.status, moved.recurring_parent_id), (self.crew.pk, 'scheduled', first.pk))
+        self.assertEqual(
+            JobMonthlyRollup.objects.filter(status='weather_delay').aggregate(n=Sum('job_count'))['n'], 4,
+        )
+        self.assertEqual(
+            JobMonthlyRollup.objects.filter(status='scheduled').aggregate(n=Sum('job_count'))['n'], 5,
+        )
+
+    def test_filters_and_dry_run(self):
+        other = Crew.objects.create(name='Crew B')
+        mine = self._job(self.rain_day, crew=self.crew)
+        self._job(self.rain_day, crew=other)
+
+        resp = self._post(crews=[self.crew.pk], dry_run=True)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([c['job'] for c in resp.data['changes']], [mine.pk])
+        self.assertIsNone(resp.data['changes'][0]['new_job'])
+        self.assertFalse(Job.objects.filter(status='weather_delay').exists())
+
+        resp = self._post(categories=[self.category.pk], business_days=1)
+        self.assertEqual(resp.data['moved'], 2)
+        self.assertEqual(Job.objects.filter(scheduled_date=date(2026, 6, 8)).count(), 2)
+
+    def test_over_capacity_is_flagged(self):
+        self._job(self.rain_day, minutes=180, crew=self.crew)
+        resp = self._post(business_days=1)
+        self.assertTrue(resp.data['changes'][0]['over_capacity'])
+
+    def test_validation(self):
+        self.assertEqual(self._post(business_days=0).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._post(crews=[9999]).status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    ServiceCategoryViewSet, ServiceViewSet,
+    ServiceCategoryViewSet, ServiceViewSet, CrewViewSet,
     JobViewSet, EstimateViewSet, InvoiceViewSet,
     dashboard_summary, reports_data,
 )
@@ -9,6 +9,7 @@ from .views import (
 router = DefaultRouter()
 router.register(r'categories', ServiceCategoryViewSet)
 router.register(r'services', ServiceViewSet)
+router.register(r'crews', CrewViewSet)
 router.register(r'jobs', JobViewSet)
 router.register(r'estimates', EstimateViewSet)
 router.register(r'invoices', InvoiceViewSet)
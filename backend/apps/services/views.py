@@ -4,11 +4,15 @@ from rest_framework.permissions import IsAuthenticated, AllowAny, SAFE_METHODS,
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from django.db.models import Sum, Count, Q
-from datetime import timedelta
-from .models import ServiceCategory, Service, Job, Estimate, Invoice
+from django.utils.dateparse import parse_date, parse_time
+from django.db.models import Sum
+from datetime import date, timedelta
+from apps.accounts.business_calendar import add_business_days
+from .models import ServiceCategory, Service, Crew, Job, JobMonthlyRollup, Estimate, Invoice
+from .dashboard import get_dashboard
+from .scheduling import CrewSchedule, SchedulingConflict, assign_crew, check_assignment
 from .serializers import (
-    ServiceCategorySerializer, ServiceSerializer,
+    ServiceCategorySerializer, ServiceSerializer, CrewSerializer, WeatherDelaySerializer,
     JobListSerializer, JobDetailSerializer, JobCreateUpdateSerializer,
     EstimateListSerializer, EstimateDetailSerializer, EstimateCreateUpdateSerializer,
     InvoiceListSerializer, InvoiceDetailSerializer, InvoiceCreateUpdateSerializer,
@@ -43,11 +47,41 @@ class ServiceViewSet(viewsets.ModelViewSet):
     pagination_class = None
 
 
+class CrewViewSet(viewsets.ModelViewSet):
+    permission_classes = [IsAuthenticated]
+    queryset = Crew.objects.prefetch_related('members')
+    serializer_class = CrewSerializer
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filterset_fields = ['is_active']
+    search_fields = ['name']
+    pagination_class = None
+
+    @action(detail=False, methods=['get'])
+    def board(self, request):
+        """Week board: per active crew and day, booked minutes, capacity and free gaps.
+
+        `week` (any date in the week, default today) picks the Monday-Sunday week;
+        `min_gap` (minutes, default 15) hides shorter gaps.
+        """
+        week = request.query_params.get('week')
+        day = parse_date(week) if week else timezone.localdate()
+        if day is None:
+            return Response({'error': 'week must be a date (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            min_gap = int(request.query_params.get('min_gap', 15))
+        except ValueError:
+            return Response({'error': 'min_gap must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=6)
+        schedule = CrewSchedule(start, end, crews=self.get_queryset().filter(is_active=True))
+        return Response({'start': start, 'end': end, 'crews': schedule.board(min_gap)})
+
+
 class JobViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     queryset = Job.objects.select_related('customer', 'service', 'service__category')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'customer', 'service', 'assigned_to', 'is_invoiced']
+    filterset_fields = ['status', 'customer', 'service', 'crew', 'assigned_to', 'is_invoiced']
     search_fields = ['customer__business_name', 'service__name', 'assigned_to']
     ordering_fields = ['scheduled_date', 'status', 'price']
     ordering = ['scheduled_date', 'scheduled_time']
@@ -100,11 +134,37 @@ class JobViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def reschedule(self, request, pk=None):
-        """Reschedule a job"""
+        """Reschedule a job to `date`, or `business_days` business days after its current date
+
+        The job keeps its crew; a double booking or over-capacity day
+        returns 409 unless `force` is true, as for assign-crew.
+        """
         job = self.get_object()
         new_date = request.data.get('date')
+        if not new_date and request.data.get('business_days'):
+            try:
+                business_days = int(request.data['business_days'])
+            except (TypeError, ValueError):
+                return Response({'error': 'business_days must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+            new_date = add_business_days(job.scheduled_date, business_days)
         if not new_date:
             return Response({'error': 'date is required'}, status=status.HTTP_400_BAD_REQUEST)
+        new_date = parse_date(str(new_date))
+        if new_date is None:
+            return Response({'error': 'date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        new_time = job.scheduled_time
+        if request.data.get('time'):
+            new_time = parse_time(str(request.data['time']))
+            if new_time is None:
+                return Response({'error': 'time must be HH:MM'}, status=status.HTTP_400_BAD_REQUEST)
+        force = str(request.data.get('force', '')).lower() in ('1', 'true', 'yes')
+        check = None
+        if job.crew_id:
+            check = check_assignment(job, job.crew, new_date, new_time)
+            if not check.ok and not force:
+                return Response(
+                    {'error': check.message, **check.as_dict()}, status=status.HTTP_409_CONFLICT,
+                )
         job.status = 'rescheduled'
         job.save()
         # Create new job for the new date
@@ -112,15 +172,69 @@ class JobViewSet(viewsets.ModelViewSet):
             customer=job.customer,
             service=job.service,
             scheduled_date=new_date,
-            scheduled_time=request.data.get('time', job.scheduled_time),
+            scheduled_time=new_time,
             estimated_duration=job.estimated_duration,
+            crew=job.crew,
             assigned_to=job.assigned_to,
             price=job.price,
             is_recurring=job.is_recurring,
             recurring_parent=job.recurring_parent or job,
             created_by=request.user,
         )
-        return Response(JobDetailSerializer(new_job).data, status=status.HTTP_201_CREATED)
+        data = JobDetailSerializer(new_job).data
+        if check is not None:
+            data['warnings'] = check.as_dict() if not check.ok else None
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'], url_path='assign-crew')
+    def assign_crew(self, request, pk=None):
+        """Assign a crew, optionally with a new `date`/`time`.
+
+        Double-booking or exceeding the crew's daily capacity returns 409,
+        unless `force` is true, in which case the job is saved and the
+        problems are returned under `warnings`.
+        """
+        job = self.get_object()
+        crew = Crew.objects.filter(pk=request.data.get('crew'), is_active=True).first()
+        if crew is None:
+            return Response({'error': 'crew must be an active crew id'}, status=status.HTTP_400_BAD_REQUEST)
+        day = start_time = None
+        if request.data.get('date'):
+            day = parse_date(str(request.data['date']))
+            if day is None:
+                return Response({'error': 'date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if request.data.get('time'):
+            start_time = parse_time(str(request.data['time']))
+            if start_time is None:
+                return Response({'error': 'time must be HH:MM'}, status=status.HTTP_400_BAD_REQUEST)
+        force = str(request.data.get('force', '')).lower() in ('1', 'true', 'yes')
+        try:
+            check = assign_crew(job, crew, day, start_time, allow_conflicts=force)
+        except SchedulingConflict as exc:
+            return Response({'error': str(exc), **exc.check.as_dict()}, status=status.HTTP_409_CONFLICT)
+        data = JobDetailSerializer(job).data
+        data['warnings'] = check.as_dict() if not check.ok else None
+        return Response(data)
+
+    @action(detail=False, methods=['post'], url_path='weather-delay')
+    def weather_delay(self, request):
+        """
+        Delay every scheduled job on `date` and spread them over the next business days.
+
+        Body: `date`, `business_days` (default 3), optional `categories` and
+        `crews` (IDs) to narrow the jobs, and `dry_run` to preview the moves.
+        Returns the before/after slot of every job.
+        """
+        from .weather import weather_delay
+
+        serializer = WeatherDelaySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = weather_delay(
+            data['date'], data['business_days'], categories=data.get('categories'),
+            crews=data.get('crews'), user=request.user, dry_run=data['dry_run'],
+        )
+        return Response(result)
 
 
 class EstimateViewSet(viewsets.ModelViewSet):
@@ -140,37 +254,40 @@ class EstimateViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def accept(self, request, pk=None):
-        """Accept estimate and optionally convert to jobs"""
+        """Accept estimate and optionally convert to jobs
+
+        Jobs land on `start_date` (default today), or are spread over a
+        `recurrence` (weekly, biweekly, monthly or an RRULE) from that date,
+        `jobs_per_date` (default 1) per occurrence.
+        """
+        from .estimates import accept_estimate
+
         estimate = self.get_object()
-        estimate.status = 'accepted'
-        estimate.responded_at = timezone.now()
-        estimate.save()
-
-        created_jobs = []
-        if request.data.get('create_jobs', True):
-            for item in estimate.line_items:
-                service = None
-                if item.get('service_id'):
-                    service = Service.objects.filter(id=item['service_id']).first()
-                if not service and item.get('service'):
-                    service = Service.objects.filter(name=item['service']).first()
-                if service:
-                    job = Job.objects.create(
-                        customer=estimate.customer,
-                        service=service,
-                        scheduled_date=request.data.get('start_date', timezone.now().date()),
-                        estimated_duration=service.estimated_duration_minutes,
-                        price=item.get('price', service.default_price),
-                        is_recurring=service.is_recurring,
-                        created_by=request.user,
-                    )
-                    created_jobs.append(job)
-            estimate.converted_to_jobs = True
-            estimate.save()
+        create_jobs = str(request.data.get('create_jobs', True)).lower() not in ('0', 'false', 'no')
+        start_date = None
+        if request.data.get('start_date'):
+            start_date = parse_date(str(request.data['start_date']))
+            if start_date is None:
+                return Response({'error': 'start_date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            jobs_per_date = int(request.data.get('jobs_per_date', 1))
+        except (TypeError, ValueError):
+            jobs_per_date = 0
+        if jobs_per_date < 1:
+            return Response({'error': 'jobs_per_date must be a positive number'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            jobs, unmatched = accept_estimate(
+                estimate, request.user, create_jobs=create_jobs, start_date=start_date,
+                recurrence=request.data.get('recurrence'), jobs_per_date=jobs_per_date,
+            )
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
             'estimate': EstimateDetailSerializer(estimate).data,
-            'jobs_created': len(created_jobs),
+            'jobs_created': len(jobs),
+            'unmatched_items': unmatched,
         })
 
 
@@ -232,89 +349,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
 @perm_classes([IsAuthenticated])
 def dashboard_summary(request):
     """Dashboard summary with job counts, revenue, and outstanding invoices"""
-    today = timezone.now().date()
-    week_start = today
-    week_end = today + timedelta(days=7)
-    month_start = today.replace(day=1)
-
-    # Today's jobs
-    today_jobs = Job.objects.filter(scheduled_date=today)
-    today_completed = today_jobs.filter(status='completed')
-    today_revenue = today_completed.aggregate(total=Sum('price'))['total'] or 0
-
-    # This week
-    week_jobs = Job.objects.filter(scheduled_date__gte=week_start, scheduled_date__lt=week_end)
-    week_completed = week_jobs.filter(status='completed')
-    week_revenue = week_completed.aggregate(total=Sum('price'))['total'] or 0
-
-    # This month
-    month_jobs = Job.objects.filter(scheduled_date__gte=month_start, scheduled_date__lte=today)
-    month_completed = month_jobs.filter(status='completed')
-    month_revenue = month_completed.aggregate(total=Sum('price'))['total'] or 0
-
-    # Outstanding invoices
-    outstanding = Invoice.objects.exclude(status__in=['paid', 'void'])
-    outstanding_total = outstanding.aggregate(
-        total=Sum('total'), paid=Sum('amount_paid')
-    )
-    total_owed = (outstanding_total['total'] or 0) - (outstanding_total['paid'] or 0)
-    overdue = outstanding.filter(due_date__lt=today)
-    overdue_total = overdue.aggregate(
-        total=Sum('total'), paid=Sum('amount_paid')
-    )
-    overdue_amount = (overdue_total['total'] or 0) - (overdue_total['paid'] or 0)
-
-    # Monthly revenue (last 12 months) using real calendar months
-    monthly_revenue = []
-    current_month_start = today.replace(day=1)
-    for i in range(11, -1, -1):
-        # Walk back i months from the current month
-        month = current_month_start.month - i
-        year = current_month_start.year
-        while month <= 0:
-            month += 12
-            year -= 1
-        m_start = current_month_start.replace(year=year, month=month, day=1)
-        if m_start.month == 12:
-            m_end = m_start.replace(year=m_start.year + 1, month=1)
-        else:
-            m_end = m_start.replace(month=m_start.month + 1)
-        rev = Job.objects.filter(
-            scheduled_date__gte=m_start, scheduled_date__lt=m_end, status='completed'
-        ).aggregate(total=Sum('price'))['total'] or 0
-        inv_rev = Invoice.objects.filter(
-            issued_date__gte=m_start, issued_date__lt=m_end, status='paid'
-        ).aggregate(total=Sum('total'))['total'] or 0
-        monthly_revenue.append({
-            'month': m_start.strftime('%b %Y'),
-            'revenue': float(max(rev, inv_rev)),
-        })
-
-    return Response({
-        'today': {
-            'total_jobs': today_jobs.count(),
-            'completed': today_completed.count(),
-            'in_progress': today_jobs.filter(status='in_progress').count(),
-            'scheduled': today_jobs.filter(status='scheduled').count(),
-            'revenue': float(today_revenue),
-        },
-        'this_week': {
-            'total_jobs': week_jobs.count(),
-            'completed': week_completed.count(),
-            'revenue': float(week_revenue),
-        },
-        'this_month': {
-            'revenue': float(month_revenue),
-            'jobs_completed': month_completed.count(),
-        },
-        'outstanding': {
-            'invoices_count': outstanding.count(),
-            'total_owed': float(total_owed),
-            'overdue_count': overdue.count(),
-            'overdue_amount': float(overdue_amount),
-        },
-        'monthly_revenue': monthly_revenue,
-    })
+    return Response(get_dashboard())
 
 
 @api_view(['GET'])
@@ -342,26 +377,26 @@ def reports_data(request):
         'weather_delay': 'Weather Delay',
     }
 
+    # Everything below reads the pre-aggregated JobMonthlyRollup table
+    rollup = JobMonthlyRollup.objects.all()
+    completed = rollup.filter(status='completed')
+
+    monthly = {
+        row['month']: row
+        for row in completed.filter(month__year__in=[prev_year, current_year])
+        .values('month').annotate(revenue=Sum('revenue'), jobs=Sum('job_count')).order_by()
+    }
+
     def _monthly_revenue_for_year(year):
         """Build per-month revenue + job counts for a given year."""
-        from datetime import date
         months = []
         for m in range(1, 13):
             m_start = date(year, m, 1)
-            if m == 12:
-                m_end = date(year + 1, 1, 1)
-            else:
-                m_end = date(year, m + 1, 1)
-            qs = Job.objects.filter(
-                scheduled_date__gte=m_start,
-                scheduled_date__lt=m_end,
-                status='completed',
-            )
-            rev = qs.aggregate(total=Sum('price'))['total'] or 0
+            row = monthly.get(m_start, {})
             months.append({
                 'month': m_start.strftime('%b'),
-                'revenue': float(rev),
-                'jobs': qs.count(),
+                'revenue': float(row.get('revenue') or 0),
+                'jobs': row.get('jobs') or 0,
             })
         return months
 
@@ -370,8 +405,9 @@ def reports_data(request):
 
     # Jobs by status
     status_counts = (
-        Job.objects.values('status')
-        .annotate(count=Count('id'))
+        rollup.values('status')
+        .annotate(count=Sum('job_count'))
+        .filter(count__gt=0)
         .order_by('-count')
     )
     jobs_by_status = [
@@ -385,31 +421,31 @@ def reports_data(request):
 
     # Revenue by service category
     category_revenue = (
-        Job.objects.filter(status='completed')
-        .values('service__category__name', 'service__category__color')
-        .annotate(revenue=Sum('price'))
+        completed.values('category__name', 'category__color')
+        .annotate(revenue=Sum('revenue'), jobs=Sum('job_count'))
+        .filter(jobs__gt=0)
         .order_by('-revenue')
     )
     revenue_by_category = [
         {
-            'category': row['service__category__name'],
+            'category': row['category__name'],
             'revenue': float(row['revenue']),
-            'color': row['service__category__color'] or '#6366f1',
+            'color': row['category__color'] or '#6366f1',
         }
         for row in category_revenue
     ]
 
     # Crew productivity (by assigned_to)
     crew_stats = (
-        Job.objects.filter(status='completed')
-        .exclude(assigned_to='')
-        .values('assigned_to')
-        .annotate(jobs=Count('id'), revenue=Sum('price'))
+        completed.exclude(crew='')
+        .values('crew')
+        .annotate(jobs=Sum('job_count'), revenue=Sum('revenue'))
+        .filter(jobs__gt=0)
         .order_by('-jobs')
     )
     crew_productivity = [
         {
-            'name': row['assigned_to'],
+            'name': row['crew'],
             'jobs': row['jobs'],
             'revenue': float(row['revenue']),
         }
@@ -0,0 +1,197 @@
+"""Bulk weather-delay rescheduling.
+
+Every open job on a rained-out day is marked ``weather_delay`` and a copy
+is placed on one of the next few business days, the way
+JobViewSet.reschedule does for one job. Each job goes to the day where
+its crew still has capacity and which is closest to the crew's other stops
+that day (or its home base), with a small penalty per day of delay. The
+original time is kept when the crew is free then, else the first free gap
+that fits, else the job is left untimed.
+"""
+from django.db import transaction
+from django.utils import timezone
+from apps.accounts.business_calendar import add_business_days
+from .models import Job
+from .scheduling import CrewSchedule, to_minutes, to_time
+
+
+DEFAULT_BUSINESS_DAYS = 3
+# Miles of extra driving worth accepting to do a job one business day sooner
+DAY_PENALTY_MILES = 5.0
+DELAYABLE_STATUSES = ['scheduled']
+
+
+def _location(customer):
+    if customer.latitude is None or customer.longitude is None:
+        return None
+    return float(customer.latitude), float(customer.longitude)
+
+
+class CrewDayStops:
+    """Running centroid of a crew's stops on one day."""
+
+    def __init__(self, anchor=None):
+        self.anchor = anchor
+        self.lat = self.lon = 0.0
+        self.count = 0
+
+    def add(self, point):
+        if point is None:
+            return
+        self.lat += point[0]
+        self.lon += point[1]
+        self.count += 1
+
+    def center(self):
+        if self.count:
+            return self.lat / self.count, self.lon / self.count
+        return self.anchor
+
+    def distance(self, point):
+        from apps.routing.views import haversine
+
+        center = self.center()
+        if point is None or center is None:
+            return 0.0
+        return haversine(point[1], point[0], center[1], center[0])
+
+
+class WeatherDelayPlan:
+    """Where each delayed job goes; built without writing anything."""
+
+    def __init__(self, day, business_days=DEFAULT_BUSINESS_DAYS, categories=None, crews=None):
+        self.day = day
+        self.targets = [add_business_days(day, n) for n in range(1, business_days + 1)]
+        jobs = Job.objects.filter(scheduled_date=day, status__in=DELAYABLE_STATUSES)
+        if categories:
+            jobs = jobs.filter(service__category__in=categories)
+        if crews:
+            jobs = jobs.filter(crew__in=crews)
+        self.jobs = jobs.select_related('customer', 'service', 'crew').order_by('crew_id', 'scheduled_time', 'pk')
+
+    def build(self, jobs):
+        """Return [(job, new_date, new_time, over_capacity)] for ``jobs``."""
+        crews = {job.crew_id: job.crew for job in jobs if job.crew_id}
+        schedule = CrewSchedule(self.targets[0], self.targets[-1], crews=crews.values())
+
+        # Existing stops per crew and target day, for proximity
+        stops = {}
+        for crew in crews.values():
+            home = None
+            if crew.home_latitude is not None and crew.home_longitude is not None:
+                home = float(crew.home_latitude), float(crew.home_longitude)
+            for target in self.targets:
+                stops[(crew.pk, target)] = CrewDayStops(home)
+        booked = Job.objects.filter(
+            crew__in=list(crews), scheduled_date__in=self.targets, status__in=DELAYABLE_STATUSES + ['in_progress'],
+        ).values_list('crew_id', 'scheduled_date', 'customer__latitude', 'customer__longitude')
+        for crew_id, target, lat, lon in booked:
+            if lat is not None and lon is not None:
+                stops[(crew_id, target)].add((float(lat), float(lon)))
+
+        placements = []
+        for job in jobs:
+            duration = job.estimated_duration or 0
+            if not job.crew_id:
+                placements.append((job, self.targets[0], job.scheduled_time, False))
+                continue
+            crew = crews[job.crew_id]
+            point = _location(job.customer)
+
+            def cost(item):
+                index, target = item
+                return stops[(crew.pk, target)].distance(point) + DAY_PENALTY_MILES * index
+
+            candidates = [
+                (index, target) for index, target in enumerate(self.targets)
+                if schedule.day(crew.pk, target).booked_minutes + duration <= crew.daily_capacity_minutes
+            ]
+            over_capacity = not candidates
+            if candidates:
+                target = min(candidates, key=cost)[1]
+            else:
+                target = min(self.targets, key=lambda t: schedule.day(crew.pk, t).booked_minutes)
+
+            start_time = self._pick_time(schedule.day(crew.pk, target), crew, job.scheduled_time, duration)
+            schedule.add(crew.pk, target, None, start_time, duration)
+            stops[(crew.pk, target)].add(point)
+            placements.append((job, target, start_time, over_capacity))
+        return placements
+
+    @staticmethod
+    def _pick_time(crew_day, crew, preferred, duration):
+        if preferred is not None:
+            start = to_minutes(preferred)
+            if not crew_day.overlaps(start, start + duration):
+                return preferred
+        gaps = crew_day.free_gaps(to_minutes(crew.workday_start), to_minutes(crew.workday_end), duration or 1)
+        return to_time(gaps[0][0]) if gaps else None
+
+
+def _slot(day, start_time):
+    return {'date': day, 'time': start_time}
+
+
+def weather_delay(day, business_days=DEFAULT_BUSINESS_DAYS, categories=None, crews=None,
+                  user=None, dry_run=False):
+    """
+    Delay the open jobs on ``day`` and spread them over the next ``business_days`` business days.
+
+    Returns ``{'date', 'targets', 'moved', 'changes'}`` where each change lists
+    the job's ``before`` and ``after`` slot. With ``dry_run`` nothing is saved
+    and ``new_job`` is None.
+    """
+    from . import rollup
+    from .dashboard import invalidate_dashboard
+
+    plan = WeatherDelayPlan(day, business_days, categories, crews)
+    with transaction.atomic():
+        jobs = list(plan.jobs.select_for_update(of=('self',)))
+        placements = plan.build(jobs)
+
+        created = []
+        if placements and not dry_run:
+            previous = [rollup.rollup_entry(job) for job in jobs]
+            now = timezone.now()
+            new_jobs = []
+            for job, target, start_time, over_capacity in placements:
+                job.status = 'weather_delay'
+                job.updated_at = now
+                new_jobs.append(Job(
+                    customer_id=job.customer_id,
+                    service_id=job.service_id,
+                    scheduled_date=target,
+                    scheduled_time=start_time,
+                    estimated_duration=job.estimated_duration,
+                    crew_id=job.crew_id,
+                    assigned_to=job.assigned_to,
+                    price=job.price,
+                    is_recurring=job.is_recurring,
+                    recurring_parent_id=job.recurring_parent_id or job.pk,
+                    created_by=user,
+                ))
+            Job.objects.bulk_update(jobs, ['status', 'updated_at'])
+            created = Job.objects.bulk_create(new_jobs)
+            # Bulk writes skip the Job signals, so update their side effects here
+            rollup.apply_entries(previous, sign=-1)
+            rollup.apply_jobs(jobs)
+            rollup.apply_jobs(created)
+
+    if created:
+        from apps.routing.map_tiles import invalidate_layers
+        invalidate_layers('jobs')
+        invalidate_dashboard()
+
+    changes = []
+    for i, (job, target, start_time, over_capacity) in enumerate(placements):
+        changes.append({
+            'job': job.pk,
+            'new_job': created[i].pk if created else None,
+            'customer': job.customer.business_name,
+            'service': job.service.name,
+            'crew': job.crew_id,
+            'before': _slot(day, job.scheduled_time),
+            'after': _slot(target, start_time),
+            'over_capacity': over_capacity,
+        })
+    return {'date': day, 'targets': plan.targets, 'moved': len(changes), 'changes': changes}
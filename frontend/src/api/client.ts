@@ -1,9 +1,12 @@
 import axios from 'axios';
+import type { Activity, ChangesSince, CursorPage } from '../types';
 
 // Use VITE_API_URL env var, or default to backend URL
 // For Render: set VITE_API_URL to your backend URL (e.g., https://johnscrm.onrender.com)
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+export const ACTIVITY_PAGE_SIZE = 10;
+
 export const api = axios.create({
   baseURL: API_BASE_URL,
   headers: {
@@ -119,8 +122,17 @@ export const customersApi = {
     const response = await api.post(`/customers/${id}/notes/`, { content });
     return response.data;
   },
-  getActivities: async (id: number) => {
-    const response = await api.get(`/customers/${id}/activities/`);
+  getActivities: async (id: number, cursor?: string | null): Promise<CursorPage<Activity>> => {
+    // One page of the cursor-paginated timeline, newest first
+    const response = await api.get(`/customers/${id}/activities/`, {
+      params: { page_size: ACTIVITY_PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    });
+    const next = response.data.next ? new URL(response.data.next).searchParams.get('cursor') : null;
+    return { results: response.data.results, next };
+  },
+  getActivityChanges: async (id: number, since: string, sinceId: number): Promise<ChangesSince<Activity>> => {
+    // Activities created or edited after the marker, for refreshing an open timeline
+    const response = await api.get(`/customers/${id}/activities/`, { params: { since, since_id: sinceId } });
     return response.data;
   },
   getReminders: async (id: number) => {
@@ -483,9 +495,15 @@ customersApi.get = async (id: number) => withDemo(
 );
 
 const _originalCustomersGetActivities = customersApi.getActivities;
-customersApi.getActivities = async (id: number) => withDemo(
-  () => _originalCustomersGetActivities(id),
-  demoActivities.filter(a => a.customer === id),
+customersApi.getActivities = async (id: number, cursor?: string | null) => withDemo(
+  () => _originalCustomersGetActivities(id, cursor),
+  { results: demoActivities.filter(a => a.customer === id), next: null },
+);
+
+const _originalCustomersGetActivityChanges = customersApi.getActivityChanges;
+customersApi.getActivityChanges = async (id: number, since: string, sinceId: number) => withDemo(
+  () => _originalCustomersGetActivityChanges(id, since, sinceId),
+  { results: [], next_since: since, next_since_id: sinceId, has_more: false },
 );
 
 const _originalCustomersGetReminders = customersApi.getReminders;
@@ -0,0 +1,74 @@
+import { useInfiniteQuery, type InfiniteData, type QueryClient } from '@tanstack/react-query';
+import { customersApi } from '../api/client';
+import type { Activity, CursorPage } from '../types';
+
+type ActivityPages = InfiniteData<CursorPage<Activity>, string | null>;
+
+const activitiesKey = (customerId: number) => ['customer-activities', customerId];
+
+// Newest first, matching the server's timeline ordering
+function byNewest(a: Activity, b: Activity) {
+  return b.activity_datetime.localeCompare(a.activity_datetime) || b.id - a.id;
+}
+
+export function useCustomerActivities(customerId: number) {
+  const { data, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: activitiesKey(customerId),
+    queryFn: ({ pageParam }) => customersApi.getActivities(customerId, pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next,
+    enabled: !!customerId,
+  });
+
+  return {
+    activities: data?.pages.flatMap((page) => page.results),
+    hasMore: hasNextPage,
+    loadMore: fetchNextPage,
+    isLoadingMore: isFetchingNextPage,
+  };
+}
+
+// Merge activities created or edited since the newest change on screen into the
+// loaded pages, instead of refetching every page of the timeline
+export async function refreshCustomerActivities(queryClient: QueryClient, customerId: number) {
+  const cached = queryClient.getQueryData<ActivityPages>(activitiesKey(customerId));
+  const loaded = cached?.pages.flatMap((page) => page.results) ?? [];
+  if (!cached || loaded.length === 0) {
+    return queryClient.invalidateQueries({ queryKey: activitiesKey(customerId) });
+  }
+
+  const marker = loaded.reduce((latest, activity) =>
+    activity.updated_at > latest.updated_at
+      || (activity.updated_at === latest.updated_at && activity.id > latest.id) ? activity : latest,
+  );
+  let since = marker.updated_at;
+  let sinceId = marker.id;
+  const changed = new Map<number, Activity>();
+  for (;;) {
+    const changes = await customersApi.getActivityChanges(customerId, since, sinceId);
+    changes.results.forEach((activity) => changed.set(activity.id, activity));
+    since = changes.next_since;
+    sinceId = changes.next_since_id;
+    if (!changes.has_more) break;
+  }
+  if (changed.size === 0) return;
+
+  queryClient.setQueryData<ActivityPages>(activitiesKey(customerId), (data) => {
+    if (!data) return data;
+    const pages = data.pages.map((page) => ({
+      ...page,
+      results: page.results.map((activity) => changed.get(activity.id) ?? activity),
+    }));
+    const known = new Set(loaded.map((activity) => activity.id));
+    const last = pages[pages.length - 1];
+    const oldest = loaded[loaded.length - 1];
+    // New activities older than everything loaded arrive with a later page
+    const added = [...changed.values()].filter((activity) =>
+      !known.has(activity.id) && (!last.next || byNewest(activity, oldest) <= 0),
+    );
+    if (added.length) {
+      pages[0] = { ...pages[0], results: [...added, ...pages[0].results].sort(byNewest) };
+    }
+    return { ...data, pages };
+  });
+}
@@ -28,7 +28,8 @@ import { FAB } from '../components/common/FAB';
 import { PageTransition } from '../components/common/PageTransition';
 import { SkeletonCard } from '../components/common/Skeleton';
 import { useToast } from '../hooks/useToast';
-import type { Customer, Activity, Reminder, ActivityType, Job, Invoice } from '../types';
+import { useCustomerActivities, refreshCustomerActivities } from '../hooks/useCustomerActivities';
+import type { Customer, Reminder, ActivityType, Job, Invoice } from '../types';
 
 function getInitials(name: string): string {
   return name
@@ -66,10 +67,8 @@ export function CustomerDetailPage() {
     queryFn: () => customersApi.get(customerId),
   });
 
-  const { data: activities } = useQuery<Activity[]>({
-    queryKey: ['customer-activities', customerId],
-    queryFn: () => customersApi.getActivities(customerId),
-  });
+  const { activities, hasMore, loadMore, isLoadingMore } = useCustomerActivities(customerId);
+  const activityCount = `${activities?.length || 0}${hasMore ? '+' : ''}`;
 
   const { data: reminders } = useQuery<Reminder[]>({
     queryKey: ['customer-reminders', customerId],
@@ -248,7 +247,7 @@ export function CustomerDetailPage() {
               <span className="text-xs font-medium uppercase">Activities</span>
             </div>
             <p className="text-2xl font-bold text-gray-900 dark:text-white">
-              {activities?.length || 0}
+              {activityCount}
             </p>
             <p className="text-xs text-gray-500 dark:text-gray-400">logged</p>
           </div>
@@ -488,7 +487,7 @@ export function CustomerDetailPage() {
             <Card>
               <CardHeader
                 title="Activity History"
-                subtitle={`${activities?.length || 0} activities`}
+                subtitle={`${activityCount} activities`}
                 action={
                   <Button
                     variant="secondary"
@@ -503,7 +502,7 @@ export function CustomerDetailPage() {
               <CardContent>
                 {activities && activities.length > 0 ? (
                   <div className="space-y-1">
-                    {activities.slice(0, 10).map((activity, idx) => (
+                    {activities.map((activity, idx) => (
                       <div
                         key={activity.id}
                         className="flex gap-4 p-3 rounded-lg hover:bg-gray-50 dark:hover:bg-gray-700/50 transition-colors"
@@ -520,7 +519,7 @@ export function CustomerDetailPage() {
                               style={{ color: activity.activity_type_color }}
                             />
                           </div>
-                          {idx < Math.min(activities.length, 10) - 1 && (
+                          {(idx < activities.length - 1 || hasMore) && (
                             <div className="absolute top-10 left-1/2 -translate-x-1/2 w-0.5 h-full bg-gray-200 dark:bg-gray-700" />
                           )}
                         </div>
@@ -548,6 +547,17 @@ export function CustomerDetailPage() {
                         </div>
                       </div>
                     ))}
+                    {hasMore && (
+                      <Button
+                        variant="ghost"
+                        size="sm"
+                        onClick={() => loadMore()}
+                        isLoading={isLoadingMore}
+                        className="w-full"
+                      >
+                        Load more
+                      </Button>
+                    )}
                   </div>
                 ) : (
                   <div className="text-center py-6">
@@ -842,9 +852,7 @@ function ActivityModal({
   const createActivityMutation = useMutation({
     mutationFn: (data: Record<string, unknown>) => activitiesApi.create(data),
     onSuccess: () => {
-      queryClient.invalidateQueries({
-        queryKey: ['customer-activities', customerId],
-      });
+      refreshCustomerActivities(queryClient, customerId);
       queryClient.invalidateQueries({
         queryKey: ['customer-reminders', customerId],
       });
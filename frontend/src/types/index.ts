@@ -207,6 +207,20 @@ export interface PaginatedResponse<T> {
   results: T[];
 }
 
+// One page of a cursor-paginated list; pass `next` back to fetch the following page
+export interface CursorPage<T> {
+  results: T[];
+  next: string | null;
+}
+
+// Rows changed since a (next_since, next_since_id) marker, oldest change first
+export interface ChangesSince<T> {
+  results: T[];
+  next_since: string;
+  next_since_id: number;
+  has_more: boolean;
+}
+
 // Service types
 export interface ServiceCategory {
   id: number;